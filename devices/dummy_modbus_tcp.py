@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Unified measurement software UMS
+# New measurement software for the electrochemical materials group, Prof. Jennifer Rupp
+#
+# Copyright (c) 2013 Reto Pfenninger, department of materials, D-MATL, ETH Zürich
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Modbus TCP stand-in slave on the loopback interface, for the tests of
+# modbus_tcp and of the drivers which run over it (like dummy_serial for RTU).
+#
+# registers is a dict unit id -> {register address: value}. Function codes 3
+# and 4 read, 6 and 16 write. A read of an address which is not in the dict is
+# answered with exception code 2 (illegal data address), or with the value
+# missing if it is set (the Eurotherm controllers answer 0x8000 for parameters
+# they do not have). The requests of one connection are answered in order,
+# requests is the number of answered requests.
+
+import socket
+import struct
+import threading
+import time
+
+MBAP = struct.Struct(">HHHB")
+
+
+class slave(object):
+    def __init__(self, registers=None, delay=0.0, missing=None):
+        self.registers = registers if registers is not None else {}
+        self.missing = missing
+        self.delay = delay # seconds before each answer
+        self.requests = 0
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server.bind(("127.0.0.1", 0))
+        self.server.listen(5)
+        self.port = self.server.getsockname()[1]
+        self.url = "tcp://127.0.0.1:"+str(self.port)
+        thread = threading.Thread(target=self.accept)
+        thread.daemon = True
+        thread.start()
+
+    def accept(self):
+        while True:
+            try:
+                connection, address = self.server.accept()
+            except socket.error:
+                return
+            thread = threading.Thread(target=self.serve, args=(connection,))
+            thread.daemon = True
+            thread.start()
+
+    def recv_exact(self, connection, n):
+        data = ""
+        while len(data) < n:
+            chunk = connection.recv(n-len(data))
+            if not chunk:
+                raise EOFError()
+            data += chunk
+        return data
+
+    def serve(self, connection):
+        try:
+            while True:
+                tid, protocol, length, unit = MBAP.unpack(self.recv_exact(connection, MBAP.size))
+                pdu = self.recv_exact(connection, length-1)
+                answer = self.answer(unit, ord(pdu[0]), pdu[1:])
+                if self.delay:
+                    time.sleep(self.delay)
+                self.requests += 1
+                connection.sendall(MBAP.pack(tid, 0, len(answer)+1, unit)+answer)
+        except (EOFError, socket.error):
+            connection.close()
+
+    def answer(self, unit, functioncode, data):
+        registers = self.registers.setdefault(unit, {})
+        if functioncode in (3, 4):
+            address, count = struct.unpack(">HH", data[:4])
+            if self.missing is None and any([address+k not in registers for k in range(count)]):
+                return chr(functioncode | 0x80)+chr(2)
+            values = [registers.get(address+k, self.missing) for k in range(count)]
+            return chr(functioncode)+chr(2*count)+struct.pack(">%dH" % count, *values)
+        elif functioncode == 6:
+            address, value = struct.unpack(">HH", data[:4])
+            registers[address] = value
+            return chr(functioncode)+data[:4]
+        elif functioncode == 16:
+            address, count = struct.unpack(">HH", data[:4])
+            values = struct.unpack(">%dH" % count, data[5:5+2*count])
+            for k, value in enumerate(values):
+                registers[address+k] = value
+            return chr(functioncode)+data[:4]
+        return chr(functioncode | 0x80)+chr(1) # illegal function
+
+    def close(self):
+        self.server.close()
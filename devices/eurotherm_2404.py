@@ -22,6 +22,9 @@ import minimalmodbus
 import time
 import sys
 
+from eurotherm_registers import register_snapshot, reg
+from eurotherm_programmer import setpoint_programmer
+
 __author__  = "Jonas Berg"
 __email__   = "pyhys@users.sourceforge.net"
 __license__ = "Apache License, Version 2.0"
@@ -29,7 +32,7 @@ __license__ = "Apache License, Version 2.0"
 __revision__  = "$Rev: 155 $"
 __date__      = "$Date: 2012-08-26 16:14:30 +0200 (Sun, 26 Aug 2012) $"
 
-class eurotherm_2404( minimalmodbus.Instrument ):
+class eurotherm_2404( setpoint_programmer, register_snapshot, minimalmodbus.Instrument ):
     """Instrument class for Eurotherm 2404 process controller. 
     
     Communicates via Modbus RTU protocol (via RS232 or RS485), using the *MinimalModbus* Python module.    
@@ -57,6 +60,22 @@ class eurotherm_2404( minimalmodbus.Instrument ):
 
     """
     
+    register_map = {
+        "pv": reg(1, 1),
+        "target_setpoint": reg(2, 0),
+        "op": reg(3, 0),
+        "working_setpoint": reg(5, 0),
+        "program_number": reg(22, 0),
+        "program_status": reg(23, 0),
+        "segment_type": reg(29, 0),
+        "setpoint_rate": reg(35, 1),
+        "segment_number": reg(56, 0),
+        "program_time_remaining": reg(58, 1),
+        "program_cycles_remaining": reg(59, 0),
+        "segment_time_remaining": reg(63, 1),
+        }
+    snapshot_registers = ("pv", "target_setpoint", "op", "working_setpoint", "program_status", "setpoint_rate") # two block reads: 1-5 and 23-35
+    
     def __init__(self, portname, slaveaddress=1):
         self.oven_name = str(portname)
         self.oven_constant = 0.000078 # default value
@@ -70,6 +89,7 @@ class eurotherm_2404( minimalmodbus.Instrument ):
                 self.oven_name = ""
                 sys.exit("No furnace with the name: \""+str(portname)+"\" has been found. Is the controller really Eurotherm 2404? Don't you think it's a Eurotherm 2416 or 3216? Either use a correct pseudoname or address the serial port directly (See manual)")
         minimalmodbus.Instrument.__init__(self, portname, slaveaddress=1)
+        self.init_snapshot_cache()
         self.room_temperature = 23
         print "###########################################################################"
         print "       "+self.oven_name+" (with id: "+str(self.get_id())+")"
@@ -79,14 +99,14 @@ class eurotherm_2404( minimalmodbus.Instrument ):
     def get_pv(self):
         """Return the process value (PV) for loop1."""
         try:
-            a = self.read_register(1, 1)
+            a = self.cached_register("pv")
         except IOError:
             return None # Error during communication, Return a integer value nevertheless to make the program not crash.
         return a
     
     def get_op(self):
         """Return the % output level. (For 2404 this can also be used to set the % output)"""
-        return self.read_register(3, 0)
+        return self.cached_register("op")
         
     def get_id(self):
         """Return the customer defined identification number"""
@@ -106,7 +126,7 @@ class eurotherm_2404( minimalmodbus.Instrument ):
         
     def get_program_status(self):
         """Return the StAt. PC"""
-        a = int(self.read_register(23, 0))
+        a = int(self.cached_register("program_status"))
         string = ""
         if a is 1:
            string="Reset"
@@ -230,11 +250,11 @@ class eurotherm_2404( minimalmodbus.Instrument ):
     
     def get_target_setpoint(self):
         """Return the Target setpoint (if in manual mode). SL"""
-        return self.read_register(2, 0)
+        return self.cached_register("target_setpoint")
     
     def get_working_setpoint(self):
         """readonly. Return the (working) setpoint (SP)."""
-        return self.read_register(5, 0)
+        return self.cached_register("working_setpoint")
     
     def set_sp1(self, value):
         """Set the SP1.
@@ -285,7 +305,7 @@ class eurotherm_2404( minimalmodbus.Instrument ):
     
     def get_setpoint_rate(self):
         """Return the setpoint (SP) change rate. RR. degree/min. 0==Off (means no rate limit)"""
-        return self.read_register(35, 1)   
+        return self.cached_register("setpoint_rate")
     
     def set_setpoint_rate(self, value):
         """Set the setpoint (SP) change rate. RR.
@@ -22,7 +22,10 @@ import minimalmodbus
 import time
 import sys
 
-class eurotherm_3216( minimalmodbus.Instrument ):
+from eurotherm_registers import register_snapshot, reg
+from eurotherm_programmer import setpoint_programmer
+
+class eurotherm_3216( setpoint_programmer, register_snapshot, minimalmodbus.Instrument ):
     """Instrument class for Eurotherm 3216 process controller. 
     
     Communicates via Modbus RTU protocol (via RS232 or RS485), using the *MinimalModbus* Python module.    
@@ -51,6 +54,23 @@ class eurotherm_3216( minimalmodbus.Instrument ):
     
     """
     
+    register_map = {
+        "pv": reg(1, 1, signed=True),
+        "target_setpoint": reg(2, 0),
+        "op": reg(3, 0),
+        "working_setpoint": reg(5, 0),
+        "program_number": reg(22, 0),
+        "program_status": reg(23, 0),
+        "segment_type": reg(29, 0),
+        "setpoint_rate": reg(35, 2),
+        "segment_number": reg(56, 0),
+        "program_time_remaining": reg(58, 1),
+        "program_cycles_remaining": reg(59, 0),
+        "segment_time_remaining": reg(63, 1),
+        }
+    snapshot_registers = ("pv", "target_setpoint", "op", "working_setpoint", "program_status", "setpoint_rate") # two block reads: 1-5 and 23-35
+    program_base = None # the 3200 series programmer has no 2400 style program data area
+    
     def __init__(self, portname, slaveaddress=1):
         self.oven_name = str(portname)
         self.oven_constant = 0.000078 # default value
@@ -92,6 +112,7 @@ class eurotherm_3216( minimalmodbus.Instrument ):
                 self.oven_name = "unknown oven"
                 sys.exit("No furnace with the name: \""+str(portname)+"\" has been found. Is the controller really Eurotherm 3216? Don't you think it's a Eurotherm 2416? Either use a correct pseudoname or address the serial port directly (See manual)")
         minimalmodbus.Instrument.__init__(self, portname, slaveaddress=1)
+        self.init_snapshot_cache()
         self.room_temperature = 23
         print "###########################################################################"
         print "       "+self.oven_name+" (with id: "+str(self.get_id())+")"
@@ -102,14 +123,14 @@ class eurotherm_3216( minimalmodbus.Instrument ):
     def get_pv(self):
         """Return the process value (PV) for loop1."""
         try:
-            a = self.read_register(1, 1, signed=True)
+            a = self.cached_register("pv")
         except IOError:
             return None # Error during communication, Return a integer value nevertheless to make the program not crash.
         return a
     
     def get_op(self):
         """Return the % output level. (For 2404 this can also be used to set the % output)"""
-        return self.read_register(3, 0)
+        return self.cached_register("op")
         
     def get_id(self):
         """Return the customer defined identification number"""
@@ -129,7 +150,7 @@ class eurotherm_3216( minimalmodbus.Instrument ):
         
     def get_program_status(self):
         """Return the StAt. PC"""
-        a = int(self.read_register(23, 0))
+        a = int(self.cached_register("program_status"))
         string = ""
         if a is 1:
            string="Reset"
@@ -253,7 +274,7 @@ class eurotherm_3216( minimalmodbus.Instrument ):
     
     def get_target_setpoint(self):
         """Return the Target setpoint (if in manual mode). SL"""
-        return self.read_register(2, 0)
+        return self.cached_register("target_setpoint")
 
     def get_calculated_error(self):
         """Return the error PV-SP"""
@@ -261,7 +282,7 @@ class eurotherm_3216( minimalmodbus.Instrument ):
     
     def get_working_setpoint(self):
         """readonly. Return the (working) setpoint (SP)."""
-        return self.read_register(5, 0)
+        return self.cached_register("working_setpoint")
     
     def set_sp1(self, value):
         """Set the SP1.
@@ -348,7 +369,7 @@ class eurotherm_3216( minimalmodbus.Instrument ):
     
     def get_setpoint_rate(self):
         """Return the setpoint (SP) change rate. RR. degree/min. 0==Off (means no rate limit)"""
-        return self.read_register(35, 2)   
+        return self.cached_register("setpoint_rate")
     
     def set_setpoint_rate(self, value):
         """Set the setpoint (SP) change rate. RR.
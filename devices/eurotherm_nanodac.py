@@ -21,13 +21,15 @@
 import minimalmodbus
 import time
 
-class eurotherm_nanodac( minimalmodbus.Instrument ):
+from eurotherm_registers import register_snapshot, LOOP1_REGISTER_MAP, LOOP1_SNAPSHOT_REGISTERS
+
+class eurotherm_nanodac( register_snapshot, minimalmodbus.Instrument ):
     """Instrument class for Eurotherm 3500 process controller. 
     
     Communicates via Modbus RTU protocol (via RS232 or RS485), using the *MinimalModbus* Python module.    
 
     Args:
-        * portname (str): port name
+        * portname (str): port name, or tcp://host (tcp://host:port) for Modbus TCP over Ethernet
         * slaveaddress (int): slave address in the range 1 to 247
 
     Implemented with these function codes (in decimal):
@@ -41,15 +43,20 @@ class eurotherm_nanodac( minimalmodbus.Instrument ):
 
     """
     
+    register_map = LOOP1_REGISTER_MAP
+    snapshot_registers = LOOP1_SNAPSHOT_REGISTERS
+    max_block = 125
+    
     def __init__(self, portname, slaveaddress=1):
         minimalmodbus.Instrument.__init__(self, portname, slaveaddress)
+        self.init_snapshot_cache()
         self.room_temperature = 23
         
     ## Process value
     
     def get_pv_loop1(self):
         """Return the process value (PV) for loop1."""
-        return self.read_register(289, 1)
+        return self.cached_register("pv_loop1")
     
     def get_pv_loop2(self):
         """Return the process value (PV) for loop2."""
@@ -71,17 +78,17 @@ class eurotherm_nanodac( minimalmodbus.Instrument ):
     
     def is_manual_loop1(self):
         """Return True if loop1 is in manual mode."""
-        return self.read_register(273, 1) > 0
+        return self.cached_register("manual_loop1") > 0
     
     ## Setpoint
     
     def get_sptarget_loop1(self):
         """Return the setpoint (SP) target for loop1."""
-        return self.read_register(2, 1)
+        return self.cached_register("sptarget_loop1")
     
     def get_sp_loop1(self):
         """Return the (working) setpoint (SP) for loop1."""
-        return self.read_register(5, 1)
+        return self.cached_register("sp_loop1")
     
     def set_sp_loop1(self, value):
         """Set the SP1 for loop1.
@@ -101,7 +108,7 @@ class eurotherm_nanodac( minimalmodbus.Instrument ):
     
     def get_sprate_loop1(self):
         """Return the setpoint (SP) change rate for loop1."""
-        return self.read_register(35, 1)   
+        return self.cached_register("sprate_loop1")
     
     def set_sprate_loop1(self, value):
         """Set the setpoint (SP) change rate for loop1.
@@ -133,11 +140,11 @@ class eurotherm_nanodac( minimalmodbus.Instrument ):
     
     def get_op_loop1(self):
         """Return the output value (OP) for loop1 (in %)."""
-        return self.read_register(85, 1)
+        return self.cached_register("op_loop1")
    
     def is_inhibited_loop1(self):
         """Return True if Loop1 is inhibited."""
-        return self.read_register(268, 1) > 0
+        return self.cached_register("inhibit_loop1") > 0
 
     def get_op_loop2(self):
         """Return the output value (OP) for loop2 (in %)."""
@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Unified measurement software UMS
+# New measurement software for the electrochemical materials group, Prof. Jennifer Rupp
+#
+# Copyright (c) 2013 Reto Pfenninger, department of materials, D-MATL, ETH Zürich
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Setpoint programmer of the Eurotherm 2400 series controllers.
+#
+# Instead of rewriting the setpoint and the ramp rate from the PC at every
+# step of a temperature profile, the whole ramp/dwell table is written into
+# one of the programs of the controller and started there. The controller runs
+# the profile on its own (also when the PC or the serial line hangs), the PC
+# only reads the program status, segment number and remaining times once in a
+# while.
+#
+# Program data area of the 2400 series (communications handbook): program n
+# starts at 8192+136*n with its general data (holdback, ramp units, dwell
+# units, cycles), segment m of it at 8192+136*n+8*m with 8 registers each
+# (segment type, target setpoint, ramp rate, duration, ...). Program 0 is the
+# program which is running. Segments are written with one function code 16
+# request per 15 segments, the end segment is added if the table is shorter
+# than MAX_SEGMENTS.
+
+import time
+
+PROGRAM_BASE = 8192
+PROGRAM_SIZE = 136
+SEGMENT_SIZE = 8
+MAX_SEGMENTS = 16
+SEGMENTS_PER_WRITE = 15 # 120 registers, one write_registers call can take 123
+
+# general data of a program
+RAMP_UNITS = 2
+DWELL_UNITS = 3
+PROGRAM_CYCLES = 4
+PER_MINUTE = 1 # ramp units: 0 per second, 1 per minute, 2 per hour
+MINUTES = 1 # dwell units: 0 seconds, 1 minutes, 2 hours
+
+# segment types, like get_current_segment_type()
+END = 0
+RAMP_RATE = 1
+RAMP_TIME = 2
+DWELL = 3
+STEP = 4
+
+# program status (read at 23) and programmer state (written at 57)
+RESET = 1
+RUN = 2
+HOLD = 4
+HOLDBACK = 8
+COMPLETE = 16
+PROGRAM_NUMBER_REGISTER = 22
+PROGRAM_STATE_REGISTER = 57
+
+PROGRESS_REGISTERS = ("program_number", "program_status", "segment_number", "segment_type",
+                      "segment_time_remaining", "program_time_remaining", "program_cycles_remaining")
+
+
+def ramp(target, rate):
+    """Ramp segment to target (degrees) with rate (degrees per minute)."""
+    return (RAMP_RATE, target, rate, 0)
+
+def ramp_time(target, minutes):
+    """Ramp segment which reaches target after minutes."""
+    return (RAMP_TIME, target, 0, minutes)
+
+def dwell(minutes):
+    """Dwell segment, holds the setpoint for minutes."""
+    return (DWELL, 0, 0, minutes)
+
+def step(target):
+    """Step segment, jumps to target."""
+    return (STEP, target, 0, 0)
+
+def ramp_dwell_profile(temperature_values, ramp_rates, stabilization_times):
+    """Segment table for the arguments of ums.sintering (dwell times in seconds)."""
+    segments = []
+    for i, T_set in enumerate(temperature_values):
+        segments.append(ramp(T_set, ramp_rates[min(i, len(ramp_rates)-1)]))
+        stabilization_time = stabilization_times[min(i, len(stabilization_times)-1)]
+        if stabilization_time > 0:
+            segments.append(dwell(stabilization_time/60.0))
+    return segments
+
+def _scaled(value, decimals):
+    return int(round(value*10**decimals)) & 0xFFFF # negative values in two's complement
+
+
+class setpoint_programmer:
+    """Mixin for the Eurotherm drivers with register_snapshot, for their setpoint programmer.
+
+    The target setpoints are written with the decimals of "pv", the ramp rates
+    with those of "setpoint_rate" and the durations with those of
+    "segment_time_remaining" in the register map. A driver without a program
+    data area over Modbus sets program_base to None.
+
+    """
+    program_base = PROGRAM_BASE
+
+    def program_address(self, number, segment=0):
+        if self.program_base is None:
+            raise ValueError("The setpoint programmer of this controller can not be written over Modbus")
+        if not 0 <= segment <= MAX_SEGMENTS:
+            raise ValueError("Segment number out of range: "+str(segment))
+        return self.program_base+PROGRAM_SIZE*number+SEGMENT_SIZE*segment
+
+    def segment_registers(self, segment):
+        segment_type, target, rate, duration = segment
+        values = [0]*SEGMENT_SIZE
+        values[0] = segment_type
+        values[1] = _scaled(target, self.register_map["pv"][1])
+        values[2] = _scaled(rate, self.register_map["setpoint_rate"][1])
+        values[3] = _scaled(duration, self.register_map["segment_time_remaining"][1])
+        return values
+
+    def upload_program(self, segments, number=1, cycles=1):
+        """Write a ramp/dwell table into a program of the controller.
+
+        The programmer is reset first, a running program can not be changed.
+
+        Args:
+            segments (list): Segments made with ramp(), ramp_time(), dwell() and step()
+            number (int): Program number
+            cycles (int): How often the program runs, 0 means forever
+        """
+        segments = list(segments)
+        if len(segments) > MAX_SEGMENTS:
+            raise ValueError("The programmer has only "+str(MAX_SEGMENTS)+" segments, not "+str(len(segments)))
+        if len(segments) < MAX_SEGMENTS:
+            segments.append((END, 0, 0, 0))
+        self.reset_program()
+        self.write_registers(self.program_address(number)+RAMP_UNITS, [PER_MINUTE, MINUTES, cycles])
+        for first in range(0, len(segments), SEGMENTS_PER_WRITE):
+            values = []
+            for segment in segments[first:first+SEGMENTS_PER_WRITE]:
+                values.extend(self.segment_registers(segment))
+            self.write_registers(self.program_address(number, first+1), values)
+
+    def run_program(self, number=1):
+        """Select a program and start it."""
+        self.write_register(PROGRAM_NUMBER_REGISTER, number, 0)
+        self.write_register(PROGRAM_STATE_REGISTER, RUN, 0)
+
+    def hold_program(self):
+        """Hold the running program at its current setpoint."""
+        self.write_register(PROGRAM_STATE_REGISTER, HOLD, 0)
+
+    def reset_program(self):
+        """Stop the program, the controller goes back to its normal setpoint."""
+        self.write_register(PROGRAM_STATE_REGISTER, RESET, 0)
+
+    def program_progress(self):
+        """Return program number, status, segment and remaining times with two block reads."""
+        return self.snapshot(PROGRESS_REGISTERS)
+
+    def wait_for_program(self, interval=30, callback=None):
+        """Poll the progress every interval seconds until the program is complete or reset.
+
+        Args:
+            interval (float): Seconds between the reads
+            callback: Called with the dict of program_progress() after every read
+
+        Returns:
+            The last program_progress()
+        """
+        while True:
+            progress = self.program_progress()
+            if callback is not None:
+                callback(progress)
+            if progress["program_status"] in (RESET, COMPLETE):
+                return progress
+            time.sleep(interval)
@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Unified measurement software UMS
+# New measurement software for the electrochemical materials group, Prof. Jennifer Rupp
+#
+# Copyright (c) 2013 Reto Pfenninger, department of materials, D-MATL, ETH Zürich
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Register maps and block reads for the Eurotherm controllers.
+#
+# Every parameter of a Eurotherm controller is available twice: as scaled
+# 16 bit integer at its parameter address, and as IEEE-754 float (two
+# registers, high word first) at 0x8000+2*address. A register map lists the
+# parameters a driver uses by name. snapshot() reads a set of them with as few
+# read_registers calls as possible: the addresses are sorted and merged into
+# one block as long as the unused registers in between are cheaper to transfer
+# than another round trip (max_gap) and the block is not longer than the
+# controller accepts (max_block). Scaled and IEEE registers never end up in the
+# same block.
+#
+# Over Modbus TCP all blocks of a snapshot are requested at once (see
+# minimalmodbus.Instrument.read_register_blocks).
+#
+# cached_register() keeps values for snapshot_max_age seconds. When they are
+# older, it reads the parameters which were asked for since the last read
+# together with the one which is wanted now, so the get_pv(), get_op() ...
+# calls of one loop iteration cost one or two Modbus transactions together
+# instead of one each, and a loop which only calls get_pv() reads only the PV
+# like before. Every write_register clears the cache.
+
+import struct
+import time
+
+import minimalmodbus
+
+IEEE_REGION = 0x8000
+MAX_BLOCK = 32 # registers per read, the 2000 series can not do more
+MAX_GAP = 16 # unused registers which are read to save a transaction
+
+
+def reg(address, decimals=0, signed=False, ieee=False):
+    return (address, decimals, signed, ieee)
+
+# loop 1 of the 3500 and the nanodac, which have the same addresses
+LOOP1_REGISTER_MAP = {
+    "sptarget_loop1": reg(2, 1),
+    "sp_loop1": reg(5, 1),
+    "sprate_loop1": reg(35, 1),
+    "op_loop1": reg(85, 1),
+    "inhibit_loop1": reg(268, 1),
+    "manual_loop1": reg(273, 1),
+    "pv_loop1": reg(289, 1),
+    }
+LOOP1_SNAPSHOT_REGISTERS = ("sptarget_loop1", "sp_loop1", "sprate_loop1", "op_loop1", "inhibit_loop1", "manual_loop1", "pv_loop1")
+
+def modbus_range(entry): # (first register, number of registers)
+    address, decimals, signed, ieee = entry
+    if ieee:
+        return (IEEE_REGION+2*address, 2)
+    return (address, 1)
+
+def plan_blocks(register_map, names, max_gap=MAX_GAP, max_block=MAX_BLOCK):
+    # returns [(start, count, [(name, offset), ...]), ...] with the minimum
+    # number of blocks for max_gap and max_block
+    ranges = sorted([modbus_range(register_map[name])+(name,) for name in set(names)])
+    blocks = []
+    for start, width, name in ranges:
+        if blocks:
+            block = blocks[-1]
+            end = block[0]+block[1]
+            same_region = (start >= IEEE_REGION) == (block[0] >= IEEE_REGION)
+            if same_region and start-end <= max_gap and max(end, start+width)-block[0] <= max_block:
+                block[1] = max(end, start+width)-block[0]
+                block[2].append((name, start-block[0]))
+                continue
+        blocks.append([start, width, [(name, 0)]])
+    return [(start, count, members) for start, count, members in blocks]
+
+def decode(entry, registers, offset):
+    address, decimals, signed, ieee = entry
+    if ieee:
+        return struct.unpack(">f", struct.pack(">HH", registers[offset], registers[offset+1]))[0]
+    value = registers[offset]
+    if signed and value >= 0x8000:
+        value -= 0x10000
+    if decimals == 0:
+        return value
+    return value/float(10**decimals)
+
+
+class register_snapshot:
+    """Mixin for the Eurotherm drivers (before minimalmodbus.Instrument in the bases).
+
+    The driver sets register_map (name -> reg(...)) and snapshot_registers, the
+    parameters which cached_register() may read together.
+
+    """
+    register_map = {}
+    snapshot_registers = ()
+    snapshot_max_age = 0.5 # seconds, shorter than one iteration of the measurement loops
+    max_gap = MAX_GAP
+    max_block = MAX_BLOCK
+
+    def init_snapshot_cache(self):
+        self.snapshot_values = {}
+        self.snapshot_time = 0
+        self.snapshot_plans = {}
+        self.snapshot_requested = set() # names asked for since the last read
+
+    def invalidate_snapshot(self):
+        """Forget the cached values, the next read goes to the controller."""
+        self.snapshot_values = {}
+        self.snapshot_time = 0
+
+    def snapshot(self, names=None):
+        """Read several parameters with as few block reads as possible.
+
+        Args:
+            names (list of str): Names from the register map, defaults to snapshot_registers
+
+        Returns:
+            A dict name -> value. The values are also kept in the cache.
+        """
+        if names is None:
+            names = self.snapshot_registers
+        names = tuple(names)
+        if names not in self.snapshot_plans:
+            self.snapshot_plans[names] = plan_blocks(self.register_map, names, self.max_gap, self.max_block)
+        plan = self.snapshot_plans[names]
+        res = {}
+        blocks = self.read_register_blocks([(start, count) for start, count, members in plan])
+        for (start, count, members), registers in zip(plan, blocks):
+            for name, offset in members:
+                res[name] = decode(self.register_map[name], registers, offset)
+        if tuple(self.snapshot_registers) == names:
+            self.snapshot_values = res
+            self.snapshot_time = time.time()
+        return res
+
+    def cached_register(self, name):
+        """Return one parameter of the register map, from the cache if it is recent enough."""
+        if name not in self.snapshot_registers:
+            return self.snapshot([name])[name]
+        if time.time()-self.snapshot_time > self.snapshot_max_age:
+            # a new loop iteration: read what the last one wanted, on a cold cache only name
+            names = sorted(self.snapshot_requested | set([name]))
+            self.snapshot_values = self.snapshot(names)
+            self.snapshot_time = time.time()
+            self.snapshot_requested = set()
+        elif name not in self.snapshot_values:
+            self.snapshot_values.update(self.snapshot([name]))
+        self.snapshot_requested.add(name)
+        return self.snapshot_values[name]
+
+    def write_register(self, registeraddress, value, numberOfDecimals=0, functioncode=16, signed=False):
+        self.invalidate_snapshot()
+        minimalmodbus.Instrument.write_register(self, registeraddress, value, numberOfDecimals, functioncode, signed)
+
+    def write_registers(self, registeraddress, values):
+        self.invalidate_snapshot()
+        minimalmodbus.Instrument.write_registers(self, registeraddress, values)
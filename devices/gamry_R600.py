@@ -88,6 +88,24 @@ class gamry_R600:
         return
         
 
+    def wait_until_ready(self, timeout=60):
+        # The server handles one command after the other and only gets to RDY
+        # when the Gamry object of CIO (or the setup of SIM) is done. True once
+        # it has a Gamry object, False if it failed or timeout passed.
+        deadline = time.time()+timeout
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(timeout)
+            sock.connect((self.host, self.host_listening_port))
+            sock.sendall("RDY")
+            sock.settimeout(max(deadline-time.time(), 0.1))
+            answer = sock.recv(2)
+        except socket.error:
+            answer = ""
+        finally:
+            sock.close()
+        return answer == "OK"
+
     def setup_impedance_measurement(self, cycle_min=5, cycle_max=10, speed=1, zmod=1000000, bias=0):
         # Create a TCP/IP socket
         test_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -26,25 +26,21 @@ import numpy as np
 import os
 import sys
 import datetime
-from prologix_GPIB_ethernet import prologix_ethernet
+import prologix_broker
+import keithley_readings
 
-class keithley_2000:
+class keithley_2000(keithley_readings.scan_readings):
     def __init__(self,device_file,address):
         try:
-            if "/" not in device_file: # means it is not a path to /dev/xxx
-                self.using_GPIB_to_Ethernet = True
-                self.device = prologix_ethernet(device_file)
-            else:
-                self.device = open(device_file, "w+")
-                self.using_GPIB_to_Ethernet = False
+            # one connection per adapter is shared by all instruments on it
+            self.device = prologix_broker.get_handle(device_file, address, eoi=1, eos=3) # Indicate End-of-data, dont append anything
+            self.using_GPIB_to_Ethernet = self.device.using_GPIB_to_Ethernet
         except:
             return -1
         self.debug = False
-        self.write_to_dev("++mode 1")
-        self.write_to_dev("++addr " + str(address))
-        self.write_to_dev("++auto 0")
-        self.write_to_dev("++eos 3") # Dont append anything 0=CRLF 1=CR 2=LF 3=None
-        self.write_to_dev("++eoi 1") # Indicate End-of-data
+        self.init_readings(("READ",))
+        self.poll_status_byte = True # wait for the answer with serial polls
+        self.query_timeout = 2.0 # longest measurement (NPLC 10, filter on)
         self.write_to_dev("*RST") # reset device
         self.write_to_dev("SYST:BEEP:STAT OFF") # stop beeper on 110 error
         time.sleep(1.0)
@@ -56,28 +52,29 @@ class keithley_2000:
         #time.sleep(0.5)
         return
 
-    def read_from_dev(self):
-        self.write_to_dev("++read eoi\n")
-        if self.using_GPIB_to_Ethernet:
-            a = self.device.read()
+    def read_from_dev(self, n_bytes=None):
+        if n_bytes is not None: # binary answer, may contain line feeds
+            a = self.device.read_binary(n_bytes)
         else:
-            a = self.device.readline()
+            a = self.device.read() # ++read eoi and the answer in one transaction
         if self.debug:
             print a
         return a
         
-    def query(self, string):
+    def query(self, string, n_bytes=None):
         self.write_to_dev(string)
-        return self.read_from_dev()
+        if self.poll_status_byte:
+            self.device.wait_for_message(self.query_timeout)
+        return self.read_from_dev(n_bytes)
         
     def get_id(self):
         return "keithley_2000"
         
     def checkError(self):
         self.write_to_dev("SYST:ERR?")
-        self.write_to_dev("++read eoi")
-        print self.read_from_dev()
-        return self.read_from_dev()
+        error = self.read_from_dev() # the broker sends ++read eoi itself
+        print error
+        return error
         
     def setup_scan_channels(self,ch,num_measurements):
         self.write_to_dev("SYST:BEEP:STAT OFF") # stop beeper on 110 error
@@ -198,11 +195,11 @@ class keithley_2000:
         
     def reset(self):
         self.write_to_dev("*RST") # reset device
+        self.reading_format_sent = False
         return
         
-    def get_value(self):
-        A = [float(self.query("READ?")),time.time()]
-        return A # initiate + request READ?
+    def get_value(self): # needed for compatibility
+        return keithley_readings.value_and_time(self.get_readings())
         
     def close(self):
         return self.device.close()
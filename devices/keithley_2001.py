@@ -26,17 +26,15 @@ import numpy as np
 import os
 import sys
 import datetime
-from prologix_GPIB_ethernet import prologix_ethernet
+import prologix_broker
+import keithley_readings
 
-class keithley_2001:
+class keithley_2001(keithley_readings.scan_readings):
     def __init__(self,device_file,address):
         try:
-            if "/" not in device_file: # means it is not a path to /dev/xxx
-                self.using_GPIB_to_Ethernet = True
-                self.device = prologix_ethernet(device_file)
-            else:
-                self.device = open(device_file, "w+")
-                self.using_GPIB_to_Ethernet = False
+            # one connection per adapter is shared by all instruments on it
+            self.device = prologix_broker.get_handle(device_file, address, eoi=1, eos=3) # Indicate End-of-data, dont append anything
+            self.using_GPIB_to_Ethernet = self.device.using_GPIB_to_Ethernet
         except:
             return -1
         #self.write_to_dev("++mode 1")
@@ -49,11 +47,7 @@ class keithley_2001:
         self.nplc = 1 # number of power line cycles
         self.channel_setup_done = False
         self.debug = False
-        self.write_to_dev("++mode 1")
-        self.write_to_dev("++addr " + str(address))
-        self.write_to_dev("++auto 0")
-        self.write_to_dev("++eos 3") # Dont append anything 0=CRLF 1=CR 2=LF 3=None
-        self.write_to_dev("++eoi 1") # Indicate End-of-data
+        self.init_readings(("READ", "TST", "CHAN"))
         self.write_to_dev("*RST") # reset device
         time.sleep(1.0)
 
@@ -64,28 +58,27 @@ class keithley_2001:
         #time.sleep(1)
         return
 
-    def read_from_dev(self):
-        self.write_to_dev("++read eoi\n")
-        if self.using_GPIB_to_Ethernet:
-            a = self.device.read()
+    def read_from_dev(self, n_bytes=None):
+        if n_bytes is not None: # binary answer, may contain line feeds
+            a = self.device.read_binary(n_bytes)
         else:
-            a = self.device.readline()
+            a = self.device.read() # ++read eoi and the answer in one transaction
         if self.debug:
             print a
         return a
         
-    def query(self, string):
+    def query(self, string, n_bytes=None):
         self.write_to_dev(string)
-        return self.read_from_dev()
+        return self.read_from_dev(n_bytes)
         
     def get_id(self):
         return "keithley_2001"
         
     def checkError(self):
         self.write_to_dev("SYST:ERR?")
-        self.write_to_dev("++read eoi")
-        print self.read_from_dev()
-        return self.read_from_dev()
+        error = self.read_from_dev() # the broker sends ++read eoi itself
+        print error
+        return error
         
     def setup_temperature_measurement(self,sensor="K",slot=None,channel=None,nplc=5):
         internal_temperature = 23
@@ -208,87 +201,13 @@ class keithley_2001:
         
     def reset(self):
         self.write_to_dev("*RST") # reset device
+        self.reading_format_sent = False
         return
         
     def get_value(self): # needed for compatibility
-        scpi_array = self.parse_scpi_channel_string(self.slot,self.channel)
         if self.slot is None:
-            answer_from_keithley = self.query("READ?")
-        else:
-            answer_from_keithley = self.query("TRAC:DATA?")
-        a = answer_from_keithley.split(',')
-        print a
-        res = [[0,0,0] for i in range(len(self.channel))]
-        j = 0
-        if self.what_is_measured is "temperature":
-            for i in range(len(self.channel)):
-                if self.test_for_overflow(a[j]):
-                    g = 0.0
-                else:
-                    g = a[j][0:-2]
-                if i == range(len(self.channel))[-1]:
-                    res[i] = [float(g),float(a[j+1][0:-4]),float(a[j+2][0:-6])] # last value has an additional "\n" at the end
-                else:
-                    res[i] = [float(g),float(a[j+1][0:-4]),float(a[j+2][0:-5])]
-                j = j+3
-        elif self.what_is_measured is "voltage":
-            for i in range(len(self.channel)):
-                if self.test_for_overflow(a[j]):
-                    g = 0.0
-                else:
-                    g = a[j][0:-3]
-                if i == range(len(self.channel))[-1]:
-                    res[i] = [float(g),float(a[j+1][0:-4]),float(a[j+2][0:-6])] # last value has an additional "\n" at the end
-                else:
-                    res[i] = [float(g),float(a[j+1][0:-4]),float(a[j+2][0:-5])]
-                j = j+3
-        elif self.what_is_measured is "current":
-            for i in range(len(self.channel)):
-                if self.test_for_overflow(a[j]):
-                    g = 0.0
-                else:
-                    g = a[j][0:-3]
-                if i == range(len(self.channel))[-1]:
-                    res[i] = [float(g),float(a[j+1][0:-4]),float(a[j+2][0:-6])] # last value has an additional "\n" at the end
-                else:
-                    res[i] = [float(g),float(a[j+1][0:-4]),float(a[j+2][0:-5])]
-                j = j+3
-        elif self.what_is_measured is "2w_resistance":
-            for i in range(len(self.channel)):
-                if self.test_for_overflow(a[j]):
-                    g = 0.0
-                else:
-                    g = a[j][0:-3]
-                if i == range(len(self.channel))[-1]:
-                    res[i] = [float(g),float(a[j+1][0:-4]),float(a[j+2][0:-6])] # last value has an additional "\n" at the end
-                else:
-                    res[i] = [float(g),float(a[j+1][0:-4]),float(a[j+2][0:-5])]
-                j = j+3
-        elif self.what_is_measured is "4w_resistance":
-            for i in range(len(self.channel)):
-                if self.test_for_overflow(a[j]):
-                    g = 0.0
-                else:
-                    g = a[j][0:-3]
-                if i == range(len(self.channel))[-1]:
-                    res[i] = [float(g),float(a[j+1][0:-4]),float(a[j+2][0:-6])] # last value has an additional "\n" at the end
-                else:
-                    res[i] = [float(g),float(a[j+1][0:-4]),float(a[j+2][0:-5])]
-                j = j+3
-        elif self.what_is_measured is "frequency":
-            for i in range(len(self.channel)):
-                if self.test_for_overflow(a[j]):
-                    g = 0.0
-                else:
-                    g = a[j][0:-2]
-                if i == range(len(self.channel))[-1]:
-                    res[i] = [float(g),float(a[j+1][0:-4]),float(a[j+2][0:-6])] # last value has an additional "\n" at the end
-                else:
-                    res[i] = [float(g),float(a[j+1][0:-4]),float(a[j+2][0:-5])]
-                j = j+3
-        if len(res) == 1:
-            return [res[0][0],time.time()]
-        return [[res[i][0] for i in range(len(res))],time.time()]
+            return keithley_readings.value_and_time(self.get_readings())
+        return keithley_readings.value_and_time(self.get_readings("TRAC:DATA?")) # scan mode, the readings are in the buffer
         
     def setup_scan_channels(self,slot,channel,num_measurements=1):
         self.slot = slot
@@ -296,9 +215,11 @@ class keithley_2001:
         self.channel_setup_done = True
         if slot is None or channel is None:
             self.channel = [1] # To make get_value() work
+            self.n_readings = 1
             return
         scpi_array = self.parse_scpi_channel_string(slot,channel)
         total_number_of_channels_to_scan = len(slot)*len(channel)
+        self.n_readings = total_number_of_channels_to_scan
         self.nplc_delay_time = self.nplc_delay_time+0.2*(self.nplc_delay_time*total_number_of_channels_to_scan*num_measurements)
         self.write_to_dev("TRAC:CLE")
         self.write_to_dev("TRAC:FEED SENS1")
@@ -26,32 +26,24 @@ import numpy as np
 import os
 import sys
 import datetime
-from prologix_GPIB_ethernet import prologix_ethernet
+import prologix_broker
 
 class keithley_2182A:
     def __init__(self,device_file,address):
         try:
-            if "/" not in device_file: # means it is not a path to /dev/xxx
-                self.using_GPIB_to_Ethernet = True
-                self.device = prologix_ethernet(device_file)
-            else:
-                self.device = open(device_file, "w+")
-                self.using_GPIB_to_Ethernet = False
+            # one connection per adapter is shared by all instruments on it
+            self.device = prologix_broker.get_handle(device_file, address, eoi=1, eos=3) # Indicate End-of-data, dont append anything
+            self.using_GPIB_to_Ethernet = self.device.using_GPIB_to_Ethernet
         except:
             return -1
         self.debug = True
-        self.write_to_dev("++mode 1")
-        self.write_to_dev("++addr " + str(address))
-        self.write_to_dev("++auto 0")
-        self.write_to_dev("++eos 3") # Dont append anything 0=CRLF 1=CR 2=LF 3=None
-        self.write_to_dev("++eoi 1") # Indicate End-of-data
+        self.poll_status_byte = True # wait for the answer with serial polls, nplc_delay_time is only the timeout
         #self.write_to_dev("CAL:UNPR:ACAL:INIT") # prepare for calibration
         #time.sleep(2.0)
         #self.write_to_dev("CAL:UNPR:ACAL:STEP2") # prepare for 10mV range calibration
         #time.sleep(5.0)
         #self.write_to_dev("CAL:UNPR:ACAL:DONE") # prepare for 10mV range calibration
         self.nplc_delay_time = 0.1
-        time.sleep(1.0)
 
     def write_to_dev(self, string):
         if self.debug:
@@ -61,18 +53,17 @@ class keithley_2182A:
         return
 
     def read_from_dev(self):
-        self.write_to_dev("++read eoi\n")
-        if self.using_GPIB_to_Ethernet:
-            a = self.device.read()
-        else:
-            a = self.device.readline()
+        a = self.device.read() # ++read eoi and the answer in one transaction
         if self.debug:
             print a
         return a
         
     def query(self, string):
         self.write_to_dev(string)
-        time.sleep(self.nplc_delay_time)
+        if self.poll_status_byte:
+            self.device.wait_for_message(self.nplc_delay_time)
+        else:
+            time.sleep(self.nplc_delay_time)
         print "NPLC is",self.nplc_delay_time
         return self.read_from_dev()
         
@@ -81,9 +72,9 @@ class keithley_2182A:
         
     def checkError(self):
         self.write_to_dev("SYST:ERR?")
-        self.write_to_dev("++read eoi")
-        print self.read_from_dev()
-        return self.read_from_dev()
+        error = self.read_from_dev() # the broker sends ++read eoi itself
+        print error
+        return error
         
     def set_nplc(self,nplc,current=False):
         if nplc == 0.01:
@@ -26,8 +26,9 @@ import os
 import sys
 import datetime
 import socket
+import keithley_readings
 
-class keithley_2701:
+class keithley_2701(keithley_readings.scan_readings):
     def __init__(self, host):
         self.host = host
         self.io_timeout = 2
@@ -39,6 +40,7 @@ class keithley_2701:
         self.nplc = 1 # number of power line cycles
         self.channel_setup_done = False
         self.debug = False
+        self.init_readings(("READ", "TST", "CHAN"))
         self.nplc_delay_time = self.nplc/50.0+self.io_timeout*0.001+self.lock_timeout*0.001+0.01
         # Create a TCP/IP socket
         self.device = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -50,80 +52,8 @@ class keithley_2701:
         
 
     def get_value(self): # needed for compatibility
-        answer_from_keithley = self.query("READ?")
-        a = answer_from_keithley.split(',')
-        res = [[0,0,0] for i in range(len(self.channel))]
-        j = 0
-        if self.what_is_measured is "temperature":
-            for i in range(len(self.channel)):
-                if self.test_for_overflow(a[j]):
-                    g = 0.0
-                else:
-                    g = a[j][0:-2]
-                if i == range(len(self.channel))[-1]:
-                    res[i] = [float(g),float(a[j+1][0:-4]),float(a[j+2][0:-6])] # last value has an additional "\n" at the end
-                else:
-                    res[i] = [float(g),float(a[j+1][0:-4]),float(a[j+2][0:-5])]
-                j = j+3
-        elif self.what_is_measured is "voltage":
-            for i in range(len(self.channel)):
-                if self.test_for_overflow(a[j]):
-                    g = 0.0
-                else:
-                    g = a[j][0:-3]
-                if i == range(len(self.channel))[-1]:
-                    res[i] = [float(g),float(a[j+1][0:-4]),float(a[j+2][0:-6])] # last value has an additional "\n" at the end
-                else:
-                    res[i] = [float(g),float(a[j+1][0:-4]),float(a[j+2][0:-5])]
-                j = j+3
-        elif self.what_is_measured is "current":
-            for i in range(len(self.channel)):
-                if self.test_for_overflow(a[j]):
-                    g = 0.0
-                else:
-                    g = a[j][0:-3]
-                if i == range(len(self.channel))[-1]:
-                    res[i] = [float(g),float(a[j+1][0:-4]),float(a[j+2][0:-6])] # last value has an additional "\n" at the end
-                else:
-                    res[i] = [float(g),float(a[j+1][0:-4]),float(a[j+2][0:-5])]
-                j = j+3
-        elif self.what_is_measured is "2w_resistance":
-            for i in range(len(self.channel)):
-                if self.test_for_overflow(a[j]):
-                    g = 0.0
-                else:
-                    g = a[j][0:-3]
-                if i == range(len(self.channel))[-1]:
-                    res[i] = [float(g),float(a[j+1][0:-4]),float(a[j+2][0:-6])] # last value has an additional "\n" at the end
-                else:
-                    res[i] = [float(g),float(a[j+1][0:-4]),float(a[j+2][0:-5])]
-                j = j+3
-        elif self.what_is_measured is "4w_resistance":
-            for i in range(len(self.channel)):
-                if self.test_for_overflow(a[j]):
-                    g = 0.0
-                else:
-                    g = a[j][0:-3]
-                if i == range(len(self.channel))[-1]:
-                    res[i] = [float(g),float(a[j+1][0:-4]),float(a[j+2][0:-6])] # last value has an additional "\n" at the end
-                else:
-                    res[i] = [float(g),float(a[j+1][0:-4]),float(a[j+2][0:-5])]
-                j = j+3
-        elif self.what_is_measured is "frequency":
-            for i in range(len(self.channel)):
-                if self.test_for_overflow(a[j]):
-                    g = 0.0
-                else:
-                    g = a[j][0:-2]
-                if i == range(len(self.channel))[-1]:
-                    res[i] = [float(g),float(a[j+1][0:-4]),float(a[j+2][0:-6])] # last value has an additional "\n" at the end
-                else:
-                    res[i] = [float(g),float(a[j+1][0:-4]),float(a[j+2][0:-5])]
-                j = j+3
-        if len(res) == 1:
-            return [res[0][0],time.time()]
-        return [[res[i][0] for i in range(len(res))],time.time()]
-
+        return keithley_readings.value_and_time(self.get_readings())
+        
     def test_for_overflow(self, x):
         try:
             a = float(x)
@@ -176,7 +106,7 @@ class keithley_2701:
         #join all parts to make final string
         return ''.join(total_data)
         
-    def query(self, string):
+    def query(self, string, n_bytes=None): # receive_command collects the whole answer, binary or not
         self.write_to_dev(string)
         time.sleep(self.nplc_delay_time)
         return self.read_from_dev()
@@ -329,9 +259,11 @@ class keithley_2701:
         self.channel_setup_done = True
         if slot is None or channel is None:
             self.channel = [1] # To make get_value() work
+            self.n_readings = 1
             return
         scpi_array = self.parse_scpi_channel_string(slot,channel)
         total_number_of_channels_to_scan = len(slot)*len(channel)
+        self.n_readings = total_number_of_channels_to_scan
         self.nplc_delay_time = self.nplc_delay_time+0.2*(self.nplc_delay_time*total_number_of_channels_to_scan*num_measurements)
         self.write_to_dev("TRAC:CLE")
         self.write_to_dev("TRAC:CLE:AUTO OFF")
@@ -404,6 +336,7 @@ class keithley_2701:
         
     def reset(self):
         self.write_to_dev("*RST") # reset device
+        self.reading_format_sent = False
         return
         
     def close(self):
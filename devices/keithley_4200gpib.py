@@ -31,10 +31,8 @@ import datetime
 from prologix_GPIB_ethernet import prologix_ethernet
 class keithley_4200gpib:
     def __init__(self,prologic_ip,address):
-        try:
-            self.device = prologix_ethernet(prologic_ip)
-        except:
-            return -1
+        self.prologic_ip = prologic_ip
+        self.address = address
         self.compliance = 0.01
         self.source_range = 0
         self.cur_voltage = 0
@@ -43,11 +41,17 @@ class keithley_4200gpib:
         self.debug = False
         self.read_wait_time = 0.1
         self.path2dir_temp_4200 = os.path.abspath("/home/electrochem/umdata/temp_4200/")
+        try:
+            self.connect()
+        except:
+            return -1
 
+    def connect(self):
+        self.device = prologix_ethernet(self.prologic_ip)
         self.device.settimeout( 10 )
 
         self.write_to_dev("++mode 1")
-        self.write_to_dev("++addr " + str(address))
+        self.write_to_dev("++addr " + str(self.address))
         self.write_to_dev("++auto 1") # nicht automatisch auf Antwort warten
         self.write_to_dev("++eos 0") # Dont append anything 0=CRLF 1=CR 2=LF 3=None
         self.write_to_dev("++eoi 1") # Indicate End-of-data
@@ -86,9 +90,26 @@ class keithley_4200gpib:
           break
         time.sleep(0.1)
 
-    def power_on_gpib_reset(self):
+    def power_on_gpib_reset(self, timeout=10):
+        # ++rst restarts the adapter and drops the connection, it is back when
+        # a new connection answers ++ver
         self.write_to_dev('++rst')
-        time.sleep(7)
+        self.device.close()
+        deadline = time.time()+timeout
+        time.sleep(1.0)
+        while time.time() < deadline:
+            try:
+                self.connect()
+                self.device.settimeout(0.5)
+                self.write_to_dev('++ver')
+                if self.device.read():
+                    self.device.settimeout(10)
+                    return True
+            except Exception: # still restarting
+                pass
+            self.device.close()
+            time.sleep(0.5)
+        return False
      
 #here starts the keithley specific part
      
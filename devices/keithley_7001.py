@@ -26,17 +26,14 @@ import numpy as np
 import os
 import sys
 import datetime
-from prologix_GPIB_ethernet import prologix_ethernet
+import prologix_broker
 
 class keithley_7001:
     def __init__(self,device_file,address):
         try:
-            if "/" not in device_file: # means it is not a path to /dev/xxx
-                self.using_GPIB_to_Ethernet = True
-                self.device = prologix_ethernet(device_file)
-            else:
-                self.device = open(device_file, "w+")
-                self.using_GPIB_to_Ethernet = False
+            # one connection per adapter is shared by all instruments on it
+            self.device = prologix_broker.get_handle(device_file, address, eoi=1, eos=3) # Indicate End-of-data, dont append anything
+            self.using_GPIB_to_Ethernet = self.device.using_GPIB_to_Ethernet
         except:
             return -1
         #self.write_to_dev("++mode 1")
@@ -44,13 +41,8 @@ class keithley_7001:
         #self.write_to_dev("++auto 1")
         self.debug = False
         self.operations_per_second = 3
-        self.write_to_dev("++mode 1")
-        self.write_to_dev("++addr " + str(address))
-        self.write_to_dev("++auto 0")
-        self.write_to_dev("++eos 3") # Dont append anything 0=CRLF 1=CR 2=LF 3=None
-        self.write_to_dev("++eoi 1") # Indicate End-of-data
         self.write_to_dev("*RST;OPEN ALL") # reset device
-        time.sleep(1.0)
+        self.device.operation_complete(5.0) # returns as soon as the relays are open
 
     def write_to_dev(self, string):
         if self.debug:
@@ -60,11 +52,7 @@ class keithley_7001:
         return
 
     def read_from_dev(self):
-        self.write_to_dev("++read eoi\n")
-        if self.using_GPIB_to_Ethernet:
-            a = self.device.read()
-        else:
-            a = self.device.readline()
+        a = self.device.read() # ++read eoi and the answer in one transaction
         if self.debug:
             print a
         return a
@@ -78,9 +66,9 @@ class keithley_7001:
         
     def checkError(self):
         self.write_to_dev("SYST:ERR?")
-        self.write_to_dev("++read eoi")
-        print self.read_from_dev()
-        return self.read_from_dev()
+        error = self.read_from_dev() # the broker sends ++read eoi itself
+        print error
+        return error
         
     def open_channel(self,slot,channel):
         scpi_array = "(@"
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Unified measurement software UMS
+# New measurement software for the electrochemical materials group, Prof. Jennifer Rupp
+#
+# Copyright (c) 2013 Reto Pfenninger, department of materials, D-MATL, ETH Zürich
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Reading format of the Keithley DMMs (2000, 2001, 2700, 2701).
+#
+# The elements of a reading are set explicitly with FORM:ELEM (e.g.
+# READ,TST,CHAN) and the answer to READ?/DATA? of a whole scan is decoded in
+# one pass into a numpy structured array with the fields value, timestamp and
+# channel. In ASCII mode (FORM:DATA ASC) every field is cut at its first
+# non-numeric character, so unit suffixes like VDC, OHM4W, SECS or INTCHAN do
+# not matter. In binary mode (FORM:DATA SREAL) the readings come as little
+# endian IEEE-754 singles after a #0 header. The drivers get get_readings()
+# and set_reading_format() from the scan_readings mixin.
+
+import re
+import time
+
+import numpy as np
+
+READING_DTYPE = np.dtype([("value", np.float64), ("timestamp", np.float64), ("channel", np.int32)])
+ELEMENT_FIELDS = {"READ": "value", "TST": "timestamp", "CHAN": "channel"}
+OVERFLOW = 9.9e37 # the DMMs report +9.9E37 for overflow
+
+_field = re.compile(r"([-+]?[0-9]*\.?[0-9]+(?:[Ee][-+]?[0-9]+)?)[^,]*")
+
+
+class reading_format:
+    def __init__(self, elements=("READ", "TST", "CHAN"), binary=False):
+        for element in elements:
+            if element not in ELEMENT_FIELDS:
+                raise ValueError("Unknown reading element: "+str(element))
+        self.elements = tuple(elements)
+        self.binary = binary
+
+    def commands(self):
+        res = ["FORM:ELEM "+",".join(self.elements)]
+        if self.binary:
+            res.append("FORM:BORD SWAP") # little endian
+            res.append("FORM:DATA SREAL")
+        else:
+            res.append("FORM:DATA ASC")
+        return res
+
+    def binary_size(self, n_readings): # #0 header, 4 bytes per element and the terminating line feed
+        return 2+4*len(self.elements)*n_readings+1
+
+    def decode(self, answer):
+        if self.binary:
+            start = answer.find("#0")
+            if start < 0:
+                raise RuntimeError("No binary block in the answer of the DMM")
+            count = (len(answer)-start-2)//4
+            count = count-count % len(self.elements)
+            numbers = np.frombuffer(answer, dtype="<f4", count=count, offset=start+2).astype(np.float64)
+        else:
+            numbers = np.array(_field.findall(answer), dtype=np.float64)
+        if len(numbers) % len(self.elements) != 0:
+            raise RuntimeError("Got "+str(len(numbers))+" numbers from the DMM, expected a multiple of "+str(len(self.elements)))
+        numbers = numbers.reshape(-1, len(self.elements))
+        res = np.zeros(len(numbers), dtype=READING_DTYPE)
+        res["timestamp"] = np.nan
+        for k, element in enumerate(self.elements):
+            res[ELEMENT_FIELDS[element]] = numbers[:, k]
+        res["value"][np.abs(res["value"]) >= OVERFLOW] = 0.0 # like test_for_overflow did it
+        return res
+
+
+class scan_readings:
+    # Mixin for the DMM drivers, which provide write_to_dev(string) and
+    # query(string, n_bytes) and call init_readings() in __init__
+    def init_readings(self, elements):
+        self.reading_format = reading_format(elements)
+        self.reading_format_sent = False # set to False again after *RST
+        self.n_readings = 1 # readings per READ?, one per scanned channel
+
+    def get_readings(self, command="READ?", n_readings=None):
+        # all readings of one trigger as numpy array with the fields value, timestamp and channel
+        if not self.reading_format_sent:
+            for c in self.reading_format.commands():
+                self.write_to_dev(c)
+            self.reading_format_sent = True
+        if n_readings is None:
+            n_readings = self.n_readings
+        n_bytes = None
+        if self.reading_format.binary:
+            n_bytes = self.reading_format.binary_size(n_readings)
+        return self.reading_format.decode(self.query(command, n_bytes))
+
+    def set_reading_format(self, binary=False): # binary=True transfers the readings as SREAL
+        self.reading_format.binary = binary
+        self.reading_format_sent = False
+        return
+
+
+def value_and_time(readings):
+    # the format get_value() always returned: [value, time] for one channel and
+    # [[value, value, ...], time] for a scan over several channels
+    if len(readings) == 1:
+        return [float(readings["value"][0]), time.time()]
+    return [readings["value"].tolist(), time.time()]
@@ -0,0 +1,277 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Unified measurement software UMS
+# New measurement software for the electrochemical materials group, Prof. Jennifer Rupp
+#
+# Copyright (c) 2013 Reto Pfenninger, department of materials, D-MATL, ETH Zürich
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# On-instrument sweep engine for the Keithley 2601B, 2602B and 2612B.
+#
+# A tsp_program describes voltage ramps and holds on a fixed time grid
+# (step_time). It is compiled into a TSP script which is loaded with
+# loadscript and executed by the trigger model of the SMU: the source values
+# come from smuX.trigger.source.listv, a trigger timer paces the points and
+# current/voltage readings are stored in smuX.nvbuffer1/smuX.nvbuffer2.
+# After the script finished the buffers are fetched in one go, as binary
+# REAL32/REAL64 block which is decoded with numpy.frombuffer.
+#
+# Every point is one measure.iv, a current and a voltage conversion of nplc
+# power line cycles each, and it has to be done before the timer fires the
+# next point. Without nplc the program uses the longest aperture (up to 1
+# PLC) which fits into step_time, a too long nplc or step_time is rejected.
+
+import math
+
+import numpy as np
+
+TSP_DEVICES = ("keithley_2601B", "keithley_2602B", "keithley_2612B")
+BINARY_FORMATS = {"REAL32": "<f4", "REAL64": "<f8"} # format.byteorder is set to LITTLEENDIAN
+OVERFLOW = 1e30 # the SMU reports 9.91e37 for overflow
+DEFAULT_SCRIPT_NAME = "umsSweep"
+SCRIPT_DONE = "ums_done"
+LINE_FREQUENCY = 50.0 # Hz
+SETTLING_TIME = 0.002 # s per point for source settling and trigger overhead
+MIN_NPLC = 0.001
+
+
+def _smu(channel):
+    if channel in ("A", "a"):
+        return "smua"
+    elif channel in ("B", "b"):
+        return "smub"
+    raise ValueError("Unknown SMU channel: " + str(channel))
+
+def _number(value):
+    return "%.9g" % value
+
+def max_nplc(step_time):
+    # the longest aperture for which measure.iv (two conversions) fits into step_time
+    return (step_time-SETTLING_TIME)*LINE_FREQUENCY/2.0
+
+
+class tsp_program:
+    def __init__(self, step_time=0.01, nplc=None):
+        if step_time <= 0:
+            raise ValueError("step_time must be positive")
+        limit = max_nplc(step_time)
+        if limit < MIN_NPLC:
+            raise ValueError("step_time of "+str(step_time)+" s is too short for a current and a voltage measurement, it has to be at least "+str(SETTLING_TIME+2*MIN_NPLC/LINE_FREQUENCY)+" s")
+        if nplc is None:
+            nplc = min(1.0, limit)
+        elif nplc > limit:
+            raise ValueError("nplc "+str(nplc)+" does not fit into step_time "+str(step_time)+" s, use at most nplc "+("%.3g" % limit)+" or a step_time of at least "+str(SETTLING_TIME+2*nplc/LINE_FREQUENCY)+" s")
+        self.step_time = float(step_time)
+        self.nplc = nplc
+        self.pieces = {} # channel -> list of [v_start, v_stop, points, limit, tag]
+
+    def add_ramp(self, channel, v_start, v_stop, ramp_speed, limit, tag=0):
+        if ramp_speed == 0:
+            raise ValueError("ramp_speed must not be zero")
+        duration = math.fabs(v_stop-v_start)/math.fabs(ramp_speed)
+        points = int(round(duration/self.step_time))
+        if points < 1:
+            points = 1
+        self._append(channel, float(v_start), float(v_stop), points, limit, tag)
+
+    def add_hold(self, channel, voltage, duration, limit, tag=0):
+        points = int(round(duration/self.step_time))
+        if points < 1:
+            return
+        self._append(channel, float(voltage), float(voltage), points, limit, tag)
+
+    def _append(self, channel, v_start, v_stop, points, limit, tag):
+        pieces = self.pieces.setdefault(channel, [])
+        pieces.append([v_start, v_stop, points, float(limit), tag])
+
+    def channels(self):
+        return sorted(self.pieces.keys())
+
+    def n_points(self, channel):
+        return sum([p[2] for p in self.pieces.get(channel, [])])
+
+    def duration(self):
+        return max([self.n_points(c) for c in self.channels()] + [0])*self.step_time
+
+    def voltages(self, channel): # the source values the SMU will output, one per step
+        res = []
+        for v_start, v_stop, points, limit, tag in self.pieces.get(channel, []):
+            k = np.arange(1, points+1, dtype=float)
+            res.append(v_start+(v_stop-v_start)*k/points)
+        if not res:
+            return np.zeros(0)
+        return np.concatenate(res)
+
+    def tags(self, channel):
+        return np.concatenate([np.repeat(p[4], p[2]) for p in self.pieces.get(channel, [])] or [np.zeros(0, dtype=int)])
+
+    def _boundaries(self):
+        # A new phase starts wherever the compliance of any channel changes or
+        # a channel runs out of points. Within a phase all active channels
+        # share the same timer and the same number of points.
+        edges = set([0])
+        for channel in self.channels():
+            index = 0
+            last_limit = None
+            for p in self.pieces[channel]:
+                if p[3] != last_limit:
+                    edges.add(index)
+                    last_limit = p[3]
+                index = index+p[2]
+            edges.add(index)
+        return sorted(edges)
+
+    def _slice(self, channel, first, last): # pieces covering the points first+1 ... last
+        res = []
+        index = 0
+        for v_start, v_stop, points, limit, tag in self.pieces[channel]:
+            a = max(first, index)
+            b = min(last, index+points)
+            if a < b:
+                va = v_start+(v_stop-v_start)*(a-index)/float(points)
+                vb = v_start+(v_stop-v_start)*(b-index)/float(points)
+                res.append([va, vb, b-a, limit])
+            index = index+points
+        return res
+
+    def phases(self):
+        edges = self._boundaries()
+        res = []
+        for first, last in zip(edges[:-1], edges[1:]):
+            phase = []
+            for channel in self.channels():
+                if self.n_points(channel) >= last:
+                    phase.append((channel, self._slice(channel, first, last)))
+            if phase:
+                res.append((last-first, phase))
+        return res
+
+    def compile(self, name=DEFAULT_SCRIPT_NAME):
+        lines = ["loadscript "+name]
+        lines.append("local function ums_points(pieces)")
+        lines.append("    local v = {}")
+        lines.append("    for _, p in ipairs(pieces) do")
+        lines.append("        for k = 1, p[3] do")
+        lines.append("            table.insert(v, p[1]+(p[2]-p[1])*k/p[3])")
+        lines.append("        end")
+        lines.append("    end")
+        lines.append("    return v")
+        lines.append("end")
+        for channel in self.channels():
+            smu = _smu(channel)
+            lines.append(smu+".measure.nplc = "+_number(self.nplc)) # the setup of ums leaves 1 PLC
+            lines.append(smu+".source.func = "+smu+".OUTPUT_DCVOLTS")
+            for buf in ("nvbuffer1", "nvbuffer2"):
+                lines.append(smu+"."+buf+".clear()")
+                lines.append(smu+"."+buf+".appendmode = 1")
+                lines.append(smu+"."+buf+".collecttimestamps = 1")
+                lines.append(smu+"."+buf+".collectsourcevalues = 1")
+            lines.append(smu+".trigger.measure.iv("+smu+".nvbuffer1, "+smu+".nvbuffer2)")
+            lines.append(smu+".trigger.measure.action = "+smu+".ENABLE")
+            lines.append(smu+".trigger.source.action = "+smu+".ENABLE")
+            lines.append(smu+".trigger.endpulse.action = "+smu+".SOURCE_HOLD")
+            lines.append(smu+".trigger.endsweep.action = "+smu+".SOURCE_HOLD")
+            lines.append(smu+".trigger.arm.count = 1")
+            lines.append(smu+".trigger.source.stimulus = trigger.timer[1].EVENT_ID")
+            lines.append(smu+".source.output = "+smu+".OUTPUT_ON")
+        phases = self.phases()
+        for n, (points, phase) in enumerate(phases):
+            smus = [_smu(channel) for channel, pieces in phase]
+            for channel, pieces in phase:
+                smu = _smu(channel)
+                table = ",".join(["{"+_number(p[0])+","+_number(p[1])+","+str(p[2])+"}" for p in pieces])
+                lines.append(smu+".trigger.source.limiti = "+_number(pieces[0][3]))
+                lines.append(smu+".trigger.source.listv(ums_points({"+table+"}))")
+                lines.append(smu+".trigger.count = "+str(points))
+            lines.append("trigger.timer[1].delay = "+_number(self.step_time))
+            lines.append("trigger.timer[1].count = "+str(max(points-1, 1)))
+            lines.append("trigger.timer[1].passthrough = true")
+            lines.append("trigger.timer[1].stimulus = "+smus[0]+".trigger.ARMED_EVENT_ID")
+            for smu in reversed(smus): # the first SMU arms the timer, so it has to be started last
+                lines.append(smu+".trigger.initiate()")
+            lines.append("waitcomplete()")
+            # switch off channels which have no points left, exactly like the host-driven loops do
+            later = [c for p, phase_later in phases[n+1:] for c, pieces in phase_later]
+            for channel, pieces in phase:
+                if channel not in later:
+                    smu = _smu(channel)
+                    lines.append(smu+".source.output = "+smu+".OUTPUT_OFF")
+        lines.append("print(\""+SCRIPT_DONE+"\")")
+        lines.append("endscript")
+        return lines
+
+
+def load_script(device, name, lines):
+    for line in lines:
+        device.write(line)
+
+def run_script(device, name, timeout):
+    if device.srq_enabled: # the interrupt channel tells us when the script printed its result
+        answer = device.ask_when_ready(name+".run()", timeout)
+    else:
+        io_timeout = device.io_timeout
+        device.io_timeout = int(math.ceil(timeout))
+        try:
+            answer = device.ask(name+".run()")
+        finally:
+            device.io_timeout = io_timeout
+    if SCRIPT_DONE not in answer:
+        raise RuntimeError("TSP script "+name+" did not finish properly: "+answer)
+    return
+
+def read_buffer(device, columns, n=None, data_format="REAL64"):
+    # columns is a list like ["smua.nvbuffer1.readings", "smua.nvbuffer1.timestamps"],
+    # all of them are printed with one printbuffer call and returned as float arrays
+    if data_format not in BINARY_FORMATS:
+        raise ValueError("data_format must be one of "+", ".join(sorted(BINARY_FORMATS.keys())))
+    dtype = np.dtype(BINARY_FORMATS[data_format])
+    if n is None:
+        n = int(float(device.ask("print("+columns[0].rsplit(".", 1)[0]+".n)")))
+    if n == 0:
+        return [np.zeros(0) for c in columns]
+    device.write("format.byteorder = format.LITTLEENDIAN")
+    device.write("format.data = format."+data_format)
+    try:
+        answer = device.ask("printbuffer(1, "+str(n)+", "+", ".join(columns)+")")
+    finally:
+        device.write("format.data = format.ASCII")
+    start = answer.find("#0") # binary block header
+    count = n*len(columns)
+    if start < 0 or len(answer)-start-2 < count*dtype.itemsize:
+        raise RuntimeError("Incomplete binary answer to printbuffer: got "+str(len(answer))+" bytes")
+    values = np.frombuffer(answer, dtype=dtype, count=count, offset=start+2).reshape(n, len(columns))
+    return [values[:, k].astype(np.float64) for k in range(len(columns))]
+
+def run_tsp_program(device, program, name=DEFAULT_SCRIPT_NAME):
+    # returns {channel: {"i": currents, "v": voltages, "t": timestamps, "tag": tags}}
+    if device.get_id() not in TSP_DEVICES:
+        raise ValueError(device.get_id()+" does not support on-instrument TSP sweeps")
+    for channel in program.channels():
+        smu = _smu(channel)
+        capacity = int(float(device.ask("print("+smu+".nvbuffer1.capacity)")))
+        if program.n_points(channel) > capacity:
+            raise ValueError("The sweep on channel "+channel+" needs "+str(program.n_points(channel))+" points but the buffer only holds "+str(capacity))
+    load_script(device, name, program.compile(name))
+    run_script(device, name, program.duration()*1.5+device.io_timeout+10)
+    res = {}
+    for channel in program.channels():
+        smu = _smu(channel)
+        i, v, t = read_buffer(device, [smu+".nvbuffer1.readings", smu+".nvbuffer2.readings", smu+".nvbuffer1.timestamps"])
+        n = len(i)
+        if n > 0:
+            t = t-t[0]
+        i[i > OVERFLOW] = 0.0 # like get_current does it
+        res[channel] = {"i": i, "v": v, "t": t, "tag": program.tags(channel)[:n]}
+    return res
@@ -22,6 +22,8 @@ import serial
 import time
 import sys
 
+import port_registry
+
 class linkam:
     """Instrument class for Linkam T-95 process controller and LNP-95 cryo controller.
     IMPORTANT: It only works with a modified RS232-cable where you connect the pins exactly like written here.
@@ -64,6 +66,7 @@ class linkam:
         self.error_info = ["Cooling rate too fast", "Open circuit", "Power surge", "No Exit at temperature >300°C", "Link error", "Not error"]
         self.pump_status_byte = ["LNP Stopped","Minimum speed (Band 1 LED on the front panel of the LNP","Maximum speed (Band 5 LED on the front panel of the LNP"]
         self.serial = serial.Serial(port=portname, baudrate=19200, parity=serial.PARITY_NONE, bytesize=8, stopbits=1, rtscts=False, timeout=0.5)
+        self.port_lock = port_registry.get_lock(portname)
         print "###########################################################################"
         print "       "+self.oven_name+" (with id: "+str(self.get_id())+")"
         print "###########################################################################"
@@ -84,8 +87,9 @@ class linkam:
         return a
         
     def query(self, string):
-        self.write_to_dev(string)
-        return self.read_from_dev()
+        with self.port_lock: # command and answer must not be split by another thread
+            self.write_to_dev(string)
+            return self.read_from_dev()
         
     def get_id(self):
         return "linkam"
@@ -42,6 +42,9 @@ import struct
 import sys
 import time
 
+import modbus_tcp
+import port_registry
+
 # Allow long also in Python3
 # http://python3porting.com/noconv.html
 if sys.version > '3':
@@ -52,7 +55,54 @@ _SECONDS_TO_MILLISECONDS = 1000
 
 # Several instrument instances can share the same serialport
 _SERIALPORTS = {}
-_LATEST_READ_TIMES = {}
+_LATEST_READ_TIMES = {} # Serial port name -> end of the latest read, in seconds of _monotonic()
+
+_PY3 = sys.version_info[0] > 2
+
+# Precompiled codecs for the frames. Only used after the arguments have been
+# validated by the public API, see _structPack() and _structUnpack().
+_STRUCT_UINT16     = struct.Struct('>H')
+_STRUCT_INT16      = struct.Struct('>h')
+_STRUCT_TWO_UINT16 = struct.Struct('>HH') # Register address + number of registers
+_STRUCT_CRC        = struct.Struct('<H')  # The CRC is sent least significant byte first
+_STRUCT_REGISTERS  = {}                   # Number of registers -> struct.Struct
+
+
+def _makeMonotonicClock():
+    """Return a function giving the seconds (float) of a monotonic clock, used for the silent period.
+
+    This is :func:`time.monotonic` on Python3, ``clock_gettime(CLOCK_MONOTONIC)`` on Linux with Python2,
+    and :func:`time.time` where neither is available. Unlike :func:`time.time` a monotonic clock does
+    not jump when the system time is adjusted (NTP).
+
+    """
+    if hasattr(time, 'monotonic'):
+        return time.monotonic
+    try:
+        import ctypes
+        import ctypes.util
+
+        CLOCK_MONOTONIC = 1  # From <linux/time.h>
+
+        class timespec(ctypes.Structure):
+            _fields_ = [('tv_sec', ctypes.c_long), ('tv_nsec', ctypes.c_long)]
+
+        librt = ctypes.CDLL(ctypes.util.find_library('rt') or 'librt.so.1')
+        clock_gettime = librt.clock_gettime
+        clock_gettime.argtypes = [ctypes.c_int, ctypes.POINTER(timespec)]
+
+        def monotonic():
+            t = timespec()
+            if clock_gettime(CLOCK_MONOTONIC, ctypes.byref(t)) != 0:
+                raise OSError('clock_gettime(CLOCK_MONOTONIC) failed')
+            return t.tv_sec + t.tv_nsec * 1e-9
+
+        monotonic()
+        return monotonic
+    except (ImportError, OSError, AttributeError):
+        return time.time
+
+_monotonic = _makeMonotonicClock()
 
 BAUDRATE = 9600
 """Default value for the baudrate in Baud (int)."""
@@ -78,17 +128,31 @@ class Instrument():
 
     Args:
         * port (str): The serial port name, for example ``/dev/ttyUSB0`` (Linux), ``/dev/tty.usbserial`` (OS X) or ``COM4`` (Windows).
+          For Modbus TCP use ``tcp://host`` or ``tcp://host:port``.
         * slaveaddress (int): Slave address in the range 1 to 247 (use decimal numbers, not hex).
+        * transport: Object with an ``execute(slaveaddress, functioncode, payload)`` method which is used instead of the serial port.
 
     """
 
-    def __init__(self, port, slaveaddress, stop_bits=STOPBITS):
-        if port not in _SERIALPORTS or not _SERIALPORTS[port]:
-            self.serial = _SERIALPORTS[port] = serial.Serial(port=port, baudrate=BAUDRATE, parity=PARITY, bytesize=BYTESIZE, stopbits=stop_bits, timeout=TIMEOUT)
+    def __init__(self, port, slaveaddress, stop_bits=STOPBITS, transport=None):
+        if transport is None and port.startswith(modbus_tcp.URL_PREFIX):
+            transport = modbus_tcp.get_transport(port)
+        self.transport = transport
+        """The transport used instead of a serial port (for example :class:`modbus_tcp.tcp_transport`), or :const:`None` for Modbus RTU."""
+
+        if transport is not None:
+            self.serial = None
+            self.port_lock = None
         else:
-            self.serial = _SERIALPORTS[port]
-            if self.serial.port is None:
-                self.serial.open() 
+            with port_registry.registry_lock:
+                if port not in _SERIALPORTS or not _SERIALPORTS[port]:
+                    self.serial = _SERIALPORTS[port] = serial.Serial(port=port, baudrate=BAUDRATE, parity=PARITY, bytesize=BYTESIZE, stopbits=stop_bits, timeout=TIMEOUT)
+                else:
+                    self.serial = _SERIALPORTS[port]
+                    if self.serial.port is None:
+                        self.serial.open() 
+                self.port_lock = port_registry.get_lock(port)
+                """Lock of the serial port, held for each request/response pair (:const:`None` with a transport)."""
         """The serial port object as defined by the pySerial module. Created by the constructor.
 
         Attributes:
@@ -122,7 +186,7 @@ class Instrument():
         New in version 0.5.
         """
 
-        if  self.close_port_after_each_call:
+        if  self.close_port_after_each_call and self.serial is not None:
             self.serial.close()
 
     def __repr__(self):
@@ -466,6 +530,48 @@ class Instrument():
             numberOfRegisters=numberOfRegisters, payloadformat='registers')
 
 
+    def read_register_blocks(self, blocks, functioncode=3):
+        """Read several blocks of 16-bit registers, like :meth:`read_registers` for each block.
+
+        If the transport supports pipelining (Modbus TCP), all requests are sent
+        before the first answer is read.
+
+        Args:
+            * blocks (list): A (registeraddress, numberOfRegisters) tuple for each block.
+            * functioncode (int): Modbus function code. Can be 3 or 4.
+
+        Returns:
+            The register data of each block (a list of lists of int).
+
+        Raises:
+            ValueError, TypeError, IOError
+
+        """
+        MAX_NUMBER_OF_REGISTERS = 125 # Modbus limit for function code 3 and 4
+
+        _checkFunctioncode(functioncode, [3, 4])
+        if self.transport is None or not hasattr(self.transport, 'execute_many'):
+            return [self.read_registers(registeraddress, numberOfRegisters, functioncode) \
+                for registeraddress, numberOfRegisters in blocks]
+
+        _checkSlaveaddress(self.address)
+        requests = []
+        for registeraddress, numberOfRegisters in blocks:
+            _checkRegisteraddress(registeraddress)
+            _checkInt(numberOfRegisters, minvalue=1, maxvalue=MAX_NUMBER_OF_REGISTERS, description='number of registers')
+            requests.append((functioncode, _structPack(_STRUCT_TWO_UINT16, registeraddress, numberOfRegisters)))
+
+        result = []
+        for (registeraddress, numberOfRegisters), payload in \
+                zip(blocks, self.transport.execute_many(self.address, requests)):
+            if len(payload) != 1 + _NUMBER_OF_BYTES_PER_REGISTER * numberOfRegisters:
+                raise ValueError('Wrong number of bytes in the response for {0} registers: {1!r}'.format( \
+                    numberOfRegisters, payload))
+            _checkResponseByteCount(payload)
+            result.append(list(_structUnpack(_registersStruct(numberOfRegisters), payload[1:])))
+        return result
+
+
     def write_registers(self, registeraddress, values):
         """Write integers to 16-bit registers in the slave.
 
@@ -543,6 +649,7 @@ class Instrument():
             PAYLOADFORMAT_STRING, PAYLOADFORMAT_REGISTER, PAYLOADFORMAT_REGISTERS]
 
         ## Check input values ##
+        _checkSlaveaddress(self.address)
         _checkFunctioncode(functioncode, ALL_ALLOWED_FUNCTIONCODES)  # Note: The calling facade functions should validate this
         _checkRegisteraddress(registeraddress)
         _checkInt(numberOfDecimals, minvalue=0, description='number of decimals')
@@ -615,26 +722,26 @@ class Instrument():
                     'List: {0!r},  Number of registers: {1!r}.'.format(value, numberOfRegisters))
 
         ## Build payload to slave ##
+        # All arguments are validated above, so the precompiled codecs are used directly.
+        addressbytes = _structPack(_STRUCT_UINT16, registeraddress)
+
         if functioncode in [1, 2]:
-            payloadToSlave =_numToTwoByteString(registeraddress) + \
-                            _numToTwoByteString(NUMBER_OF_BITS)
+            payloadToSlave = _structPack(_STRUCT_TWO_UINT16, registeraddress, NUMBER_OF_BITS)
 
         elif functioncode in [3, 4]:
-            payloadToSlave =_numToTwoByteString(registeraddress) + \
-                            _numToTwoByteString(numberOfRegisters)
+            payloadToSlave = _structPack(_STRUCT_TWO_UINT16, registeraddress, numberOfRegisters)
 
         elif functioncode == 5:
-            payloadToSlave =_numToTwoByteString(registeraddress) + \
-                            _createBitpattern(functioncode, value)
+            writedata = _createBitpattern(functioncode, value)
+            payloadToSlave = addressbytes + writedata
 
         elif functioncode == 6:
-            payloadToSlave =_numToTwoByteString(registeraddress) + \
-                            _numToTwoByteString(value, numberOfDecimals, signed=signed)
+            writedata = _numToTwoByteString(value, numberOfDecimals, signed=signed)
+            payloadToSlave = addressbytes + writedata
 
         elif functioncode == 15:
-            payloadToSlave =_numToTwoByteString(registeraddress) + \
-                            _numToTwoByteString(NUMBER_OF_BITS) + \
-                            _numToOneByteString(NUMBER_OF_BYTES_FOR_ONE_BIT) + \
+            payloadToSlave = _structPack(_STRUCT_TWO_UINT16, registeraddress, NUMBER_OF_BITS) + \
+                            chr(NUMBER_OF_BYTES_FOR_ONE_BIT) + \
                             _createBitpattern(functioncode, value)
 
         elif functioncode == 16:
@@ -654,33 +761,34 @@ class Instrument():
                 registerdata = _valuelistToBytestring(value, numberOfRegisters)
 
             assert len(registerdata) == numberOfRegisterBytes
-            payloadToSlave =_numToTwoByteString(registeraddress) + \
-                            _numToTwoByteString(numberOfRegisters) + \
-                            _numToOneByteString(numberOfRegisterBytes) + \
+            payloadToSlave = _structPack(_STRUCT_TWO_UINT16, registeraddress, numberOfRegisters) + \
+                            chr(numberOfRegisterBytes) + \
                             registerdata
 
         ## Communicate ##
         payloadFromSlave = self._performCommand(functioncode, payloadToSlave)
 
         ## Check the contents in the response payload ##
+        # Cheap comparisons first, the _checkResponse* functions are only called to raise the error.
         if functioncode in [1, 2, 3, 4]:
-            _checkResponseByteCount(payloadFromSlave)  # response byte count
+            if not payloadFromSlave or ord(payloadFromSlave[0]) != len(payloadFromSlave) - 1:
+                _checkResponseByteCount(payloadFromSlave)  # response byte count
 
         if functioncode in [5, 6, 15, 16]:
-            _checkResponseRegisterAddress(payloadFromSlave, registeraddress)  # response register address
-
-        if functioncode == 5:
-            _checkResponseWriteData(payloadFromSlave, _createBitpattern(functioncode, value))  # response write data
+            if payloadFromSlave[0:2] != addressbytes:
+                _checkResponseRegisterAddress(payloadFromSlave, registeraddress)  # response register address
 
-        if functioncode == 6:
-            _checkResponseWriteData(payloadFromSlave, \
-                _numToTwoByteString(value, numberOfDecimals, signed=signed))  # response write data
+        if functioncode in [5, 6]:
+            if payloadFromSlave[2:4] != writedata:
+                _checkResponseWriteData(payloadFromSlave, writedata)  # response write data
 
         if functioncode == 15:
-            _checkResponseNumberOfRegisters(payloadFromSlave, NUMBER_OF_BITS)  # response number of bits
+            if payloadFromSlave[2:4] != _structPack(_STRUCT_UINT16, NUMBER_OF_BITS):
+                _checkResponseNumberOfRegisters(payloadFromSlave, NUMBER_OF_BITS)  # response number of bits
 
         if functioncode == 16:
-            _checkResponseNumberOfRegisters(payloadFromSlave, numberOfRegisters)  # response number of registers
+            if payloadFromSlave[2:4] != _structPack(_STRUCT_UINT16, numberOfRegisters):
+                _checkResponseNumberOfRegisters(payloadFromSlave, numberOfRegisters)  # response number of registers
 
         ## Calculate return value ##
         if functioncode in [1, 2]:
@@ -707,10 +815,16 @@ class Instrument():
                 return _bytestringToFloat(registerdata, numberOfRegisters)
 
             elif payloadformat == PAYLOADFORMAT_REGISTERS:
-                return _bytestringToValuelist(registerdata, numberOfRegisters)
+                return list(_structUnpack(_registersStruct(numberOfRegisters), registerdata))
 
             elif payloadformat == PAYLOADFORMAT_REGISTER:
-                return _twoByteStringToNum(registerdata, numberOfDecimals, signed=signed)
+                if signed:
+                    fullregister = _structUnpack(_STRUCT_INT16, registerdata)[0]
+                else:
+                    fullregister = _structUnpack(_STRUCT_UINT16, registerdata)[0]
+                if numberOfDecimals == 0:
+                    return fullregister
+                return fullregister / float(10 ** numberOfDecimals)
 
             raise ValueError('Wrong payloadformat for return value generation. ' + \
                 'Given {0}'.format(payloadformat))
@@ -733,22 +847,27 @@ class Instrument():
         Raises:
             ValueError, TypeError.
 
-        Makes use of the :meth:`_communicate` method. The message is generated with the :func:`_embedPayload` function, and the parsing of the response is done with the :func:`_extractPayload` function.
+        Makes use of the :meth:`_communicate` method. The message is generated with the :func:`_buildFrame` function, and the parsing of the response is done with the :func:`_parseFrame` function.
+
+        The arguments are not validated again, this is done by :meth:`_genericCommand`.
+
+        With a :attr:`transport` (for example Modbus TCP) the function code and payload are handed to its
+        ``execute`` method instead, which does the framing itself.
 
         """
         DEFAULT_NUMBER_OF_BYTES_TO_READ = 1000
-        
-        _checkFunctioncode(functioncode, None )
-        _checkString(payloadToSlave, description='payload')
 
-        message = _embedPayload(self.address, functioncode, payloadToSlave)
+        if self.transport is not None:
+            return self.transport.execute(self.address, functioncode, payloadToSlave)
+
+        message = _buildFrame(self.address, functioncode, payloadToSlave)
         
         # Calculate number of bytes to read
         if not self.precalculate_read_size:
             number_of_bytes_to_read = DEFAULT_NUMBER_OF_BYTES_TO_READ
         else:
             try:
-                number_of_bytes_to_read = _predictRtuResponseSize(message)
+                number_of_bytes_to_read = _rtuResponseSize(message)
             except:
                 number_of_bytes_to_read = DEFAULT_NUMBER_OF_BYTES_TO_READ
                 if self.debug:
@@ -757,9 +876,10 @@ class Instrument():
                             'Will read {} bytes. Message: {!r}'
                     _print_out(template.format(number_of_bytes_to_read, message))
 
-        response = self._communicate(message, number_of_bytes_to_read)
+        with self.port_lock: # Instruments on the same port may be used from several threads
+            response = self._communicate(message, number_of_bytes_to_read)
         
-        payloadFromSlave = _extractPayload(response, self.address, functioncode)
+        payloadFromSlave = _parseFrame(response, self.address, functioncode)
         return payloadFromSlave
 
 
@@ -799,10 +919,13 @@ class Instrument():
                                                   |       |
                              Roundtrip time  ---->|-------|<--   
                              
-        The resolution for Python's time.time() is lower on Windows than on Linux. 
-        It is about 16 ms on Windows according to 
+        The silent period is measured per serial port with a monotonic clock (see :func:`_makeMonotonicClock`).
+        On Windows with Python2 this falls back to time.time(), which has a resolution of about 16 ms according to
         http://stackoverflow.com/questions/157359/accurate-timestamping-in-python
 
+        The response is read with :meth:`_receive`, which stops after the header of an exception
+        response instead of waiting for the timeout.
+
         .. note::
             Some implementation details:
 
@@ -843,7 +966,7 @@ class Instrument():
         
         # Sleep to make sure 3.5 character times have passed
         minimum_silent_period   = _calculate_minimum_silent_period(self.serial.baudrate)
-        time_since_read         = time.time() - _LATEST_READ_TIMES.get(self.serial.port, 0)
+        time_since_read         = _monotonic() - _LATEST_READ_TIMES.get(self.serial.port, float('-inf'))
         
         if time_since_read < minimum_silent_period:
             sleep_time = minimum_silent_period - time_since_read
@@ -868,12 +991,12 @@ class Instrument():
             _print_out(text)
         
         # Write message
-        latest_write_time = time.time()
+        latest_write_time = _monotonic()
         self.serial.write(message)
         
         # Read response
-        answer =  self.serial.read(number_of_bytes_to_read)
-        _LATEST_READ_TIMES[self.serial.port] = time.time()
+        answer = self._receive(number_of_bytes_to_read)
+        _LATEST_READ_TIMES[self.serial.port] = _monotonic()
 
         if self.close_port_after_each_call:
             self.serial.close()
@@ -896,6 +1019,40 @@ class Instrument():
 
         return answer
 
+    def _receive(self, number_of_bytes_to_read):
+        """Read the response of the slave from the serial port.
+
+        With :attr:`precalculate_read_size` the response is read in two steps:
+
+        1. The header (slave address and function code).
+        2. If bit 7 of the function code is set, this is an exception response and only the
+           exception code and the CRC follow. Otherwise the rest of the predicted response.
+
+        So an exception response returns as soon as its five bytes have arrived, instead of
+        blocking until the timeout while waiting for the predicted number of bytes.
+
+        Args:
+            number_of_bytes_to_read (int): The predicted size of a normal response.
+
+        Returns:
+            The raw data (bytes for Python3) returned from the slave, shorter than expected on timeout.
+
+        """
+        NUMBER_OF_HEADER_BYTES = 2  # Slave address and function code
+        NUMBER_OF_BYTES_AFTER_EXCEPTION_HEADER = 3  # Exception code and CRC
+        ERRORINDICATION = 0x80  # Bit 7 of the function code
+
+        if not self.precalculate_read_size or number_of_bytes_to_read <= NUMBER_OF_HEADER_BYTES:
+            return self.serial.read(number_of_bytes_to_read)
+
+        header = self.serial.read(NUMBER_OF_HEADER_BYTES)
+        if len(header) < NUMBER_OF_HEADER_BYTES:
+            return header  # Timeout, reported by the caller
+
+        if bytearray(header)[1] & ERRORINDICATION:
+            return header + self.serial.read(NUMBER_OF_BYTES_AFTER_EXCEPTION_HEADER)
+        return header + self.serial.read(number_of_bytes_to_read - NUMBER_OF_HEADER_BYTES)
+
 
 ####################
 # Payload handling #
@@ -924,10 +1081,17 @@ def _embedPayload(slaveaddress, functioncode, payloaddata):
     _checkFunctioncode(functioncode, None)
     _checkString(payloaddata, description='payload')
 
-    # Build message
-    firstPart = _numToOneByteString(slaveaddress) + _numToOneByteString(functioncode) + payloaddata
-    message = firstPart + _calculateCrcString(firstPart)
-    return message
+    return _buildFrame(slaveaddress, functioncode, payloaddata)
+
+
+def _buildFrame(slaveaddress, functioncode, payloaddata):
+    """Build a message like :func:`_embedPayload`, but without validating the arguments.
+
+    Used by :meth:`Instrument._performCommand` once the public API has validated the input.
+
+    """
+    firstPart = chr(slaveaddress) + chr(functioncode) + payloaddata
+    return firstPart + _structPack(_STRUCT_CRC, _crc16(firstPart))
 
 
 def _extractPayload(response, slaveaddress, functioncode):
@@ -946,24 +1110,36 @@ def _extractPayload(response, slaveaddress, functioncode):
 
     The received message should have the format: slaveaddress byte + functioncode byte + payloaddata + CRC (which is two bytes)
 
+    """
+    _checkString(response, description='response')
+    _checkSlaveaddress(slaveaddress)
+    _checkFunctioncode(functioncode, None)
+
+    return _parseFrame(response, slaveaddress, functioncode)
+
+
+def _parseFrame(response, slaveaddress, functioncode):
+    """Extract the payload like :func:`_extractPayload`, but without validating the arguments.
+
+    Used by :meth:`Instrument._performCommand`. The response itself is checked (CRC, slave address
+    and function code), and a :exc:`ValueError` is raised if there is any problem with it.
+
     """
     BYTEPOSITION_FOR_SLAVEADDRESS          = 0  # Zero-based counting
     BYTEPOSITION_FOR_FUNCTIONCODE          = 1
     NUMBER_OF_RESPONSE_STARTBYTES          = 2  # Number of bytes before the response payload
     NUMBER_OF_CRC_BYTES                    = 2
-    BITNUMBER_FUNCTIONCODE_ERRORINDICATION = 7
+    ERRORINDICATION                        = 0x80 # Bit 7 of the function code
+
+    if len(response) < NUMBER_OF_RESPONSE_STARTBYTES + NUMBER_OF_CRC_BYTES:
+        raise ValueError('Too short response from the slave: {0!r}'.format(response))
 
-    # Argument validity testing
-    _checkString(response, description='response')
-    _checkSlaveaddress(slaveaddress)
-    _checkFunctioncode(functioncode, None)
-        
     # Check CRC
     receivedCRC = response[-NUMBER_OF_CRC_BYTES:]
     responseWithoutCRC = response[0 : len(response) - NUMBER_OF_CRC_BYTES ]
-    calculatedCRC = _calculateCrcString( responseWithoutCRC )
 
-    if receivedCRC != calculatedCRC:
+    if _structUnpack(_STRUCT_CRC, receivedCRC)[0] != _crc16(responseWithoutCRC):
+        calculatedCRC = _calculateCrcString( responseWithoutCRC )
         raise ValueError('CRC error: {0} ({1!r}) instead of {2} ({3!r}). The response is: {4!r}'.format( \
             _twoByteStringToNum(receivedCRC), receivedCRC,
             _twoByteStringToNum(calculatedCRC), calculatedCRC,
@@ -979,7 +1155,7 @@ def _extractPayload(response, slaveaddress, functioncode):
     # Check function code
     receivedFunctioncode = ord( response[BYTEPOSITION_FOR_FUNCTIONCODE ] )
 
-    if receivedFunctioncode == _setBitOn(functioncode, BITNUMBER_FUNCTIONCODE_ERRORINDICATION):
+    if receivedFunctioncode == functioncode | ERRORINDICATION:
         raise ValueError('The slave is indicating an error. The response is: {0!r}'.format(response))
 
     elif receivedFunctioncode != functioncode:
@@ -987,11 +1163,7 @@ def _extractPayload(response, slaveaddress, functioncode):
             receivedFunctioncode, functioncode, response))
 
     # Read data payload
-    firstDatabyteNumber = NUMBER_OF_RESPONSE_STARTBYTES
-    lastDatabyteNumber  = len(response) - NUMBER_OF_CRC_BYTES
-
-    payload = response[ firstDatabyteNumber:lastDatabyteNumber ]
-    return payload
+    return response[ NUMBER_OF_RESPONSE_STARTBYTES : len(response) - NUMBER_OF_CRC_BYTES ]
 
     
 ############################################
@@ -1011,38 +1183,46 @@ def _predictRtuResponseSize(message):
         ValueError, TypeError.
             
     """
+    MINIMUM_MESSAGE_LENGTH = 4  # Slave address, function code and CRC
+    BYTERANGE_FOR_GIVEN_SIZE = slice(4,6)  # Within the request
+
+    _checkString(message, minlength=MINIMUM_MESSAGE_LENGTH, description='message')
+    if ord(message[1]) in [1, 2, 3, 4]:
+        _checkString(message[BYTERANGE_FOR_GIVEN_SIZE], minlength=2, maxlength=2, description='given size')
+
+    return _rtuResponseSize(message)
+
+
+def _rtuResponseSize(message):
+    """Calculate the response size like :func:`_predictRtuResponseSize`, but without validating the message."""
     BYTEPOSITION_FOR_FUNCTIONCODE = 1
-    BYTERANGE_FOR_GIVEN_SIZE = slice(4,6) 
     NUMBER_OF_RESPONSE_STARTBYTES = 2  # Number of bytes before the response payload
     NUMBER_OF_PAYLOAD_BYTES_IN_WRITE_CONFIRMATION = 4
     NUMBER_OF_BYTES_FOR_BYTECOUNTFIELD = 1
     NUMBER_OF_CRC_BYTES = 2
-    
-    _checkString(message, 
-        minlength=NUMBER_OF_RESPONSE_STARTBYTES+NUMBER_OF_CRC_BYTES, 
-        description='message')
+
     functioncode = ord(message[BYTEPOSITION_FOR_FUNCTIONCODE])
 
-    if functioncode in [5, 6, 15, 16]:
-        response_payload_size = NUMBER_OF_PAYLOAD_BYTES_IN_WRITE_CONFIRMATION    
-        
-    elif functioncode in [1, 2, 3, 4]:    
-        given_size = _twoByteStringToNum(message[BYTERANGE_FOR_GIVEN_SIZE])
+    if functioncode in (5, 6, 15, 16):
+        response_payload_size = NUMBER_OF_PAYLOAD_BYTES_IN_WRITE_CONFIRMATION
+
+    elif functioncode in (1, 2, 3, 4):
+        given_size = (ord(message[4]) << 8) | ord(message[5])  # Bytes 4 and 5, big-endian
         if functioncode == 1 or functioncode == 2:
             # Algorithm from MODBUS APPLICATION PROTOCOL SPECIFICATION V1.1b
             number_of_inputs = given_size
             response_payload_size = NUMBER_OF_BYTES_FOR_BYTECOUNTFIELD + \
                                     number_of_inputs//8 + (1 if number_of_inputs%8 else 0)
-            
-        elif functioncode == 3 or functioncode == 4:
+
+        else:
             number_of_registers = given_size
             response_payload_size = NUMBER_OF_BYTES_FOR_BYTECOUNTFIELD + \
                                     number_of_registers*_NUMBER_OF_BYTES_PER_REGISTER
-        
+
     else:
         raise ValueError('Wrong functioncode: {}. The raw message is: {!r}'.format( \
             functioncode, message))
-    
+
     return NUMBER_OF_RESPONSE_STARTBYTES + response_payload_size + NUMBER_OF_CRC_BYTES
     
 def _calculate_minimum_silent_period(baudrate):
@@ -1466,6 +1646,37 @@ def _bytestringToValuelist(bytestring, numberOfRegisters):
     return values
 
 
+def _structPack(codec, *values):
+    """Pack values with a precompiled :class:`struct.Struct`, without validation.
+
+    Returns a bytestring (str), also for Python3.
+
+    """
+    if _PY3:
+        return str(codec.pack(*values), encoding='latin1')
+    return codec.pack(*values)
+
+
+def _structUnpack(codec, packed):
+    """Unpack a bytestring (str) with a precompiled :class:`struct.Struct`, without validation.
+
+    Returns a tuple.
+
+    """
+    if _PY3:
+        packed = bytes(packed, encoding='latin1')
+    return codec.unpack(packed)
+
+
+def _registersStruct(numberOfRegisters):
+    """Return the (cached) :class:`struct.Struct` for *numberOfRegisters* unsigned INT16 values."""
+    try:
+        return _STRUCT_REGISTERS[numberOfRegisters]
+    except KeyError:
+        codec = _STRUCT_REGISTERS[numberOfRegisters] = struct.Struct('>{0}H'.format(numberOfRegisters))
+        return codec
+
+
 def _pack(formatstring, value):
     """Pack a value into a bytestring.
 
@@ -1757,24 +1968,41 @@ def _calculateCrcString(inputstring):
     """
     _checkString(inputstring, description='input CRC string')
 
-    # Constant for MODBUS CRC-16
-    POLY = 0xA001
+    return _structPack(_STRUCT_CRC, _crc16(inputstring))
 
-    # Preload a 16-bit register with ones
-    register = 0xFFFF
 
-    for character in inputstring:
+def _makeCrcTable():
+    """Build the lookup table for the Modbus CRC-16, with one entry per byte value.
 
-        # XOR with each character
-        register = _XOR(register, ord(character))
+    Each entry is the result of the bitwise algorithm (rightshift 8 times, and XOR with
+    the polynom if the carry bit is set) for one byte, so the CRC of a message
+    needs one table lookup per byte instead of eight shifts.
 
-        # Rightshift 8 times, and XOR with polynom if carry overflows
+    """
+    # Constant for MODBUS CRC-16
+    POLY = 0xA001
+
+    table = []
+    for byte in range(256):
+        register = byte
         for i in range(8):
-            register, carrybit = _rightshift(register)
-            if carrybit == 1:
-                register = _XOR(register, POLY)
+            if register & 1:
+                register = (register >> 1) ^ POLY
+            else:
+                register >>= 1
+        table.append(register)
+    return tuple(table)
 
-    return _numToTwoByteString(register, LsbFirst=True)
+_CRC16TABLE = _makeCrcTable()
+
+
+def _crc16(inputstring):
+    """Calculate the Modbus CRC-16 of *inputstring* (str) as an integer, without validation."""
+    table = _CRC16TABLE
+    register = 0xFFFF  # Preload a 16-bit register with ones
+    for character in inputstring:
+        register = (register >> 8) ^ table[(register ^ ord(character)) & 0xFF]
+    return register
 
 
 def _checkFunctioncode(functioncode, listOfAllowedValues=[]):
@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Unified measurement software UMS
+# New measurement software for the electrochemical materials group, Prof. Jennifer Rupp
+#
+# Copyright (c) 2013 Reto Pfenninger, department of materials, D-MATL, ETH Zürich
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Modbus TCP transport for minimalmodbus.Instrument.
+#
+# A minimalmodbus.Instrument normally talks Modbus RTU over a serial port.
+# When it is created with a port name like "tcp://192.168.1.20" (port 502 by
+# default, or "tcp://host:port") or with transport=..., _performCommand hands
+# the function code and payload to the transport instead. A transport only
+# needs one method: execute(slaveaddress, functioncode, payload) returning the
+# payload of the answer, and raising IOError/ValueError like the RTU path.
+#
+# tcp_transport frames the requests with the MBAP header (transaction id,
+# protocol 0, length, unit id). There is no CRC and no silent period, and
+# execute_many() sends several requests before it waits for the first answer
+# (pipelining); the answers are matched by their transaction id. All
+# instruments with the same host share one connection.
+
+import atexit
+import socket
+import struct
+import threading
+
+from stream_reader import stream_reader
+
+URL_PREFIX = "tcp://"
+DEFAULT_PORT = 502
+TIMEOUT = 1.0
+ERRORINDICATION = 0x80 # bit 7 of the function code in an exception response
+
+_MBAP = struct.Struct(">HHHB") # transaction id, protocol id, length, unit id
+
+_pool_lock = threading.RLock()
+_transports = {} # (host, port) -> tcp_transport
+
+
+def parse_url(url):
+    address = url[len(URL_PREFIX):] if url.startswith(URL_PREFIX) else url
+    if ":" in address:
+        host, port = address.rsplit(":", 1)
+        return (host, int(port))
+    return (address, DEFAULT_PORT)
+
+
+class tcp_transport(object):
+    def __init__(self, host, port=DEFAULT_PORT, timeout=TIMEOUT):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.lock = threading.RLock()
+        self.sock = None
+        self.reader = None
+        self.transaction_id = 0
+        self.pending = {} # transaction id -> answer which arrived before it was asked for
+        self.debug = False
+
+    def connect(self):
+        self.sock = socket.create_connection((self.host, self.port), self.timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = stream_reader(self.sock)
+        self.pending = {}
+
+    def close(self):
+        with self.lock:
+            if self.sock is not None:
+                self.sock.close()
+                self.sock = None
+                self.reader = None
+
+    def send(self, slaveaddress, functioncode, payload):
+        # returns the transaction id of the request
+        self.transaction_id = (self.transaction_id+1) & 0xFFFF
+        pdu = chr(functioncode)+payload
+        frame = _MBAP.pack(self.transaction_id, 0, len(pdu)+1, slaveaddress)+pdu
+        if self.debug:
+            print self.host+" <- "+repr(frame)
+        self.sock.sendall(frame)
+        return self.transaction_id
+
+    def receive(self, transaction_id):
+        # returns (unit id, function code, payload) of the answer to transaction_id
+        while transaction_id not in self.pending:
+            try:
+                header = self.reader.read_exact(_MBAP.size)
+                tid, protocol, length, unit = _MBAP.unpack(header)
+                pdu = self.reader.read_exact(length-1)
+            except RuntimeError:
+                raise IOError("No communication with the instrument (no answer) at "+self.host)
+            if self.debug:
+                print self.host+" -> "+repr(header+pdu)
+            if protocol != 0 or length < 2:
+                raise IOError("Not a Modbus TCP answer from "+self.host+": "+repr(header+pdu))
+            self.pending[tid] = (unit, ord(pdu[0]), pdu[1:])
+        return self.pending.pop(transaction_id)
+
+    def check(self, answer, slaveaddress, functioncode):
+        unit, received_functioncode, payload = answer
+        if unit != slaveaddress:
+            raise ValueError("Wrong return unit id: {0} instead of {1}".format(unit, slaveaddress))
+        if received_functioncode == functioncode | ERRORINDICATION:
+            raise ValueError("The slave is indicating an error. Exception code: {0}".format(ord(payload[0]) if payload else None))
+        if received_functioncode != functioncode:
+            raise ValueError("Wrong functioncode: {0} instead of {1}".format(received_functioncode, functioncode))
+        return payload
+
+    def execute_many(self, slaveaddress, requests):
+        # requests is a list of (functioncode, payload), all of them are sent
+        # before the first answer is read. Returns the list of answer payloads.
+        with self.lock:
+            if self.sock is None:
+                self.connect()
+            try:
+                ids = [self.send(slaveaddress, functioncode, payload) for functioncode, payload in requests]
+                answers = [self.receive(tid) for tid in ids]
+            except (IOError, EOFError) as e: # socket.error is an IOError
+                self.close() # the transaction ids are out of step, start over with a new connection
+                raise IOError(str(e))
+        return [self.check(answer, slaveaddress, functioncode) for answer, (functioncode, payload) in zip(answers, requests)]
+
+    def execute(self, slaveaddress, functioncode, payload):
+        return self.execute_many(slaveaddress, [(functioncode, payload)])[0]
+
+
+def get_transport(url):
+    host, port = parse_url(url)
+    with _pool_lock:
+        if (host, port) not in _transports:
+            _transports[(host, port)] = tcp_transport(host, port)
+        return _transports[(host, port)]
+
+def close_all():
+    with _pool_lock:
+        for key in list(_transports.keys()):
+            _transports.pop(key).close()
+
+atexit.register(close_all)
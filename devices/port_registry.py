@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Unified measurement software UMS
+# New measurement software for the electrochemical materials group, Prof. Jennifer Rupp
+#
+# Copyright (c) 2013 Reto Pfenninger, department of materials, D-MATL, ETH Zürich
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# One lock per serial port, and parallel polling of devices on different ports.
+#
+# minimalmodbus, linkam and wpi_aladdin_1000 take the lock of their port for
+# every request/answer pair, so several threads can use instruments on the same
+# port without mixing up their frames. poll_many() calls a method on a list of
+# devices: the calls are grouped by port, every group runs in its own thread
+# and the calls within a group run one after the other. Four ovens and a gas
+# manifold on five ports take as long as the slowest of them, not the sum.
+
+import sys
+import threading
+
+registry_lock = threading.RLock() # held while a port is opened or looked up
+_port_locks = {} # port name -> RLock
+
+
+def get_lock(port):
+    with registry_lock:
+        if port not in _port_locks:
+            _port_locks[port] = threading.RLock()
+        return _port_locks[port]
+
+def port_of(device):
+    # the key under which the calls to device are serialized: the Modbus TCP
+    # transport, the name of the serial port or the device itself
+    transport = getattr(device, "transport", None)
+    if transport is not None:
+        return transport
+    for name in ("serial", "interface"):
+        port = getattr(getattr(device, name, None), "port", None)
+        if port is not None:
+            return port
+    return device
+
+def _run(calls, indices, results, errors):
+    for i in indices:
+        device, method = calls[i][0], calls[i][1]
+        args = calls[i][2] if len(calls[i]) > 2 else ()
+        try:
+            results[i] = getattr(device, method)(*args)
+        except Exception:
+            errors.append((i, sys.exc_info()))
+
+def poll_many(calls):
+    # calls is a list of (device, "method") or (device, "method", args). Returns
+    # the results in the same order; if calls failed, the exception of the first
+    # of them is raised after all calls are done.
+    groups = {}
+    order = []
+    for i, call in enumerate(calls):
+        key = port_of(call[0])
+        if key not in groups:
+            groups[key] = []
+            order.append(key)
+        groups[key].append(i)
+    results = [None]*len(calls)
+    errors = []
+    threads = []
+    for key in order[1:]:
+        thread = threading.Thread(target=_run, args=(calls, groups[key], results, errors))
+        thread.daemon = True
+        thread.start()
+        threads.append(thread)
+    if order:
+        _run(calls, groups[order[0]], results, errors) # the first group in the calling thread
+    for thread in threads:
+        thread.join()
+    if errors:
+        i, error = min(errors)
+        raise error[0], error[1], error[2]
+    return results
@@ -71,6 +71,8 @@ import socket
 import sys
 import re
 
+from stream_reader import stream_reader
+
 def usage(progname):
   print __doc__ % vars()
 
@@ -86,6 +88,8 @@ class prologix_ethernet:
       raise RuntimeError("Error making connection to prologix_ethernet device with address '%s'" %  address)
     self._sock = sock
     self._timeout = 0.5
+    self._sock.settimeout(self._timeout)
+    self._reader = stream_reader(sock)
     msg = self._flush()
     if msg:
       print "Warning, flushed : ", msg
@@ -97,32 +101,17 @@ class prologix_ethernet:
   
   def _flush(self):
     """ Clear any read buffers out """
-    self._sock.settimeout(0.1)
-    line = self.read()
-    result = ""
-    while line != None:
-      result += line
-      line = self._read()
-    self._sock.settimeout(self._timeout)
-    return result
+    return self._reader.read_available(0.1)
 
   def read(self):
-    sock = self._sock
-    msg = ""
-    try:
-      while True:
-        msg += sock.recv(1024)
-        end = msg.find("\n")
-        if end == len(msg)-1:
-          return msg
-        elif end != -1:
-          print "Warning, dropping %d byte tail of message. Tail='%s'"%(len(msg)-end, msg[end:])
-          return msg[0:end-1]
-    except socket.timeout:
-      if len(msg) > 0:
-        raise RuntimeError("Got timeout after receiving partial result : %s" % msg)
-      else:
-        return None
+    """ Read one line, None if nothing arrived before the timeout """
+    return self._reader.readline()
+
+  def read_until(self, terminator):
+    return self._reader.read_until(terminator)
+
+  def read_exact(self, n):
+    return self._reader.read_exact(n)
 
   def write(self, line):
     self._sock.sendall(line)
@@ -0,0 +1,214 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Unified measurement software UMS
+# New measurement software for the electrochemical materials group, Prof. Jennifer Rupp
+#
+# Copyright (c) 2013 Reto Pfenninger, department of materials, D-MATL, ETH Zürich
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Shared access to Prologix GPIB adapters (GPIB-Ethernet or GPIB-USB).
+#
+# Several GPIB instruments usually hang on the same adapter (e.g. a Keithley
+# 2700 with a 7001 switch matrix and a 6220 current source). Every adapter is
+# opened only once by a PrologixBroker, which keeps the adapter wide settings
+# (++mode, ++auto) and remembers the last ++addr, ++eoi and ++eos it sent.
+# The drivers get a prologix_handle with their own GPIB address and settings:
+# a write or read through the handle takes the lock of the broker, sends
+# ++addr/++eoi/++eos only if they differ from what the adapter already has and
+# then transfers the data, so instruments on one adapter cannot interleave.
+#
+# Instead of sleeping a worst-case time between a query and ++read, a driver
+# can call wait_for_message(): it serial polls the instrument (++spoll) with a
+# short backoff until the message available bit of the status byte is set.
+# The adapter lock is only held for each poll, so the other instruments on the
+# adapter can be served in between.
+
+import atexit
+import threading
+import time
+
+from prologix_GPIB_ethernet import prologix_ethernet
+
+STB_MAV = 16 # message available (IEEE 488.2)
+STB_ESB = 32 # event status bit, set by *OPC if armed with *ESE 1
+
+_pool_lock = threading.RLock()
+_brokers = {} # device_file -> PrologixBroker
+
+
+class PrologixBroker(object):
+    def __init__(self, device_file):
+        self.device_file = device_file
+        self.lock = threading.RLock()
+        self.users = 0
+        self.connection = None
+        self.using_GPIB_to_Ethernet = "/" not in device_file # means it is not a path to /dev/xxx
+        self.debug = False
+        self.open()
+
+    def open(self):
+        if self.using_GPIB_to_Ethernet:
+            self.connection = prologix_ethernet(self.device_file)
+        else:
+            self.connection = open(self.device_file, "w+")
+        self.state = {} # what the adapter is currently set to: "addr", "eoi", "eos"
+        self.send("++mode 1") # controller
+        self.send("++auto 0") # only read after ++read
+        time.sleep(1.0) # the adapter needs a moment before it accepts GPIB traffic
+
+    def send(self, line):
+        if self.debug:
+            print self.device_file+" <- "+line.strip()
+        self.connection.write(line+"\n")
+        if not self.using_GPIB_to_Ethernet:
+            self.connection.flush()
+
+    def receive(self, n_bytes=None): # one line, or exactly n_bytes for binary data
+        if self.using_GPIB_to_Ethernet:
+            if n_bytes is not None:
+                return self.connection.read_exact(n_bytes)
+            return self.connection.read()
+        if n_bytes is not None:
+            return self.connection.read(n_bytes)
+        return self.connection.readline()
+
+    def select(self, address, eoi, eos): # the lock has to be held already
+        for key, value in (("addr", address), ("eoi", eoi), ("eos", eos)):
+            if self.state.get(key) != value:
+                self.send("++"+key+" "+value)
+                self.state[key] = value
+
+    def write(self, address, eoi, eos, line):
+        with self.lock:
+            self.select(address, eoi, eos)
+            self.send(line)
+
+    def read(self, address, eoi, eos, until="eoi", n_bytes=None):
+        with self.lock:
+            self.select(address, eoi, eos)
+            self.send("++read "+until)
+            return self.receive(n_bytes)
+
+    def spoll(self, address):
+        with self.lock:
+            self.send("++spoll "+address)
+            answer = self.receive()
+        if answer is None:
+            raise RuntimeError("No answer to serial poll of GPIB address "+address)
+        return int(answer)
+
+    def handle(self, address, eoi=1, eos=3):
+        with _pool_lock:
+            self.users += 1
+        return prologix_handle(self, address, eoi, eos)
+
+    def release(self):
+        with _pool_lock:
+            self.users = max(self.users-1, 0)
+            if self.users > 0:
+                return
+            _brokers.pop(self.device_file, None)
+            self.close()
+
+    def close(self):
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+
+
+class prologix_handle(object):
+    # File like object for one GPIB address which is handed to the drivers.
+    # "++addr", "++eoi" and "++eos" written by a driver only change the
+    # settings of this handle, they are sent by the broker when needed.
+    def __init__(self, broker, address, eoi=1, eos=3):
+        self.broker = broker
+        self.address = str(address)
+        self.eoi = str(eoi)
+        self.eos = str(eos) # 0=CRLF 1=CR 2=LF 3=None
+        self.using_GPIB_to_Ethernet = broker.using_GPIB_to_Ethernet
+        self.closed = False
+
+    def write(self, string):
+        for line in string.split("\n"):
+            line = line.strip("\r")
+            if not line:
+                continue
+            if line.startswith("++addr "):
+                self.address = line[7:].strip()
+            elif line.startswith("++eoi "):
+                self.eoi = line[6:].strip()
+            elif line.startswith("++eos "):
+                self.eos = line[6:].strip()
+            elif line.startswith("++mode") or line.startswith("++auto"):
+                continue # adapter wide, set once by the broker
+            else:
+                self.broker.write(self.address, self.eoi, self.eos, line)
+
+    def read(self, until="eoi"): # ++read and the answer in one transaction
+        return self.broker.read(self.address, self.eoi, self.eos, until)
+
+    def readline(self):
+        return self.read()
+
+    def read_binary(self, n_bytes): # binary blocks may contain line feeds
+        return self.broker.read(self.address, self.eoi, self.eos, "eoi", n_bytes)
+
+    def spoll(self): # status byte of the instrument
+        return self.broker.spoll(self.address)
+
+    def wait_for_message(self, timeout, mask=STB_MAV):
+        # True as soon as the status byte has one of the bits in mask set,
+        # False if the instrument is still busy after timeout seconds
+        deadline = time.time()+timeout
+        delay = 0.002
+        while not self.spoll() & mask:
+            if time.time() > deadline:
+                return False
+            time.sleep(delay)
+            delay = min(delay*2, 0.05)
+        return True
+
+    def operation_complete(self, timeout):
+        # waits until all pending commands are executed (*OPC sets the ESB bit)
+        self.write("*ESE 1")
+        self.write("*OPC")
+        done = self.wait_for_message(timeout, STB_ESB)
+        self.write("*ESR?") # clears the event status register and with it ESB
+        self.read()
+        return done
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.broker.release()
+
+
+def get_broker(device_file):
+    with _pool_lock:
+        if device_file not in _brokers:
+            _brokers[device_file] = PrologixBroker(device_file)
+        return _brokers[device_file]
+
+def get_handle(device_file, address, eoi=1, eos=3):
+    with _pool_lock: # the broker must not be released in between
+        return get_broker(device_file).handle(address, eoi, eos)
+
+def close_all():
+    with _pool_lock:
+        for device_file in list(_brokers.keys()):
+            _brokers.pop(device_file).close()
+
+atexit.register(close_all)
@@ -0,0 +1,265 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Unified measurement software UMS
+# New measurement software for the electrochemical materials group, Prof. Jennifer Rupp
+#
+# Copyright (c) 2013 Reto Pfenninger, department of materials, D-MATL, ETH Zürich
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Driver registry and instrument inventory.
+#
+# DRIVERS maps the names ums exports (keithley_2601B, eurotherm_2416, ...) to
+# the module and attribute in this folder. lazy_driver stands for one of them
+# and imports the module when it is called or an attribute is read, so
+# keithley_2601B(host) works like before but a script only pays for the
+# drivers (and serial, sockets, RPC, minimalmodbus) it really uses.
+#
+# The inventory file (instruments.cfg next to ums.py) has one section per
+# instrument:
+#
+#   [keithley_2000_GPIB_4]
+#   driver = keithley_2000
+#   transport = gpib          ; tcp, gpib or serial
+#   adapter = /dev/ttyUSB0    ; the Prologix adapter, for gpib
+#   address = 4               ; host for tcp, GPIB address for gpib
+#   legacy_name = keithley_2000_GPIB_4_address
+#
+# serial instruments have port (a device file or tcp:// for Modbus TCP) and
+# optionally slave. open = yes calls open() after connecting, legacy_name
+# exports the address under its old global name in ums. All other options are
+# passed to the driver as keyword arguments (like channel = B). inventory.get()
+# connects an instrument once and returns the same instance afterwards. A
+# section without driver only records an address (like the electrochem
+# machines) and cannot be connected.
+#
+# inventory.open_all() connects several instruments at once, without names all
+# sections which have a driver: the instruments are grouped by their Prologix
+# adapter, serial port or host, every group runs in its own thread and the
+# instruments of a group are connected one after the other in the given order
+# (a reset of one must not hit the others on the same bus). The time every
+# instrument needed is printed and kept in timings.
+
+import ConfigParser
+import importlib
+import sys
+import threading
+import time
+
+DRIVERS = {
+    # Keithley/Tektronix
+    "tektronix_AFG2021": ("tektronix_AFG2021", "tektronix_AFG2021"),
+    "tektronix_AFG3021C": ("tektronix_AFG3021C", "tektronix_AFG3021C"),
+    "keithley_2601B": ("keithley_2601B", "keithley_2601B"),
+    "keithley_2602B": ("keithley_2602B", "keithley_2602B"),
+    "keithley_2612B": ("keithley_2612B", "keithley_2612B"),
+    "keithley_6517B": ("keithley_6517B", "keithley_6517B"),
+    "keithley_2700": ("keithley_2700", "keithley_2700"),
+    "keithley_2701": ("keithley_2701", "keithley_2701"),
+    "keithley_2182A": ("keithley_2182A", "keithley_2182A"),
+    "keithley_2000": ("keithley_2000", "keithley_2000"),
+    "keithley_2001": ("keithley_2001", "keithley_2001"),
+    "keithley_7001": ("keithley_7001", "keithley_7001"),
+    "keithley_740": ("keithley_740", "keithley_740"),
+    "keithley_6220": ("keithley_6220", "keithley_6220"),
+    "keithley_4200gpib": ("keithley_4200gpib", "keithley_4200gpib"),
+    "tsp_program": ("keithley_tsp", "tsp_program"),
+    "run_tsp_program": ("keithley_tsp", "run_tsp_program"),
+    # ovens
+    "eurotherm_2404": ("eurotherm_2404", "eurotherm_2404"),
+    "eurotherm_2416": ("eurotherm_2416", "eurotherm_2416"),
+    "eurotherm_3216": ("eurotherm_3216", "eurotherm_3216"),
+    "eurotherm_nanodac": ("eurotherm_nanodac", "eurotherm_nanodac"),
+    "ramp_dwell_profile": ("eurotherm_programmer", "ramp_dwell_profile"),
+    # power supplies
+    "tti_QL564TP": ("tti_QL564TP", "tti_QL564TP"),
+    # impedance bridges
+    "gamry_R600": ("gamry_R600", "gamry_R600"),
+    "zahner_IM6": ("zahner_IM6", "zahner_IM6"),
+    "solartron": ("solartron", "solartron"),
+    # flow meters
+    "voegtlin_gsc": ("voegtlin_gsc", "voegtlin_gsc"),
+    "voegtlin_scheduler": ("voegtlin_scheduler", "voegtlin_scheduler"),
+    # Linkam stage controller for T-95
+    "linkam": ("linkam", "linkam"),
+    }
+
+_package = __name__.rsplit(".", 1)[0] if "." in __name__ else None # devices or source.devices
+_lock = threading.RLock()
+_loaded = {}
+
+
+def load(name):
+    """Import the driver (or function) registered as name and return it."""
+    with _lock:
+        if name not in _loaded:
+            if name not in DRIVERS:
+                raise KeyError("No driver with the name \""+str(name)+"\". Known are: "+", ".join(sorted(DRIVERS)))
+            module, attribute = DRIVERS[name]
+            if _package is not None:
+                module = importlib.import_module("."+module, _package)
+            else:
+                module = importlib.import_module(module)
+            _loaded[name] = getattr(module, attribute)
+        return _loaded[name]
+
+
+class lazy_driver(object):
+    def __init__(self, name):
+        self.name = name
+
+    def __call__(self, *args, **kwargs):
+        return load(self.name)(*args, **kwargs)
+
+    def __getattr__(self, attribute):
+        return getattr(load(self.name), attribute)
+
+    def __repr__(self):
+        return "<driver "+self.name+(", loaded>" if self.name in _loaded else ", not loaded yet>")
+
+
+class inventory(object):
+    def __init__(self, path):
+        self.path = path
+        self.config = ConfigParser.RawConfigParser()
+        self.config.read(path) # a missing file means an empty inventory
+        self.instances = {}
+        self.timings = {} # name -> seconds open_all needed to connect it
+        self.lock = threading.RLock()
+
+    def names(self):
+        return self.config.sections()
+
+    def connectable(self):
+        # the sections which create() can connect
+        return [name for name in self.names() if self.config.has_option(name, "driver")]
+
+    def address(self, name):
+        return self.config.get(name, "address")
+
+    def legacy_names(self):
+        # old global name -> address, GPIB addresses as int
+        res = {}
+        for name in self.names():
+            if self.config.has_option(name, "legacy_name"):
+                address = self.address(name)
+                if self.transport(name) == "gpib":
+                    address = int(address)
+                res[self.config.get(name, "legacy_name")] = address
+        return res
+
+    def transport(self, name):
+        if self.config.has_option(name, "transport"):
+            return self.config.get(name, "transport").lower()
+        return "tcp"
+
+    def arguments(self, name):
+        transport = self.transport(name)
+        if transport == "tcp":
+            args = [self.address(name)]
+        elif transport == "gpib":
+            args = [self.config.get(name, "adapter"), int(self.address(name))]
+        elif transport == "serial":
+            args = [self.config.get(name, "port")]
+            if self.config.has_option(name, "slave"):
+                args.append(int(self.config.get(name, "slave")))
+        else:
+            raise ValueError("Unknown transport \""+transport+"\" for "+name+" in "+self.path)
+        known = ("driver", "transport", "address", "adapter", "port", "slave", "open", "legacy_name")
+        kwargs = dict([(key, value) for key, value in self.config.items(name) if key not in known])
+        return args, kwargs
+
+    def create(self, name):
+        """Connect a new instance of the instrument name."""
+        if not self.config.has_section(name):
+            raise KeyError("No instrument \""+str(name)+"\" in "+self.path)
+        if not self.config.has_option(name, "driver"):
+            raise ValueError("The entry "+name+" in "+self.path+" has no driver")
+        args, kwargs = self.arguments(name)
+        device = load(self.config.get(name, "driver"))(*args, **kwargs)
+        if self.config.has_option(name, "open") and self.config.getboolean(name, "open"):
+            device.open()
+        return device
+
+    def get(self, name):
+        """Return the connected instrument name, connecting it on the first call."""
+        with self.lock:
+            if name not in self.instances:
+                self.instances[name] = self.create(name)
+            return self.instances[name]
+
+    def bus(self, name):
+        # instruments with the same bus are connected one after the other
+        transport = self.transport(name)
+        if transport == "gpib":
+            return self.config.get(name, "adapter")
+        if transport == "serial":
+            return self.config.get(name, "port")
+        return self.address(name)
+
+    def _open_group(self, names, errors):
+        for name in names:
+            start = time.time()
+            try:
+                device = self.create(name)
+            except Exception:
+                errors.append((name, sys.exc_info()))
+                print "Could not connect "+name+" ("+str(sys.exc_info()[1])+")"
+                continue
+            with self.lock:
+                self.instances.setdefault(name, device)
+                self.timings[name] = time.time()-start
+
+    def open_all(self, names=None):
+        """Connect the instruments names (all with a driver by default) in parallel and return {name: instrument}."""
+        if names is None:
+            names = self.connectable()
+        with self.lock:
+            missing = [name for name in names if name not in self.instances]
+            for name in missing:
+                self.timings.pop(name, None)
+        groups = {}
+        order = []
+        for name in missing:
+            if not self.config.has_section(name):
+                raise KeyError("No instrument \""+str(name)+"\" in "+self.path)
+            key = self.bus(name)
+            if key not in groups:
+                groups[key] = []
+                order.append(key)
+            groups[key].append(name)
+        errors = []
+        threads = []
+        start = time.time()
+        for key in order:
+            thread = threading.Thread(target=self._open_group, args=(groups[key], errors))
+            thread.daemon = True
+            thread.start()
+            threads.append(thread)
+        for thread in threads:
+            thread.join()
+        if missing:
+            for name in missing:
+                if name in self.timings:
+                    print "%-32s %6.2f s" % (name, self.timings[name])
+            print "%-32s %6.2f s (%.2f s one after another)" % ("Connected in", time.time()-start, sum([self.timings.get(name, 0) for name in missing]))
+        if errors:
+            name, error = min(errors, key=lambda e: missing.index(e[0])) # the others have been printed
+            raise error[0], error[1], error[2]
+        with self.lock:
+            return dict([(name, self.instances[name]) for name in names])
+
+    def forget(self, name):
+        with self.lock:
+            self.instances.pop(name, None)
@@ -97,7 +97,7 @@ class RpcUnpacker(xdrlib.Unpacker):
         return (flavor, stuff)
 
     def unpack_callheader(self):
-        xid = self.unpack_uint(xid)
+        xid = self.unpack_uint()
         mtype = self.unpack_enum()
         if mtype != CALL:
             raise RpcGenericDecodeError('No CALL but %d' % mtype)
@@ -269,13 +269,21 @@ class RpcClient(object):
         return self.make_call(0, None, None, None)
 
 
+# Records up to this size are sent with a single sendall() of header+record,
+# bigger ones are sent without concatenating them first.
+SMALL_RECORD_SIZE = 64*1024
+
 class RawTCPClient(RpcClient):
     def __init__(self, host, prog, vers, port):
         RpcClient.__init__(self, host, prog, vers, port)
+        self._header = bytearray(4)
+        self._header_view = memoryview(self._header)
         self.connect()
 
     def connect(self):
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        # request/reply traffic: don't let Nagle hold back the last segment
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
         self.sock.connect((self.host, self.port))
 
     def close(self):
@@ -283,40 +291,50 @@ class RawTCPClient(RpcClient):
 
     def send_record(self, record):
         header = struct.pack('>I', len(record) | 0x80000000)
-        buf = header + record
-        n_sent = 0
-        while n_sent < len(buf):
-            n_sent += self.sock.send(buf[n_sent:])
+        if len(record) <= SMALL_RECORD_SIZE:
+            self.sock.sendall(header + record)
+        else: # no copy of big records
+            self.sock.sendall(header)
+            self.sock.sendall(record)
+
+    def recv_exact(self, view):
+        # fills the whole memoryview, recv() may return less than asked for
+        n_received = 0
+        size = len(view)
+        while n_received < size:
+            n = self.sock.recv_into(view[n_received:], size-n_received)
+            if n == 0:
+                raise EOFError()
+            n_received += n
 
     def recv_record(self):
-        record = list()
-        last = False
+        frag, last = self.recv_fragment()
+        if last: # the usual case, a record consisting of a single fragment
+            return frag
+        record = [frag]
         while not last:
             frag, last = self.recv_fragment()
             record.append(frag)
         return ''.join(record)
 
     def recv_fragment(self):
-        header = self.sock.recv(4)
-        if len(header) < 4:
-            raise EOFError()
-        length = struct.unpack('>I', header)[0]
+        self.recv_exact(self._header_view)
+        length = struct.unpack('>I', self._header)[0]
         last = bool(length & 0x80000000)
         length &= 0x7fffffff
 
-        buf = list()
-        n_received = 0
-        while n_received < length:
-            b = self.sock.recv(length-n_received)
-            n_received += len(b)
-            buf.append(b)
+        buf = bytearray(length)
+        self.recv_exact(memoryview(buf))
 
-        return ''.join(buf), last
+        return str(buf), last
 
     def do_call(self):
         buf = self.packer.get_buf()
         self.send_record(buf)
         reply = self.recv_record()
+        self.check_reply(reply)
+
+    def check_reply(self, reply):
         self.unpacker.reset(reply)
         xid, verf = self.unpacker.unpack_replyheader()
         if xid != self.last_xid:
@@ -324,6 +342,51 @@ class RawTCPClient(RpcClient):
             raise RuntimeError('wrong xid in reply %d insted of %d' %
                     (xid, self.last_xid))
 
+    # Split version of make_call for event driven callers: begin_call only
+    # sends the call, the caller waits for the socket to become readable,
+    # feeds the received bytes into a RecordReader and passes the complete
+    # reply to end_call.
+    def begin_call(self, proc, args, pack_func):
+        if pack_func is None and args is not None:
+            raise TypeError('Non-null args with null pack_func')
+        self.start_call(proc)
+        if pack_func:
+            pack_func(args)
+        self.send_record(self.packer.get_buf())
+
+    def end_call(self, reply, unpack_func):
+        self.check_reply(reply)
+        if unpack_func:
+            result = unpack_func()
+        else:
+            result = None
+        self.unpacker.done()
+        return result
+
+
+class RecordReader(object):
+    # Reassembles one record (RFC 1831 record marking) from the chunks a
+    # non-blocking socket delivers
+    def __init__(self):
+        self.pending = bytearray()
+        self.fragments = list()
+
+    def feed(self, data):
+        self.pending.extend(data)
+        while len(self.pending) >= 4:
+            length = struct.unpack('>I', str(self.pending[:4]))[0]
+            last = bool(length & 0x80000000)
+            length &= 0x7fffffff
+            if len(self.pending) < 4+length:
+                return None
+            self.fragments.append(str(self.pending[4:4+length]))
+            del self.pending[:4+length]
+            if last:
+                record = ''.join(self.fragments)
+                self.fragments = list()
+                return record
+        return None
+
 
 class CommonPortMapperClient:
     def __init__(self):
@@ -26,22 +26,20 @@ import numpy as np # You also need to install the numpy-package exe under Window
 import os
 import sys
 import datetime
-from prologix_GPIB_ethernet import prologix_ethernet
+import prologix_broker
 
 class solartron: # Works with 1287 and 1260
     def __init__(self, device_file="electrochem-m31", mode="Potentiostat"):
+        self.solartron_1287_address = 6 # address +1 is the minor address to get binary data. *Potentiostat/Galvanostat* 
+        self.solartron_1260_address = 4 # address +1 is the minor address to get binary data. *Analyzer*
         try:
-            if "/" not in device_file: # means it is not a path to /dev/xxx
-                self.using_GPIB_to_Ethernet = True
-                self.device = prologix_ethernet(device_file)
-            else:
-                self.device = open(device_file, "w+")
-                self.using_GPIB_to_Ethernet = False
+            self.device = prologix_broker.get_handle(device_file, self.solartron_1260_address, eoi=1, eos=3) # Indicate End-of-data, dont append anything
+            self.using_GPIB_to_Ethernet = self.device.using_GPIB_to_Ethernet
         except:
             return -1
-        self.solartron_1287_address = 6 # address +1 is the minor address to get binary data. *Potentiostat/Galvanostat* 
-        self.solartron_1260_address = 4 # address +1 is the minor address to get binary data. *Analyzer*
         self.sleep_time = 0.3 # time between asking and getting the answer
+        self.poll_status_byte = True # wait for answers with serial polls, the sleep times are only the timeout
+        self.message_available_mask = prologix_broker.STB_MAV # status byte bit telling that an answer is ready
         self.current_address = self.solartron_1260_address
         #self.sleep_time = 2 # time between asking and getting the answer
         self.sleep_time_specific_measurement = 0
@@ -49,11 +47,7 @@ class solartron: # Works with 1287 and 1260
         self.ready = False
         self.mode = mode
         self.debug = True
-        self.write_to_dev("++mode 1")
         self.talk_to_analyzer() # 1260
-        self.write_to_dev("++auto 0")
-        self.write_to_dev("++eos 3") # Dont append anything 0=CRLF 1=CR 2=LF 3=None
-        self.write_to_dev("++eoi 1") # Indicate End-of-data
         #self.write_to_dev("TT1"self.solartron_1260_address) # initialize device
         #time.sleep(5.0)
         self.write_to_dev("TT2",self.solartron_1260_address) # reset device poland
@@ -157,7 +151,7 @@ class solartron: # Works with 1287 and 1260
         self.change_address(self.solartron_1287_address)
         return
         
-    def write_to_dev(self, string, which=None):
+    def write_to_dev(self, string, which=None, wait=True):
         if self.debug:
             if which is not None and which is not self.current_address:
                 print "Now talking to:",which
@@ -166,15 +160,12 @@ class solartron: # Works with 1287 and 1260
         self.device.write(string + "\n")
         if self.debug:
             print "Just wrote: ",string
-        time.sleep(self.sleep_time)
+        if wait:
+            time.sleep(self.sleep_time)
         return
 
     def read_from_dev(self):
-        self.write_to_dev("++read eoi\n")
-        if self.using_GPIB_to_Ethernet:
-            a = self.device.read()
-        else:
-            a = self.device.readline()
+        a = self.device.read() # ++read eoi and the answer in one transaction
         if self.debug:
             print a
         return a
@@ -186,8 +177,12 @@ class solartron: # Works with 1287 and 1260
         return "Solartron"
         
     def query(self, string):
-        self.write_to_dev(string)
-        time.sleep(self.sleep_time_specific_measurement)
+        if self.poll_status_byte:
+            self.write_to_dev(string, wait=False)
+            self.device.wait_for_message(self.sleep_time+self.sleep_time_specific_measurement, self.message_available_mask)
+        else:
+            self.write_to_dev(string)
+            time.sleep(self.sleep_time_specific_measurement)
         return self.read_from_dev()
 
     def setup_impedance_measurement(self, num_repetitions=7, amplitude=0.05, bias=0):
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Unified measurement software UMS
+# New measurement software for the electrochemical materials group, Prof. Jennifer Rupp
+#
+# Copyright (c) 2013 Reto Pfenninger, department of materials, D-MATL, ETH Zürich
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Buffered reader for line based socket protocols (Prologix GPIB-Ethernet,
+# TTi LXI power supplies).
+#
+# Everything received from the socket goes into one receive buffer. A read
+# takes exactly one message out of it and leaves whatever came after it for
+# the next read, so no bytes are lost. The search for the terminator only
+# looks at newly received bytes, which keeps large answers (e.g. TRAC:DATA?
+# dumps of several hundred kB) linear in their size.
+
+import socket
+
+CHUNK_SIZE = 64*1024
+
+
+class stream_reader(object):
+    def __init__(self, sock):
+        self.sock = sock
+        self.buf = bytearray()
+        self.chunk = bytearray(CHUNK_SIZE)
+        self.chunk_view = memoryview(self.chunk)
+
+    def fill(self): # one recv() into the buffer, raises socket.timeout
+        n = self.sock.recv_into(self.chunk_view, CHUNK_SIZE)
+        if n == 0:
+            raise EOFError("Connection closed by the device")
+        self.buf.extend(self.chunk_view[:n])
+        return n
+
+    def take(self, n):
+        data = str(self.buf[:n])
+        del self.buf[:n]
+        return data
+
+    def read_until(self, terminator="\n"):
+        # returns the message including the terminator, None if nothing
+        # arrived before the timeout
+        searched = 0
+        while True:
+            end = self.buf.find(terminator, searched)
+            if end != -1:
+                return self.take(end+len(terminator))
+            searched = max(len(self.buf)-len(terminator)+1, 0)
+            try:
+                self.fill()
+            except socket.timeout:
+                if len(self.buf) > 0:
+                    raise RuntimeError("Got timeout after receiving partial result : %s" % str(self.buf[:200]))
+                return None
+
+    def readline(self):
+        return self.read_until("\n")
+
+    def read_exact(self, n):
+        while len(self.buf) < n:
+            try:
+                self.fill()
+            except socket.timeout:
+                raise RuntimeError("Got timeout after receiving %d of %d bytes" % (len(self.buf), n))
+        return self.take(n)
+
+    def read_available(self, timeout=0.1):
+        # everything that is buffered or arrives within timeout
+        old_timeout = self.sock.gettimeout()
+        self.sock.settimeout(timeout)
+        try:
+            while True:
+                self.fill()
+        except (socket.timeout, EOFError):
+            pass
+        finally:
+            self.sock.settimeout(old_timeout)
+        return self.take(len(self.buf))
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Unified measurement software UMS
+# New measurement software for the electrochemical materials group, Prof. Jennifer Rupp
+#
+# Copyright (c) 2013 Reto Pfenninger, department of materials, D-MATL, ETH Zürich
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Unittests for the setpoint programmer of the Eurotherm 2400 series
+# (eurotherm_programmer), with the stand-in slave from dummy_modbus_tcp.
+# Run them from the devices folder: python test_eurotherm_programmer.py
+
+import unittest
+
+import modbus_tcp
+import dummy_modbus_tcp
+import eurotherm_2404
+import eurotherm_programmer
+
+
+class TestEurothermProgrammer(unittest.TestCase):
+
+    def setUp(self):
+        self.slave = dummy_modbus_tcp.slave({1: {289: 1234, 2: 5000, 3: 0, 4: 0, 5: 4990, 35: 100, 85: 423, 268: 0, 273: 0}})
+        self.slave.missing = 0
+
+    def tearDown(self):
+        modbus_tcp.close_all()
+        self.slave.close()
+
+    def testUploadAndRun(self):
+        oven = eurotherm_2404.eurotherm_2404(self.slave.url)
+        requests = self.slave.requests
+        oven.upload_program([eurotherm_programmer.ramp(900, 5), eurotherm_programmer.dwell(60)], number=2)
+        self.assertEqual(self.slave.requests-requests, 3) # reset, general data, all segments
+        segment = 8192+2*136+8
+        self.assertEqual([self.slave.registers[1][segment+k] for k in range(4)], [1, 9000, 50, 0])
+        self.assertEqual([self.slave.registers[1][segment+8+k] for k in range(4)], [3, 0, 0, 600])
+        self.assertEqual(self.slave.registers[1][segment+16], 0) # end segment
+        oven.run_program(2)
+        self.assertEqual((self.slave.registers[1][22], self.slave.registers[1][57]), (2, eurotherm_programmer.RUN))
+        self.slave.registers[1][23] = eurotherm_programmer.COMPLETE
+        self.assertEqual(oven.wait_for_program(0)["program_status"], eurotherm_programmer.COMPLETE)
+
+
+if __name__ == '__main__':
+    unittest.main()
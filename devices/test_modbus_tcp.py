@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Unified measurement software UMS
+# New measurement software for the electrochemical materials group, Prof. Jennifer Rupp
+#
+# Copyright (c) 2013 Reto Pfenninger, department of materials, D-MATL, ETH Zürich
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Unittests for modbus_tcp, with the stand-in slave from dummy_modbus_tcp.
+# Run them from the devices folder: python test_modbus_tcp.py
+
+import unittest
+
+import minimalmodbus
+import modbus_tcp
+import dummy_modbus_tcp
+import eurotherm_3500
+
+
+class TestModbusTcp(unittest.TestCase):
+
+    def setUp(self):
+        self.slave = dummy_modbus_tcp.slave({1: {289: 1234, 2: 5000, 3: 0, 4: 0, 5: 4990, 35: 100, 85: 423, 268: 0, 273: 0}})
+        self.instrument = minimalmodbus.Instrument(self.slave.url, 1)
+
+    def tearDown(self):
+        modbus_tcp.close_all()
+        self.slave.close()
+
+    def testTransportFromUrl(self):
+        self.assertTrue(isinstance(self.instrument.transport, modbus_tcp.tcp_transport))
+        self.assertEqual(self.instrument.serial, None)
+        self.assertTrue(minimalmodbus.Instrument(self.slave.url, 2).transport is self.instrument.transport)
+
+    def testParseUrl(self):
+        self.assertEqual(modbus_tcp.parse_url("tcp://10.0.0.5"), ("10.0.0.5", 502))
+        self.assertEqual(modbus_tcp.parse_url("tcp://10.0.0.5:1502"), ("10.0.0.5", 1502))
+
+    def testReadRegister(self):
+        self.assertAlmostEqual(self.instrument.read_register(289, 1), 123.4)
+        self.assertEqual(self.instrument.read_registers(2, 4), [5000, 0, 0, 4990])
+
+    def testWriteRegister(self):
+        self.instrument.write_register(24, 55.5, 1)
+        self.assertEqual(self.slave.registers[1][24], 555)
+        self.instrument.write_registers(30, [1, 2, 3])
+        self.assertEqual(self.instrument.read_registers(30, 3), [1, 2, 3])
+
+    def testExceptionResponse(self):
+        self.assertRaises(ValueError, self.instrument.read_register, 7000)
+        self.assertEqual(self.instrument.read_register(35), 100) # the connection is still usable
+
+    def testPipelinedBlocks(self):
+        blocks = self.instrument.read_register_blocks([(2, 4), (35, 1), (85, 1), (289, 1)])
+        self.assertEqual(blocks, [[5000, 0, 0, 4990], [100], [423], [1234]])
+
+    def testAnswersOutOfOrder(self):
+        transport = self.instrument.transport
+        transport.execute(1, 3, "\x01\x21\x00\x01") # connect
+        first = transport.send(1, 3, "\x00\x23\x00\x01")
+        second = transport.send(1, 3, "\x00\x55\x00\x01")
+        self.assertEqual(transport.check(transport.receive(second), 1, 3), "\x02\x01\xa7")
+        self.assertEqual(transport.check(transport.receive(first), 1, 3), "\x02\x00\x64")
+
+    def testNoConnection(self):
+        instrument = minimalmodbus.Instrument("tcp://127.0.0.1:1", 1)
+        self.assertRaises(IOError, instrument.read_register, 289)
+
+    def testEurothermSnapshot(self):
+        self.slave.missing = 0x8000
+        oven = eurotherm_3500.eurotherm_3500(self.slave.url)
+        requests = self.slave.requests
+        self.assertAlmostEqual(oven.get_pv_loop1(), 123.4)
+        self.assertAlmostEqual(oven.get_sp_loop1(), 499.0)
+        self.assertAlmostEqual(oven.get_op_loop1(), 42.3)
+        self.assertFalse(oven.is_manual_loop1())
+        self.assertEqual(self.slave.requests-requests, 4) # one pipelined snapshot, served from the cache afterwards
+        oven.set_sp_loop1(600)
+        self.assertAlmostEqual(self.slave.registers[1][24], 6000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -70,6 +70,7 @@ class voegtlin_gsc( minimalmodbus.Instrument ):
         minimalmodbus.Instrument.__init__(self, portname, slaveaddresses[0], stop_bits=2) # connect to the first one
         # sort out all addresses where no device is present
         self.mfc_addresses = []
+        self.static_info = {} # modbus address -> unit, unit factor, medium and calibrated end value
         self.voegtlin_debug = voegtlin_debug
         for test_address in slaveaddresses:
             if self.set_flowmeter_address(test_address):
@@ -84,10 +85,11 @@ class voegtlin_gsc( minimalmodbus.Instrument ):
         active_mfc = self.address
         for flowmeter_address in self.mfc_addresses:
             max_flow = ""
-            v = self.get_calibrated_end_value(flowmeter_address)[0]
+            info = self.get_static_info(flowmeter_address)
+            v = info["end_value"]
             if v != 0.0:
                 max_flow = " "+str(int(v))
-            result_array.append([flowmeter_address,self.get_medium_info(flowmeter_address)+max_flow])
+            result_array.append([flowmeter_address,info["medium"]+max_flow])
         self.set_flowmeter_address(active_mfc) # set back to the address of the mfc-in-charge before calling this function
         return result_array
         
@@ -123,9 +125,9 @@ class voegtlin_gsc( minimalmodbus.Instrument ):
             self.set_flowmeter_address(which)
         try:
             a = self.read_float(0) # f32 r 2reg
+            unit_factor = self.get_static_info()["unit_factor"]
         except IOError:
             return None # Error during communication, Return a integer value nevertheless to make the program not crash.
-        unit_factor = self.get_unit_conversion_factor()
         return a*unit_factor
         
     def get_id(self,which=None): # returns the serial number
@@ -145,15 +147,16 @@ class voegtlin_gsc( minimalmodbus.Instrument ):
         if which is not None:
             self.set_flowmeter_address(which)
         a = self.read_float(6) # f32 rw 2reg
-        unit_factor = self.get_unit_conversion_factor()
+        unit_factor = self.get_static_info()["unit_factor"]
         return a*unit_factor
         
     def set_sp(self,value,which=None): # value is in unit [mln/min]
         if which is not None:
             self.set_flowmeter_address(which)
         # Now make sure that the flow is not going to be set bigger than the maximum opening which is possible. Maximum opening is only visible on newer instruments
-        unit_factor = self.get_unit_conversion_factor()
-        max_val = self.get_calibrated_end_value()[0]*unit_factor
+        info = self.get_static_info()
+        unit_factor = info["unit_factor"]
+        max_val = info["end_value"]*unit_factor
         if max_val != 0.0 and value > max_val:
             print "ERROR: The setpoint of the Mass-flow-controller with serial number:",self.get_id(),"cannot be set to:",value," which is higher than its maximum of:",max_val
             self.write_float(6, max_val/unit_factor) # f32 rw 2reg
@@ -295,6 +298,7 @@ class voegtlin_gsc( minimalmodbus.Instrument ):
             print "ERROR: The argument supplied to set_modbus_address() is out of allowed range (1-247). You wanted:",value
         else:
             self.write_register(19, value, 0) # u16 (but 2 u8) rw 1reg
+            self.static_info.pop(self.address, None)
         return 
         
     def get_medium_info(self,which=None): # s8 r 4reg TODO shorter?
@@ -555,6 +559,7 @@ class voegtlin_gsc( minimalmodbus.Instrument ):
             print "ERROR: The function set_lut() is not supported on the model with serialnumber: ",self.get_serial_number()
             return None
         self.write_register(16697, value, 0) # u8 rw 1reg
+        self.static_info.pop(self.address, None) # other gas, other medium and end value
         return
         
     def get_lut(self,which=None): # TODO SN 103684 unknown # type of gas used. default 2, can store 11 settings
@@ -808,6 +813,7 @@ class voegtlin_gsc( minimalmodbus.Instrument ):
             print "ERROR: The function set_lut_access() is not supported on the model with serialnumber: ",self.get_serial_number()
             return None
         self.write_register(24575, value, 0) #u8 rw 1reg
+        self.static_info.pop(self.address, None)
         return
         
     def get_lut_id(self,which=None):
@@ -824,8 +830,20 @@ class voegtlin_gsc( minimalmodbus.Instrument ):
         return [flow,unit]
 
         
-    def get_unit_conversion_factor(self,which=None): # always return the value for milli-unit: sccm
-        unit = self.get_measurement_unit(which)
+    def get_static_info(self,which=None): # does not change during a measurement, so it is only read once per flowmeter
+        if which is not None:
+            self.set_flowmeter_address(which)
+        if self.address not in self.static_info:
+            unit = self.get_measurement_unit()
+            self.static_info[self.address] = {"unit": unit,
+                                              "unit_factor": self.get_unit_conversion_factor(unit=unit),
+                                              "medium": self.get_medium_info(),
+                                              "end_value": self.read_float(24608)} # f32 r 2reg, see get_calibrated_end_value
+        return self.static_info[self.address]
+        
+    def get_unit_conversion_factor(self,which=None,unit=None): # always return the value for milli-unit: sccm
+        if unit is None:
+            unit = self.get_measurement_unit(which)
         # The following units are available: lb/min, lb/h, sscm, mln/min, ln/min, ln/h, mls/min, ls/min, ls/h, m3n/h,
         # m3s/h, kg/min, kg/h, g/min, g/h, mln/h, mls/h, NLPM, SLPM, NLPH, SLPH, SCFM, SCFH 
         if "sccm" not in unit  and "mln/min" not in unit and "ln/min" not in unit and unit is not "" and not all(i == '\x00' for i in unit):
@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Unified measurement software UMS
+# New measurement software for the electrochemical materials group, Prof. Jennifer Rupp
+#
+# Copyright (c) 2013 Reto Pfenninger, department of materials, D-MATL, ETH Zürich
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Round-robin polling of all Vögtlin red-y flowmeters on one RS-485 line.
+#
+# The scheduler owns the serial line of a voegtlin_gsc instance, everything
+# that talks to the flowmeters while it is in use goes through its lock. The
+# static data of every slave (unit factor, medium, calibrated end value) is
+# read once by voegtlin_gsc.get_static_info(). A tick reads the registers 0-11
+# (flow, gas temperature, totalizer, setpoint, analog input, valve position) of
+# every slave with one read_registers call each and publishes the values in
+# latest, so reading all gas channels costs one transaction per flowmeter.
+#
+# tick() does one round in the calling thread (ums.mfc uses it between its
+# setpoint changes), start() polls in a thread at a target rate.
+
+import struct
+import threading
+import time
+
+FIRST_REGISTER = 0
+NUMBER_OF_REGISTERS = 12
+FLOW = 0 # offsets of the f32 values in the block
+TEMPERATURE = 2
+SETPOINT = 6
+VALVE = 10
+
+
+def _float(registers, offset): # f32, high word first like minimalmodbus.read_float
+    return struct.unpack(">f", struct.pack(">HH", registers[offset], registers[offset+1]))[0]
+
+
+class voegtlin_scheduler(object):
+    def __init__(self, device, addresses=None, rate=5.0):
+        self.device = device
+        if addresses is None:
+            addresses = device.mfc_addresses
+        self.addresses = list(addresses)
+        self.rate = float(rate) # rounds per second in the polling thread
+        self.lock = threading.RLock()
+        self.latest = {} # modbus address -> {"flow", "temperature", "sp", "valve", "time"} or None after an error
+        self.errors = {} # modbus address -> number of failed polls
+        self.thread = None
+        self.running = False
+        with self.lock:
+            for address in self.addresses:
+                device.get_static_info(address)
+
+    def poll(self, address):
+        with self.lock:
+            self.device.set_flowmeter_address(address)
+            try:
+                # read again after set_lut() and friends invalidated the static info
+                unit_factor = self.device.get_static_info()["unit_factor"]
+                registers = self.device.read_registers(FIRST_REGISTER, NUMBER_OF_REGISTERS)
+            except IOError:
+                self.errors[address] = self.errors.get(address, 0)+1
+                self.latest[address] = None # like get_pv, which returns None on a communication error
+                return None
+        values = {"flow": _float(registers, FLOW)*unit_factor,
+                  "temperature": _float(registers, TEMPERATURE),
+                  "sp": _float(registers, SETPOINT)*unit_factor,
+                  "valve": _float(registers, VALVE),
+                  "time": time.time()}
+        self.latest[address] = values
+        return values
+
+    def tick(self):
+        for address in self.addresses:
+            self.poll(address)
+        return self.latest
+
+    def get(self, address, key):
+        values = self.latest.get(address)
+        if values is None:
+            return None
+        return values[key]
+
+    def get_flow(self, address):
+        return self.get(address, "flow")
+
+    def get_gas_temperature(self, address):
+        return self.get(address, "temperature")
+
+    def get_valve_position(self, address):
+        return self.get(address, "valve")
+
+    def set_sp(self, value, address):
+        with self.lock:
+            self.device.set_sp(value, address)
+
+    def run(self):
+        period = 1.0/self.rate
+        next_tick = time.time()
+        while self.running:
+            self.tick()
+            next_tick += period
+            delay = next_tick-time.time()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.time() # too slow for the rate, do not try to catch up
+
+    def start(self):
+        if self.thread is not None:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self.run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
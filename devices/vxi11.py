@@ -0,0 +1,798 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Pure python VXI-11 client
+# Copyright (c) 2011 Michael Walle
+#
+# Unified measurement software UMS
+# New measurement software for the electrochemical materials group, Prof. Jennifer Rupp
+#
+# Copyright (c) 2013 Reto Pfenninger, department of materials, D-MATL, ETH Zürich
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Shared VXI-11 code for all LAN instruments (Keithley 26xxB, Tektronix AFG).
+#
+# The core channel port of every host is looked up only once with the
+# portmapper. One core connection per host and one link per (host, device
+# name) are kept in a process-wide pool, so instrument objects which are
+# created again and again (e.g. between Arrhenius steps) reuse the open link
+# instead of paying the connection setup each time. Everything in the pool is
+# destroyed by close_all(), which also runs when the interpreter exits.
+#
+# Several instruments can be queried concurrently from one thread with
+# ask_async() and wait() (or ask_many()): the calls of all instruments are
+# sent first and the replies are collected with select() as they arrive, so
+# the latencies of the instruments overlap instead of adding up.
+#
+# Instead of sleeping a worst-case time before reading an answer, a driver can
+# enable service requests (enable_srq): the instrument then calls back over
+# the VXI-11 interrupt channel (device_intr_srq) as soon as a message is
+# available and wait_for_srq()/wait_for_message() return immediately. Drivers
+# with wait_with_srq do so in open() and poll the status byte if the
+# interrupt channel cannot be created.
+
+import atexit
+import logging
+import select
+import socket
+import struct
+import threading
+import time
+
+import rpc
+
+DEVICE_CORE_PROG = 0x0607af
+DEVICE_CORE_VERS = 1
+DEVICE_ASYNC_PROG = 0x0607b0
+DEVICE_ASYNC_VERS = 1
+DEVICE_INTR_PROG = 0x0607b1
+DEVICE_INTR_VERS = 1
+
+CREATE_LINK = 10
+DEVICE_WRITE = 11
+DEVICE_READ = 12
+DEVICE_READSTB = 13
+DEVICE_TRIGGER = 14
+DEVICE_CLEAR = 15
+DEVICE_REMOTE = 16
+DEVICE_LOCAL = 17
+DEVICE_LOCK = 18
+DEVICE_UNLOCK = 19
+DEVICE_ENABLE_SRQ = 20
+DEVICE_DOCMD = 22
+DESTROY_LINK = 23
+CREATE_INTR_CHAN = 25
+DESTROY_INTR_CHAN = 26
+DEVICE_INTR_SRQ = 30
+
+DEVICE_TCP = 0
+DEVICE_UDP = 1
+
+ERR_NO_ERROR = 0
+ERR_INVALID_LINK_IDENTIFIER = 4
+ERR_PARAMETER_ERROR = 5
+ERR_DEVICE_LOCKED_BY_ANOTHER_LINK = 11
+ERR_IO_TIMEOUT = 15
+ERR_IO_ERROR = 17
+ERR_ABORT = 23
+
+OP_FLAG_WAIT_BLOCK = 1
+OP_FLAG_END = 8
+OP_FLAG_TERMCHAR_SET = 128
+
+REASON_REQCNT = 1
+REASON_CHR = 2
+REASON_END = 4
+
+STB_MAV = 16 # message available bit of the status byte
+
+def chunks(d, n):
+    for i in xrange(0, len(d), n):
+        yield d[i:i+n]
+
+log = logging.getLogger(__name__)
+
+class Vxi11Packer(rpc.RpcPacker):
+    def pack_device_link(self, link):
+        self.pack_int(link)
+
+    def pack_create_link_parms(self, params):
+        id, lock_device, lock_timeout, device = params
+        self.pack_int(id)
+        self.pack_bool(lock_device)
+        self.pack_uint(lock_timeout)
+        self.pack_string(device)
+
+    def pack_device_write_parms(self, params):
+        link, io_timeout, lock_timeout, flags, data = params
+        self.pack_device_link(link)
+        self.pack_uint(io_timeout)
+        self.pack_uint(lock_timeout)
+        self.pack_int(flags)
+        self.pack_opaque(data)
+
+    def pack_device_read_parms(self, params):
+        link, request_size, io_timeout, lock_timeout, flags, term_char = params
+        self.pack_device_link(link)
+        self.pack_uint(request_size)
+        self.pack_uint(io_timeout)
+        self.pack_uint(lock_timeout)
+        self.pack_int(flags)
+        self.pack_int(term_char)
+
+    def pack_device_generic_parms(self, params):
+        link, flags, lock_timeout, io_timeout = params
+        self.pack_device_link(link)
+        self.pack_int(flags)
+        self.pack_uint(lock_timeout)
+        self.pack_uint(io_timeout)
+
+    def pack_device_remote_func(self, params):
+        host_addr, host_port, prog_num, prog_vers, prog_family = params
+        self.pack_uint(host_addr)
+        self.pack_uint(host_port)
+        self.pack_uint(prog_num)
+        self.pack_uint(prog_vers)
+        self.pack_enum(prog_family)
+
+    def pack_device_enable_srq_parms(self, params):
+        link, enable, handle = params
+        self.pack_device_link(link)
+        self.pack_bool(enable)
+        self.pack_opaque(handle)
+
+
+class Vxi11Unpacker(rpc.RpcUnpacker):
+    def unpack_device_link(self):
+        return self.unpack_int()
+
+    def unpack_device_error(self):
+        return self.unpack_int()
+
+    def unpack_create_link_resp(self):
+        error = self.unpack_int()
+        link = self.unpack_device_link()
+        abort_port = self.unpack_uint()
+        max_recv_size = self.unpack_uint()
+        return error, link, abort_port, max_recv_size
+
+    def unpack_device_write_resp(self):
+        error = self.unpack_int()
+        size = self.unpack_uint()
+        return error, size
+
+    def unpack_device_read_resp(self):
+        error = self.unpack_int()
+        reason = self.unpack_int()
+        data = self.unpack_opaque()
+        return error, reason, data
+
+    def unpack_device_readstb_resp(self):
+        error = self.unpack_int()
+        stb = self.unpack_uint()
+        return error, stb
+
+
+class Vxi11Client(rpc.RawTCPClient):
+    def __init__(self, host, port=None):
+        self.packer = Vxi11Packer()
+        self.unpacker = Vxi11Unpacker('')
+        self.lock = threading.RLock() # packer, unpacker and socket are shared by all links of this host
+        if port is None:
+            port = get_core_port(host)
+        log.debug('VXI-11 uses port %d', port)
+
+        rpc.RawTCPClient.__init__(self, host, DEVICE_CORE_PROG,
+                DEVICE_CORE_VERS, port)
+
+    def make_call(self, proc, args, pack_func, unpack_func):
+        with self.lock:
+            return rpc.RawTCPClient.make_call(self, proc, args, pack_func,
+                    unpack_func)
+
+    def create_link(self, id, lock_device, lock_timeout, name):
+        params = (id, lock_device, lock_timeout, name)
+        return self.make_call(CREATE_LINK, params,
+                self.packer.pack_create_link_parms,
+                self.unpacker.unpack_create_link_resp)
+
+    def device_write(self, link, io_timeout, lock_timeout, flags, data):
+        params = (link, io_timeout, lock_timeout, flags, data)
+        return self.make_call(DEVICE_WRITE, params,
+                self.packer.pack_device_write_parms,
+                self.unpacker.unpack_device_write_resp)
+
+    def device_read(self, link, request_size, io_timeout, lock_timeout, flags,
+            term_char):
+        params = (link, request_size, io_timeout, lock_timeout, flags,
+                term_char)
+        return self.make_call(DEVICE_READ, params,
+                self.packer.pack_device_read_parms,
+                self.unpacker.unpack_device_read_resp)
+
+    def destroy_link(self, link):
+        return self.make_call(DESTROY_LINK, link,
+                self.packer.pack_device_link,
+                self.unpacker.unpack_device_error)
+
+    def device_readstb(self, link, flags, lock_timeout, io_timeout):
+        params = (link, flags, lock_timeout, io_timeout)
+        return self.make_call(DEVICE_READSTB, params,
+                self.packer.pack_device_generic_parms,
+                self.unpacker.unpack_device_readstb_resp)
+
+    def device_enable_srq(self, link, enable, handle):
+        params = (link, enable, handle)
+        return self.make_call(DEVICE_ENABLE_SRQ, params,
+                self.packer.pack_device_enable_srq_parms,
+                self.unpacker.unpack_device_error)
+
+    def create_intr_chan(self, host_addr, host_port, prog_num, prog_vers,
+            prog_family):
+        params = (host_addr, host_port, prog_num, prog_vers, prog_family)
+        return self.make_call(CREATE_INTR_CHAN, params,
+                self.packer.pack_device_remote_func,
+                self.unpacker.unpack_device_error)
+
+    def destroy_intr_chan(self):
+        return self.make_call(DESTROY_INTR_CHAN, None, None,
+                self.unpacker.unpack_device_error)
+
+
+class Vxi11Error(Exception):
+    pass
+
+
+# Process-wide connection and link pool
+_pool_lock = threading.RLock()
+_core_ports = {}   # host -> port of the VXI-11 core channel
+_clients = {}      # host -> Vxi11Client
+_links = {}        # (host, name) -> [link_id, max_recv_size, users]
+_generations = {}  # host -> number of drop_host() calls, older link ids are dead
+_intr_hosts = set() # hosts with an interrupt channel to our intr_server
+_srq_events = {}   # handle -> threading.Event, set by intr_server
+_intr_server = None
+
+def get_core_port(host):
+    with _pool_lock:
+        if host not in _core_ports:
+            pmap = rpc.TCPPortMapperClient(host)
+            try:
+                mapping = (DEVICE_CORE_PROG, DEVICE_CORE_VERS, rpc.IPPROTO_TCP, 0)
+                _core_ports[host] = pmap.get_port(mapping)
+            finally:
+                pmap.close()
+        return _core_ports[host]
+
+def get_client(host):
+    with _pool_lock:
+        if host not in _clients:
+            _clients[host] = Vxi11Client(host)
+        return _clients[host]
+
+def open_link(host, name, client_id):
+    with _pool_lock:
+        key = (host, name)
+        if key not in _links:
+            try:
+                answer = get_client(host).create_link(client_id, 0, 0, name)
+            except (socket.error, EOFError):
+                # the instrument was restarted since we last talked to it
+                drop_host(host)
+                answer = get_client(host).create_link(client_id, 0, 0, name)
+            error, link_id, abort_port, max_recv_size = answer
+            if error != 0:
+                raise RuntimeError('TBD. This means the internal firmware of the device hangs. Turn the device off and on again and everything should work again!')
+
+            # Some devices seem to return -1, but max_recv_size is unsigned.
+            # As a workaround we set an upper boundary of 16k
+            max_recv_size = min(max_recv_size, 16*1024)
+
+            log.debug('link id is %d, max_recv_size is %d',
+                    link_id, max_recv_size)
+            _links[key] = [link_id, max_recv_size, 0]
+        _links[key][2] += 1
+        return _links[key][0], _links[key][1]
+
+def release_link(host, name, keep_alive=True):
+    with _pool_lock:
+        key = (host, name)
+        if key not in _links:
+            return
+        _links[key][2] = max(_links[key][2]-1, 0)
+        if keep_alive or _links[key][2] > 0:
+            return
+        link_id = _links.pop(key)[0]
+        try:
+            _clients[host].destroy_link(link_id)
+        except (socket.error, EOFError, KeyError):
+            pass
+        if not [k for k in _links if k[0] == host]:
+            _clients.pop(host).close()
+
+def drop_host(host): # forget a broken connection, the next open_link() reconnects
+    with _pool_lock:
+        _generations[host] = _generations.get(host, 0)+1
+        _intr_hosts.discard(host)
+        for key in [k for k in _links if k[0] == host]:
+            del _links[key]
+        client = _clients.pop(host, None)
+        if client is not None:
+            try:
+                client.close()
+            except socket.error:
+                pass
+
+def close_all():
+    with _pool_lock:
+        for host in _intr_hosts:
+            try:
+                _clients[host].destroy_intr_chan()
+            except (socket.error, EOFError, KeyError, rpc.RpcError):
+                pass
+        _intr_hosts.clear()
+        for (host, name), (link_id, max_recv_size, users) in _links.items():
+            try:
+                _clients[host].destroy_link(link_id)
+            except (socket.error, EOFError, KeyError, rpc.RpcError):
+                pass
+        _links.clear()
+        for client in _clients.values():
+            try:
+                client.close()
+            except socket.error:
+                pass
+        _clients.clear()
+
+atexit.register(close_all)
+
+
+class intr_server:
+    # Receives the device_intr_srq calls of all instruments (one-way RPCs,
+    # they are not answered) and sets the event of the handle they carry
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(('', 0))
+        self.sock.listen(5)
+        self.port = self.sock.getsockname()[1]
+        thread = threading.Thread(target=self.accept)
+        thread.daemon = True
+        thread.start()
+
+    def accept(self):
+        while True:
+            connection, address = self.sock.accept()
+            thread = threading.Thread(target=self.serve, args=(connection,))
+            thread.daemon = True
+            thread.start()
+
+    def recv_exact(self, connection, n):
+        buf = bytearray(n)
+        view = memoryview(buf)
+        n_received = 0
+        while n_received < n:
+            k = connection.recv_into(view[n_received:], n-n_received)
+            if k == 0:
+                raise EOFError()
+            n_received += k
+        return str(buf)
+
+    def serve(self, connection):
+        unpacker = rpc.RpcUnpacker('')
+        try:
+            while True:
+                record = list()
+                last = False
+                while not last:
+                    length = struct.unpack('>I', self.recv_exact(connection, 4))[0]
+                    last = bool(length & 0x80000000)
+                    record.append(self.recv_exact(connection, length & 0x7fffffff))
+                unpacker.reset(''.join(record))
+                try:
+                    xid, prog, vers, proc, cred, verf = unpacker.unpack_callheader()
+                    if prog != DEVICE_INTR_PROG or proc != DEVICE_INTR_SRQ:
+                        log.debug('Ignoring interrupt channel call %d/%d', prog, proc)
+                        continue
+                    handle = unpacker.unpack_opaque()
+                except (rpc.RpcError, EOFError, struct.error):
+                    log.debug('Garbage on the interrupt channel')
+                    continue
+                log.debug('SRQ for %s', handle)
+                with _pool_lock:
+                    event = _srq_events.get(handle)
+                if event is not None:
+                    event.set()
+        except (EOFError, socket.error):
+            connection.close()
+
+def enable_interrupts(host):
+    global _intr_server
+    with _pool_lock:
+        if _intr_server is None:
+            _intr_server = intr_server()
+        if host not in _intr_hosts:
+            client = get_client(host)
+            # the instrument has to connect back to the address it reaches us on
+            local_address = client.sock.getsockname()[0]
+            host_addr = struct.unpack('>I', socket.inet_aton(local_address))[0]
+            error = client.create_intr_chan(host_addr, _intr_server.port,
+                    DEVICE_INTR_PROG, DEVICE_INTR_VERS, DEVICE_TCP)
+            if error != ERR_NO_ERROR:
+                raise Vxi11Error(error)
+            _intr_hosts.add(host)
+
+def srq_event(handle):
+    with _pool_lock:
+        return _srq_events.setdefault(handle, threading.Event())
+
+
+class Vxi11Future(object):
+    # A pending ask() of one instrument, driven by wait()
+    def __init__(self, device, message):
+        self.device = device
+        self.message = message
+        self.done = False
+        self.value = None
+        self.error = None
+        self.proc = None
+        self.msg_chunks = list(chunks(message, device.max_recv_size))
+        self.data_list = list()
+
+    def result(self, timeout=None):
+        if not self.done:
+            wait([self], timeout)
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+    def _finish(self, value=None, error=None):
+        self.value = value
+        self.error = error
+        self.done = True
+
+    def _next_call(self, client):
+        io_timeout = self.device.io_timeout * 1000       # in ms
+        lock_timeout = self.device.lock_timeout * 1000   # in ms
+        if self.msg_chunks:
+            chunk = self.msg_chunks[0]
+            if len(self.msg_chunks) == 1:
+                flags = OP_FLAG_END
+            else:
+                flags = 0
+            self.proc = DEVICE_WRITE
+            client.begin_call(DEVICE_WRITE, (self.device.link_id, io_timeout,
+                    lock_timeout, flags, chunk),
+                    client.packer.pack_device_write_parms)
+        else:
+            self.proc = DEVICE_READ
+            client.begin_call(DEVICE_READ, (self.device.link_id,
+                    self.device.max_recv_size, io_timeout, lock_timeout, 0, 0),
+                    client.packer.pack_device_read_parms)
+
+    def _on_reply(self, client, reply): # returns True when another call has to be sent
+        if self.proc == DEVICE_WRITE:
+            error, size = client.end_call(reply,
+                    client.unpacker.unpack_device_write_resp)
+            if error != ERR_NO_ERROR:
+                self._finish(error=Vxi11Error(error))
+                return False
+            assert size == len(self.msg_chunks[0])
+            del self.msg_chunks[0]
+            return True
+        error, reason, data = client.end_call(reply,
+                client.unpacker.unpack_device_read_resp)
+        if error != ERR_NO_ERROR:
+            self._finish(error=Vxi11Error(error))
+            return False
+        self.data_list.append(data)
+        log.debug('Received %d bytes', len(data))
+        if reason & ~REASON_REQCNT == 0:
+            return True
+        self._finish(''.join(self.data_list))
+        return False
+
+
+def wait(futures, timeout=None):
+    # Runs all pending futures concurrently. Queries to the same host share one
+    # connection and are therefore processed one after the other.
+    queues = {}
+    for f in futures:
+        if not f.done:
+            try:
+                f.device.reopen() # a timeout of an earlier wait() dropped the host
+            except (socket.error, EOFError, RuntimeError), e:
+                f._finish(error=e)
+                continue
+            queues.setdefault(f.device.host, []).append(f)
+    if not queues:
+        return
+    if timeout is None:
+        timeout = max([f.device.io_timeout+f.device.lock_timeout for f in futures])+1
+    clients = {}
+    for host in sorted(queues.keys()): # always the same order, so two waits cannot deadlock
+        clients[host] = get_client(host)
+        clients[host].lock.acquire()
+    try:
+        active = {} # socket -> (host, reader)
+
+        def start(host):
+            while queues[host]:
+                f = queues[host][0]
+                try:
+                    f._next_call(clients[host])
+                except (socket.error, EOFError), e:
+                    f._finish(error=e)
+                    queues[host].pop(0)
+                    continue
+                active[clients[host].sock] = (host, rpc.RecordReader())
+                return
+
+        for host in queues:
+            start(host)
+        deadline = time.time()+timeout
+        while active:
+            remaining = deadline-time.time()
+            readable = []
+            if remaining > 0:
+                readable = select.select(active.keys(), [], [], remaining)[0]
+            if not readable:
+                for sock, (host, reader) in active.items():
+                    for f in queues[host]:
+                        f._finish(error=Vxi11Error(ERR_IO_TIMEOUT))
+                    drop_host(host) # the reply may still arrive, this connection is out of sync; the drivers reopen their links on their next call
+                return
+            for sock in readable:
+                host, reader = active[sock]
+                f = queues[host][0]
+                try:
+                    data = sock.recv(65536)
+                    if not data:
+                        raise EOFError()
+                    reply = reader.feed(data)
+                    if reply is None:
+                        continue
+                    del active[sock]
+                    if f._on_reply(clients[host], reply):
+                        f._next_call(clients[host])
+                        active[sock] = (host, rpc.RecordReader())
+                        continue
+                except (socket.error, EOFError), e:
+                    active.pop(sock, None)
+                    for g in queues[host]:
+                        g._finish(error=e)
+                    queues[host] = []
+                    drop_host(host)
+                    continue
+                queues[host].pop(0)
+                start(host)
+    finally:
+        for host in clients:
+            clients[host].lock.release()
+
+def ask_many(requests, timeout=None):
+    # requests: [(device, message), ...], returns the answers in the same order
+    futures = [device.ask_async(message) for device, message in requests]
+    wait(futures, timeout)
+    return [f.result() for f in futures]
+
+
+class Vxi11(object):
+    # Base class of the LAN instrument drivers: a link to device 'name' on 'host'
+    wait_with_srq = False # drivers set it to arm SRQ in open()
+
+    def __init__(self, host, name=None, client_id=None):
+        self.host = host
+        self.io_timeout = 2
+        self.lock_timeout = 2
+        self.client_id = client_id
+        if name is None:
+            self.name = 'inst0'
+        else:
+            self.name = name
+        self.link_id = None
+        self.generation = None
+        self.srq_enabled = False
+        self.srq_mask = STB_MAV
+
+    @property
+    def vxi11_client(self):
+        return get_client(self.host)
+
+    def open(self):
+        log.info('Opening connection to %s', self.host)
+
+        # If no client id was given, get it from the Vxi11 object
+        client_id = self.client_id
+        if client_id is None:
+            client_id = id(self) & 0x7fffffff
+        with _pool_lock:
+            self.link_id, self.max_recv_size = open_link(self.host, self.name,
+                    client_id)
+            self.generation = _generations.get(self.host, 0)
+        if self.wait_with_srq and not self.srq_enabled:
+            self.try_enable_srq()
+
+    def reopen(self):
+        # after a connection error drop_host() forgot the links of all drivers
+        # on this host, get a new one before the next call
+        if self.link_id is not None and self.generation != _generations.get(self.host, 0):
+            log.info('Reconnecting to %s', self.host)
+            srq_enabled = self.srq_enabled
+            self.link_id = None
+            self.srq_enabled = False # the interrupt channel went with the connection
+            self.open()
+            if srq_enabled and not self.srq_enabled:
+                self.try_enable_srq(self.srq_mask)
+
+    def close(self, keep_alive=True):
+        if self.link_id is None:
+            return
+        log.info('Close connection to %s', self.host)
+        if self.generation == _generations.get(self.host, 0):
+            release_link(self.host, self.name, keep_alive)
+        self.link_id = None
+
+    def write(self, message):
+        log.debug('Writing %d bytes (%s)', len(message), message)
+        io_timeout = self.io_timeout * 1000       # in ms
+        lock_timeout = self.lock_timeout * 1000   # in ms
+        flags = 0
+        self.reopen()
+        # split into chunks
+        msg_chunks = list(chunks(message, self.max_recv_size))
+        for (n,chunk) in enumerate(msg_chunks):
+            if n == len(msg_chunks)-1:
+                flags = OP_FLAG_END
+            else:
+                flags = 0
+            try:
+                error, size = self.vxi11_client.device_write(self.link_id,
+                        io_timeout, lock_timeout, flags, chunk)
+            except (socket.error, EOFError):
+                drop_host(self.host)
+                raise
+            if error != ERR_NO_ERROR:
+                raise Vxi11Error(error)
+            assert size == len(chunk)
+
+    def ask(self, message):
+        self.write(message)
+        return self.read()
+
+    def ask_async(self, message):
+        # returns a Vxi11Future, run it together with others with wait()
+        return Vxi11Future(self, message)
+
+    def read(self):
+        read_size = self.max_recv_size
+        io_timeout = self.io_timeout * 1000       # in ms
+        lock_timeout = self.lock_timeout * 1000   # in ms
+        reason = 0
+        flags = 0
+        term_char = 0
+        data_list = list()
+        self.reopen()
+        while reason == 0:
+            try:
+                error, reason, data = self.vxi11_client.device_read(self.link_id,
+                        read_size, io_timeout, lock_timeout, flags, term_char)
+            except (socket.error, EOFError):
+                drop_host(self.host)
+                raise
+            if error != ERR_NO_ERROR:
+                raise Vxi11Error(error)
+            data_list.append(data)
+            log.debug('Received %d bytes', len(data))
+
+            if reason & REASON_REQCNT:
+                reason &= ~REASON_REQCNT
+
+        return ''.join(data_list)
+
+    def read_stb(self):
+        io_timeout = self.io_timeout * 1000       # in ms
+        lock_timeout = self.lock_timeout * 1000   # in ms
+        self.reopen()
+        try:
+            error, stb = self.vxi11_client.device_readstb(self.link_id, 0,
+                    lock_timeout, io_timeout)
+        except (socket.error, EOFError):
+            drop_host(self.host)
+            raise
+        if error != ERR_NO_ERROR:
+            raise Vxi11Error(error)
+        return stb
+
+    def srq_handle(self):
+        return ('%s:%d' % (self.host, self.link_id))[:40]
+
+    def enable_srq(self, mask=STB_MAV):
+        # the instrument requests service (and we get a device_intr_srq) as soon
+        # as one of the status byte bits in mask is set, by default when a
+        # message is available in the output queue
+        enable_interrupts(self.host)
+        self.srq_event = srq_event(self.srq_handle())
+        error = self.vxi11_client.device_enable_srq(self.link_id, True,
+                self.srq_handle())
+        if error != ERR_NO_ERROR:
+            raise Vxi11Error(error)
+        self.write('*CLS')
+        self.write('*SRE ' + str(int(mask)))
+        self.srq_mask = mask
+        self.srq_enabled = True
+
+    def try_enable_srq(self, mask=STB_MAV):
+        # enable_srq() if the instrument can call us back, otherwise
+        # wait_for_message() keeps polling the status byte
+        try:
+            self.enable_srq(mask)
+        except (Vxi11Error, rpc.RpcError, socket.error, EOFError), e:
+            log.info('No interrupt channel to %s (%s), polling the status byte', self.host, e)
+            self.srq_enabled = False
+        return self.srq_enabled
+
+    def disable_srq(self):
+        if not self.srq_enabled:
+            return
+        self.write('*SRE 0')
+        self.vxi11_client.device_enable_srq(self.link_id, False,
+                self.srq_handle())
+        self.srq_enabled = False
+
+    def clear_srq(self):
+        self.srq_event.clear()
+
+    def wait_for_srq(self, timeout=None):
+        # returns True if the instrument requested service within timeout
+        if timeout is None:
+            timeout = self.io_timeout
+        requested = self.srq_event.wait(timeout)
+        self.srq_event.clear()
+        return requested
+
+    def wait_for_message(self, timeout=None):
+        # waits until the answer to the last query is available, with the
+        # interrupt channel if enabled, otherwise by polling the status byte
+        if timeout is None:
+            timeout = self.io_timeout
+        if self.srq_enabled:
+            if self.srq_event.wait(timeout):
+                self.srq_event.clear()
+                return True
+            # lost interrupt, the status byte knows better
+            return bool(self.read_stb() & STB_MAV)
+        deadline = time.time()+timeout
+        delay = 0.001
+        while not self.read_stb() & STB_MAV:
+            if time.time() > deadline:
+                return False
+            time.sleep(delay)
+            delay = min(delay*2, 0.05)
+        return True
+
+    def ask_when_ready(self, message, timeout=None):
+        # like ask() but without tying up the link in a blocking device_read
+        # while the instrument is still busy
+        if self.srq_enabled:
+            self.clear_srq()
+        self.write(message)
+        if not self.wait_for_message(timeout):
+            raise Vxi11Error(ERR_IO_TIMEOUT)
+        return self.read()
+
+    def operation_complete(self, timeout=None):
+        # returns as soon as all pending operations of the instrument are done
+        self.ask_when_ready('*OPC?', timeout)
+        return True
@@ -27,7 +27,7 @@ import logging
 import readline
 from optparse import OptionParser
 
-from pyvxi11 import Vxi11, Vxi11Error
+from vxi11 import Vxi11, Vxi11Error
 
 LOCAL_COMMANDS = {
         '%SLEEP': (1, 1, lambda a: time.sleep(float(a[0])/1000)),
@@ -59,9 +59,9 @@ def main():
 
     logging.basicConfig()
     if options.verbose:
-        logging.getLogger('pyvxi11').setLevel(logging.INFO)
+        logging.getLogger('vxi11').setLevel(logging.INFO)
     if options.debug:
-        logging.getLogger('pyvxi11').setLevel(logging.DEBUG)
+        logging.getLogger('vxi11').setLevel(logging.DEBUG)
 
     if len(args) < 1:
         print parser.format_help()
@@ -22,6 +22,8 @@ import serial
 import time
 import sys
 
+import port_registry
+
 class wpi_aladdin_1000():
     """Instrument class for WPI Al-1000 syringe controller. 
     
@@ -71,6 +73,7 @@ class wpi_aladdin_1000():
                 sys.exit("No pump with the name: \""+str(portname)+"\" has been found. Is the controller connected and turned on? Either use a correct pseudoname or address the serial port directly (See manual)")
         self.interface = serial.Serial(port=portname,baudrate=9600,parity=serial.PARITY_NONE,stopbits=serial.STOPBITS_ONE,bytesize=serial.EIGHTBITS,xonxoff=False) # TODO enable local echo (half-duplex)
         self.interface.isOpen()
+        self.port_lock = port_registry.get_lock(portname)
         self.pump_rate = 0.0 #self.get_rate()
         print "###########################################################################"
         print "       "+self.pump_name+" (with id: )"
@@ -98,9 +101,10 @@ class wpi_aladdin_1000():
         return buf
      
     def query(self,m):
-        self.write(m)
-        time.sleep(1)
-        return self.read()
+        with self.port_lock: # command and answer must not be split by another thread
+            self.write(m)
+            time.sleep(1)
+            return self.read()
      
     def float_number_formatter(self,value): # According to manual of pump
         value = float(value)
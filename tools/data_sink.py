@@ -0,0 +1,240 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Unified measurement software UMS
+# New measurement software for the electrochemical materials group, Prof. Jennifer Rupp
+#
+# Copyright (c) 2013 Reto Pfenninger, department of materials, D-MATL, ETH Zürich
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Data sinks: the measurement functions of ums write every sample while they
+# acquire it.
+#
+# Every measurement function takes sink=None. Its data lists (data_V_I,
+# data_T_t, ...) are made by data_list(sink, "V_I", ("V","I")) with the
+# channel name and the names of the columns of its rows: without a sink a
+# plain list, with a sink a sink_list which hands every appended row to
+# sink.write("V_I", row). The sinks buffer their files and flush them (with
+# os.fsync) when flush_interval seconds have passed since the last flush or
+# flush_rows rows are waiting, so a crash loses at most a few seconds of
+# data. With keep=n the lists only hold the last n to 2n rows, the rest is in
+# the files, so the memory of a run of several days stays bounded.
+#
+#   with csv_sink("/home/electrochem/umdata/arrhenius") as sink:
+#       arrhenius_dc(..., sink=sink)
+#
+# csv_sink writes one data_writer file per channel (000012_arrhenius_V_I.csv,
+# ...), binary_sink one file of float64 rows per channel (load_binary reads
+# it back), memory_sink keeps the rows of every channel in sink.data.
+#
+# A channel keeps the columns it has been opened with: data_list raises
+# ValueError when a channel of the sink (or of the HDF5 file) is opened again
+# with other fieldnames, like "V_t" as ("V","t") and then as ("t","V"), as the
+# new rows would be stored under the wrong names.
+
+import collections
+import os
+import struct
+import threading
+import time
+
+import numpy as np
+
+from data_writer import data_writer
+
+FLUSH_INTERVAL = 5.0 # seconds
+FLUSH_ROWS = 10000
+
+
+class sink_list(list):
+    # a data list which writes every new row to its sink
+    def __init__(self, sink, name, fieldnames=None):
+        list.__init__(self)
+        self.sink = sink
+        self.name = name
+        self.dropped = 0 # rows removed from the front because of keep
+        sink.open_channel(name, fieldnames)
+
+    def append(self, row):
+        list.append(self, row)
+        self.sink.write(self.name, [row])
+        self.trim()
+
+    def extend(self, rows):
+        rows = list(rows)
+        list.extend(self, rows)
+        self.sink.write(self.name, rows)
+        self.trim()
+
+    def trim(self):
+        keep = self.sink.keep
+        if keep is not None and len(self) > 2*keep:
+            n = len(self)-keep
+            del self[:n]
+            self.dropped += n
+
+
+def data_list(sink, name, fieldnames=None):
+    """Data list for the channel name: a plain list without sink, else a sink_list."""
+    if sink is None:
+        return []
+    return sink_list(sink, name, fieldnames)
+
+
+class data_sink(object):
+    def __init__(self, flush_interval=FLUSH_INTERVAL, flush_rows=FLUSH_ROWS, fsync=True, keep=None):
+        self.flush_interval = flush_interval
+        self.flush_rows = flush_rows
+        self.fsync = fsync
+        self.keep = keep # rows a sink_list holds at least, None for all
+        self.lock = threading.RLock()
+        self.waiting = 0 # rows written since the last flush
+        self.last_flush = time.time()
+        self.closed = False
+        self.info = {} # run metadata
+
+    def metadata(self, **values):
+        """Remember run information like oven=..., temperature_values=[...] (hdf5_sink stores it in the file)."""
+        self.info.update(values)
+
+    def open_channel(self, name, fieldnames):
+        pass
+
+    def check_fieldnames(self, name, columns, fieldnames):
+        # columns are the names the channel already has, None if it has none
+        if columns is not None and fieldnames is not None and list(columns) != list(fieldnames):
+            raise ValueError("Channel "+name+" has the columns "+", ".join(columns)+", not "+", ".join(fieldnames)+". Use another channel name or sink")
+
+    def write_rows(self, name, rows): # to be implemented by the sinks
+        raise NotImplementedError
+
+    def files(self):
+        return []
+
+    def write(self, name, rows):
+        with self.lock:
+            if self.closed:
+                raise IOError("The data sink has been closed")
+            self.write_rows(name, rows)
+            self.waiting += len(rows)
+            if self.waiting >= self.flush_rows or time.time()-self.last_flush >= self.flush_interval:
+                self.flush()
+
+    def flush(self):
+        with self.lock:
+            for f in self.files():
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+            self.waiting = 0
+            self.last_flush = time.time()
+
+    def close(self):
+        with self.lock:
+            if self.closed:
+                return
+            self.flush()
+            for f in self.files():
+                f.close()
+            self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+        return False
+
+
+class csv_sink(data_sink):
+    def __init__(self, data_file_base_path, file_id=None, flush_interval=FLUSH_INTERVAL, flush_rows=FLUSH_ROWS, fsync=True, keep=None, **formatparams):
+        data_sink.__init__(self, flush_interval, flush_rows, fsync, keep)
+        self.data_file_base_path = data_file_base_path
+        self.file_id = file_id # all channels get the same number, the next free one by default
+        self.formatparams = formatparams
+        self.fieldnames = {}
+        self.writers = {}
+
+    def open_channel(self, name, fieldnames):
+        with self.lock:
+            self.check_fieldnames(name, self.fieldnames.get(name), fieldnames)
+            if fieldnames is not None or name not in self.fieldnames:
+                self.fieldnames[name] = fieldnames
+
+    def writer(self, name):
+        # files are only created for channels with data
+        if name not in self.writers:
+            writer = data_writer(self.data_file_base_path, file_name_suppl_data=name, file_id=self.file_id, fieldnames=self.fieldnames.get(name), **self.formatparams)
+            self.file_id = writer.file_id
+            self.writers[name] = writer
+        return self.writers[name]
+
+    def write_rows(self, name, rows):
+        self.writer(name).writerows(rows)
+
+    def files(self):
+        return [writer.data_file for writer in self.writers.values()]
+
+
+def load_binary(path):
+    """Rows of a binary_sink file as 2D float64 array."""
+    with open(path, "rb") as f:
+        width = struct.unpack("<q", f.read(8))[0]
+        data = np.fromfile(f, dtype="<f8")
+    return data[:len(data)//width*width].reshape(-1, width) # a row cut off by a crash is dropped
+
+
+class binary_sink(data_sink):
+    # <base>_<channel>.f64: the number of columns as int64, then the rows as float64
+    def __init__(self, data_file_base_path, flush_interval=FLUSH_INTERVAL, flush_rows=FLUSH_ROWS, fsync=True, keep=None):
+        data_sink.__init__(self, flush_interval, flush_rows, fsync, keep)
+        self.data_file_base_path = os.path.normpath(data_file_base_path)
+        self.data_files = {}
+        self.widths = {}
+
+    def path(self, name):
+        return self.data_file_base_path+"_"+name+".f64"
+
+    def write_rows(self, name, rows):
+        if not rows:
+            return
+        rows = np.array(rows, dtype="<f8")
+        if rows.ndim == 1: # rows of a single value
+            rows = rows.reshape(-1, 1)
+        if name not in self.data_files:
+            self.data_files[name] = open(self.path(name), "wb", 1<<16)
+            self.widths[name] = rows.shape[1]
+            self.data_files[name].write(struct.pack("<q", rows.shape[1]))
+        if rows.shape[1] != self.widths[name]:
+            raise ValueError("Rows of channel "+name+" have "+str(self.widths[name])+" values, not "+str(rows.shape[1]))
+        self.data_files[name].write(rows.tostring())
+
+    def files(self):
+        return self.data_files.values()
+
+
+class memory_sink(data_sink):
+    # data[name] holds the rows of every channel, the last max_rows of them if given
+    def __init__(self, max_rows=None, keep=None):
+        data_sink.__init__(self, keep=keep)
+        self.max_rows = max_rows
+        self.data = {}
+
+    def open_channel(self, name, fieldnames):
+        if name not in self.data:
+            self.data[name] = collections.deque(maxlen=self.max_rows)
+
+    def write_rows(self, name, rows):
+        self.open_channel(name, None)
+        self.data[name].extend(rows)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Unified measurement software UMS
+# New measurement software for the electrochemical materials group, Prof. Jennifer Rupp
+#
+# Copyright (c) 2013 Reto Pfenninger, department of materials, D-MATL, ETH Zürich
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Min/max decimation pyramid for plotting long logs.
+#
+# Level k of the pyramid has one bucket per factor**k raw points, with the
+# point of the lowest and the point of the highest y in it. view() picks the
+# finest level which gives at most max_points points for the visible x range
+# and returns the min and max of every bucket in x order, so a single spike in
+# a week of data is still drawn. append() only recomputes the last bucket of
+# every level and the buckets of the new points, and view() only touches the
+# buckets it returns: the cost does not grow with the length of the log.
+#
+# The x values (time) must not decrease.
+
+import numpy as np
+
+FACTOR = 8
+MAX_POINTS = 4000
+
+
+def _reserve(array, size):
+    # array with room for size columns, grown by doubling
+    if array.shape[1] >= size:
+        return array
+    grown = np.empty((array.shape[0], max(size, 2*array.shape[1])))
+    grown[:, :array.shape[1]] = array
+    return grown
+
+
+class minmax_pyramid(object):
+    def __init__(self, factor=FACTOR):
+        self.factor = factor
+        self.raw = np.empty((2, 1024)) # x, y
+        self.n = 0
+        self.levels = [] # levels[k-1]: rows x of min, min, x of max, max for level k
+        self.sizes = []
+
+    def append(self, x, y):
+        x = np.asarray(x, dtype=np.float64)
+        first = self.n
+        self.raw = _reserve(self.raw, self.n+len(x))
+        self.raw[0, self.n:self.n+len(x)] = x
+        self.raw[1, self.n:self.n+len(x)] = y
+        self.n += len(x)
+        self.update(first)
+
+    def children(self, k, start):
+        # buckets of level k from start on, as rows x of min, min, x of max, max
+        if k == 0:
+            x, y = self.raw[0, start:self.n], self.raw[1, start:self.n]
+            return np.vstack((x, y, x, y))
+        return self.levels[k-1][:, start:self.sizes[k-1]]
+
+    def update(self, changed):
+        # changed is the first raw point which is new
+        size = self.n
+        k = 0
+        while size > self.factor:
+            start = (changed//self.factor)*self.factor
+            children = self.children(k, start)
+            buckets = -(-children.shape[1]//self.factor)
+            pad = buckets*self.factor-children.shape[1]
+            if pad:
+                filler = np.array([[0.0], [np.inf], [0.0], [-np.inf]]).repeat(pad, axis=1)
+                children = np.hstack((children, filler))
+            x_low, low, x_high, high = [row.reshape(buckets, self.factor) for row in children]
+            i_low = np.where(np.isnan(low), np.inf, low).argmin(axis=1)
+            i_high = np.where(np.isnan(high), -np.inf, high).argmax(axis=1)
+            rows = np.arange(buckets)
+            j0 = start//self.factor
+            if len(self.levels) == k:
+                self.levels.append(np.empty((4, 64)))
+                self.sizes.append(0)
+            self.levels[k] = _reserve(self.levels[k], j0+buckets)
+            self.levels[k][:, j0:j0+buckets] = (x_low[rows, i_low], low[rows, i_low], x_high[rows, i_high], high[rows, i_high])
+            self.sizes[k] = j0+buckets
+            changed = j0
+            size = self.sizes[k]
+            k += 1
+
+    def view(self, x_min=None, x_max=None, max_points=MAX_POINTS):
+        """Return (x, y) arrays with at most about max_points points between x_min and x_max."""
+        x = self.raw[0, :self.n]
+        i0 = 0 if x_min is None else max(int(np.searchsorted(x, x_min))-1, 0)
+        i1 = self.n if x_max is None else min(int(np.searchsorted(x, x_max))+1, self.n)
+        if i1-i0 <= max_points:
+            return self.raw[0, i0:i1].copy(), self.raw[1, i0:i1].copy()
+        k, width = 1, self.factor
+        while k < len(self.levels) and 2*(i1-i0)//width > max_points:
+            k += 1
+            width *= self.factor
+        buckets = self.levels[k-1][:, i0//width:min(-(-i1//width), self.sizes[k-1])]
+        low_first = buckets[0] <= buckets[2]
+        x = np.empty(2*buckets.shape[1])
+        y = np.empty(2*buckets.shape[1])
+        x[0::2] = np.where(low_first, buckets[0], buckets[2])
+        x[1::2] = np.where(low_first, buckets[2], buckets[0])
+        y[0::2] = np.where(low_first, buckets[1], buckets[3])
+        y[1::2] = np.where(low_first, buckets[3], buckets[1])
+        return x, y
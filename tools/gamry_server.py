@@ -190,6 +190,12 @@ class daemon_gamry_server(object):
                             connection.sendall("OK")
                         else:
                             connection.sendall("ER")
+                    elif data[0:3] == "RDY": # Means ready test, answered after CIO or SIM are done
+                        print >>sys.stderr, 'got RDY (ready test)'
+                        if self.background_worker.gamry is not None:
+                            connection.sendall("OK")
+                        else:
+                            connection.sendall("ER")
                     elif data[0:3] == "CIO": # Means create_impedance_object
                         print >>sys.stderr, 'got CIO (create_impedance_object)'
                         if self.last_received_command is "DEL" or self.last_received_command is "TES": # You can only do this if you don't have a gamry up
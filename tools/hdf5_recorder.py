@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Unified measurement software UMS
+# New measurement software for the electrochemical materials group, Prof. Jennifer Rupp
+#
+# Copyright (c) 2013 Reto Pfenninger, department of materials, D-MATL, ETH Zürich
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# HDF5 recorder for long logs, a data sink (tools.data_sink) like csv_sink.
+#
+# Every channel is a group /channels/<name> with one extendable, chunked and
+# gzip compressed dataset per column. The columns are the fieldnames given to
+# data_list (ums passes them for every channel, like ("V","t") or ("t","V"));
+# the time columns t and time are stored as float64, all other named columns
+# as float32. Without fieldnames the columns are c0, c1, ... in float64, the
+# recorder does not guess which of them is the time. Rows are kept in
+# memory until the flush policy of data_sink writes them, so a live run
+# appends to the datasets every few seconds. metadata() stores run
+# information (oven name, temperature steps, instrument IDs, ...) as
+# attributes of the file.
+#
+#   with hdf5_sink("/home/electrochem/umdata/arrhenius.h5") as sink:
+#       arrhenius_dc(..., sink=sink)
+#   metadata, channels = load_hdf5("/home/electrochem/umdata/arrhenius.h5")
+#   channels["T_t"]["t"], channels["T_t"]["T"]
+#
+# A month of 10 Hz logging (26 million rows) of a [value, time] channel is
+# about 300 MB before compression. h5py is imported when a recorder is made.
+
+import json
+import os
+import time
+
+import numpy as np
+
+from data_sink import data_sink, FLUSH_INTERVAL, FLUSH_ROWS
+
+CHUNK = 65536 # rows per chunk
+COMPRESSION = 4 # gzip level
+TIME_COLUMNS = ("t", "time")
+
+
+def _attribute(value):
+    # HDF5 attributes take numbers, strings and arrays of numbers
+    if isinstance(value, (int, long, float, str, unicode, np.number)):
+        return value
+    try:
+        array = np.asarray(value)
+        if array.dtype.kind in "biuf":
+            return array
+    except Exception:
+        pass
+    return json.dumps(value, default=str)
+
+
+class hdf5_sink(data_sink):
+    def __init__(self, path, metadata=None, flush_interval=FLUSH_INTERVAL, flush_rows=FLUSH_ROWS, fsync=True, keep=None, chunk=CHUNK, compression=COMPRESSION):
+        data_sink.__init__(self, flush_interval, flush_rows, fsync, keep)
+        import h5py
+        self.path = path
+        self.chunk = chunk
+        self.compression = compression
+        self.file = h5py.File(path, "a")
+        self.channels = self.file.require_group("channels")
+        self.fieldnames = {}
+        self.pending = {} # channel -> rows not written yet
+        if "created" not in self.file.attrs:
+            self.file.attrs["created"] = time.strftime("%Y-%m-%d %H:%M:%S")
+        if metadata:
+            self.metadata(**metadata)
+
+    def metadata(self, **values):
+        data_sink.metadata(self, **values)
+        with self.lock:
+            for key, value in values.items():
+                self.file.attrs[key] = _attribute(value)
+
+    def open_channel(self, name, fieldnames):
+        with self.lock:
+            columns = self.fieldnames.get(name)
+            if columns is None and name in self.channels: # written by an earlier run
+                columns = json.loads(self.channels[name].attrs["columns"])
+            self.check_fieldnames(name, columns, fieldnames)
+            if fieldnames is not None or name not in self.fieldnames:
+                self.fieldnames[name] = fieldnames
+
+    def write_rows(self, name, rows):
+        self.pending.setdefault(name, []).extend(rows)
+
+    def create_channel(self, name, width):
+        group = self.channels.create_group(name)
+        columns = self.fieldnames.get(name)
+        if columns:
+            columns = list(columns)
+            dtypes = [np.float64 if column in TIME_COLUMNS else np.float32 for column in columns]
+        else:
+            columns = ["c"+str(i) for i in range(width)]
+            dtypes = [np.float64]*width
+        group.attrs["columns"] = json.dumps(columns)
+        for column, dtype in zip(columns, dtypes):
+            group.create_dataset(column, shape=(0,), maxshape=(None,), dtype=dtype, chunks=(self.chunk,), compression="gzip", compression_opts=self.compression, shuffle=True)
+        return group
+
+    def write_channel(self, name, rows):
+        rows = np.array(rows, dtype=np.float64)
+        if rows.ndim == 1:
+            rows = rows.reshape(-1, 1)
+        if name in self.channels:
+            group = self.channels[name]
+        else:
+            group = self.create_channel(name, rows.shape[1])
+        columns = json.loads(group.attrs["columns"])
+        if rows.shape[1] != len(columns):
+            raise ValueError("Rows of channel "+name+" have "+str(len(columns))+" values, not "+str(rows.shape[1]))
+        for i, column in enumerate(columns):
+            dataset = group[column]
+            n = dataset.shape[0]
+            dataset.resize((n+len(rows),))
+            dataset[n:] = rows[:, i]
+
+    def flush(self):
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            for name, rows in pending.items():
+                if rows:
+                    self.write_channel(name, rows)
+            self.file.flush()
+            if self.fsync:
+                os.fsync(self.file.id.get_vfd_handle())
+            self.waiting = 0
+            self.last_flush = time.time()
+
+    def close(self):
+        with self.lock:
+            if self.closed:
+                return
+            self.flush()
+            self.file.close()
+            self.closed = True
+
+
+def load_hdf5(path):
+    """Return (metadata, {channel: {column: array}}) of a file written by hdf5_sink."""
+    import h5py
+    f = h5py.File(path, "r")
+    try:
+        metadata = dict(f.attrs.items())
+        channels = {}
+        for name, group in f.get("channels", {}).items():
+            channels[name] = dict([(column, group[column][:]) for column in json.loads(group.attrs["columns"])])
+        return metadata, channels
+    finally:
+        f.close()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Unified measurement software UMS
+# New measurement software for the electrochemical materials group, Prof. Jennifer Rupp
+#
+# Copyright (c) 2013 Reto Pfenninger, department of materials, D-MATL, ETH Zürich
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Micro-benchmark of the frame handling in devices/minimalmodbus.py.
+# An in-process stand-in for the serial port answers every request with a
+# precomputed Modbus RTU response, so only the CPU time for building, checking
+# and decoding the frames is measured. The baudrate of the stand-in is set very
+# high to make the 3.5 character silent period negligible. The current
+# Instrument is compared with the old frame code (bitwise CRC, every internal
+# helper validating its arguments again).
+#
+# Run it from the UMS folder:
+#     python -m tools.modbus_benchmark
+
+import time
+
+from devices import minimalmodbus
+
+BENCH_PORT = "benchmark"
+SLAVE_ADDRESS = 1
+
+
+def legacy_crc(inputstring):
+    # bitwise CRC-16 of minimalmodbus before the table driven version
+    register = 0xFFFF
+    for character in inputstring:
+        register = minimalmodbus._XOR(register, ord(character))
+        for i in range(8):
+            register, carrybit = minimalmodbus._rightshift(register)
+            if carrybit == 1:
+                register = minimalmodbus._XOR(register, 0xA001)
+    return minimalmodbus._numToTwoByteString(register, LsbFirst=True)
+
+
+class serial_standin:
+    # answers like a slave which holds the value of every register at its address
+    def __init__(self):
+        self.port = BENCH_PORT
+        self.baudrate = 10000000
+        self.timeout = 0.05
+        self.answer = ""
+        self.answers = {} # request -> precomputed response
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def write(self, message):
+        if message not in self.answers:
+            self.answers[message] = self.respond(message)
+        self.answer = self.answers[message]
+
+    def respond(self, message):
+        functioncode = ord(message[1])
+        address, count = minimalmodbus._STRUCT_TWO_UINT16.unpack(message[2:6])
+        if functioncode in (3, 4):
+            payload = chr(2*count)+"".join([minimalmodbus._STRUCT_UINT16.pack(address+k) for k in range(count)])
+        else: # write confirmation
+            payload = message[2:6]
+        frame = message[0:2]+payload
+        return frame+legacy_crc(frame)
+
+    def read(self, n_bytes): # like pySerial: waits for the timeout if fewer bytes are available
+        data = self.answer[:n_bytes]
+        self.answer = self.answer[n_bytes:]
+        if len(data) < n_bytes:
+            time.sleep(self.timeout)
+        return data
+
+
+class legacy_instrument(minimalmodbus.Instrument):
+    # _performCommand with the frame code before the fast path
+    def _performCommand(self, functioncode, payloadToSlave):
+        minimalmodbus._checkFunctioncode(functioncode, None)
+        minimalmodbus._checkString(payloadToSlave, description='payload')
+        minimalmodbus._checkSlaveaddress(self.address)
+        firstPart = minimalmodbus._numToOneByteString(self.address)+minimalmodbus._numToOneByteString(functioncode)+payloadToSlave
+        message = firstPart+legacy_crc(firstPart)
+        number_of_bytes_to_read = minimalmodbus._predictRtuResponseSize(message)
+        minimalmodbus._checkString(message, minlength=1, description='message')
+        minimalmodbus._checkInt(number_of_bytes_to_read)
+        response = self._communicate(message, number_of_bytes_to_read)
+        minimalmodbus._checkString(response, description='response')
+        if legacy_crc(response[:-2]) != response[-2:]:
+            raise ValueError("CRC error")
+        if ord(response[0]) != self.address or ord(response[1]) != functioncode:
+            raise ValueError("Wrong slave address or function code")
+        return response[2:-2]
+
+
+def make_instrument(instrument_class):
+    minimalmodbus._SERIALPORTS[BENCH_PORT] = serial_standin()
+    return instrument_class(BENCH_PORT, SLAVE_ADDRESS)
+
+def run(call, repetitions):
+    t0 = time.time()
+    for i in range(repetitions):
+        call()
+    return repetitions/(time.time()-t0)
+
+def benchmark(repetitions=5000):
+    cases = [
+        ("read_register", lambda instrument: instrument.read_register(1, 1)),
+        ("read_registers(50)", lambda instrument: instrument.read_registers(1, 50)),
+        ("write_register", lambda instrument: instrument.write_register(2, 12.5, 1)),
+        ]
+    print "%20s %16s %16s %8s" % ("call", "legacy [frame/s]", "current [frame/s]", "speedup")
+    for name, call in cases:
+        results = []
+        for instrument_class in (legacy_instrument, minimalmodbus.Instrument):
+            instrument = make_instrument(instrument_class)
+            call(instrument) # warm up
+            results.append(run(lambda: call(instrument), repetitions))
+        print "%20s %16.0f %16.0f %8.2f" % (name, results[0], results[1], results[1]/results[0])
+    minimalmodbus._SERIALPORTS.pop(BENCH_PORT, None)
+
+if __name__ == "__main__":
+    benchmark()
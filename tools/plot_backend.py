@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Unified measurement software UMS
+# New measurement software for the electrochemical materials group, Prof. Jennifer Rupp
+#
+# Copyright (c) 2013 Reto Pfenninger, department of materials, D-MATL, ETH Zürich
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# The plot process of ums, started when it is used for the first time.
+#
+# ums exports pg, mp, QtGui, QtCore, proc, rpg and win like before, but as
+# lazy objects: the first attribute access imports pyqtgraph, and for proc,
+# rpg and win also starts the QtProcess with its GraphicsWindow. Measurements
+# with GUI=False never touch them, so importing ums needs neither Qt nor a
+# display. With the environment variable UMS_HEADLESS=1 (cron jobs, batch
+# runs on the servers) a measurement with GUI=True fails right at the start
+# instead of waiting for a display.
+
+import os
+
+HEADLESS = os.environ.get("UMS_HEADLESS", "") not in ("", "0")
+
+
+class plot_backend(object):
+    def __init__(self, title="Plotting"):
+        self.title = title # string or function returning it, read when the window opens
+        self.objects = {}
+
+    def load(self, name):
+        if name in self.objects:
+            return self.objects[name]
+        if name in ("proc", "rpg", "win"):
+            if HEADLESS:
+                raise RuntimeError("UMS runs headless (UMS_HEADLESS is set), start the measurement with GUI=False")
+            pg = self.load("pg")
+            mp = self.load("mp")
+            pg.mkQApp()
+            # Create remote process with a plot window
+            proc = mp.QtProcess()
+            rpg = proc._import('source.pyqtgraph')
+            win = rpg.GraphicsWindow(title="Basic plotting")
+            win.resize(1300,500)
+            win.setWindowTitle(self.title() if callable(self.title) else self.title)
+            self.objects.update(proc=proc, rpg=rpg, win=win)
+        elif name == "pg":
+            import source.pyqtgraph as pg
+            self.objects["pg"] = pg
+        elif name == "mp":
+            import source.pyqtgraph.multiprocess as mp
+            self.objects["mp"] = mp
+        elif name in ("QtGui", "QtCore"):
+            from source.pyqtgraph.Qt import QtGui, QtCore
+            self.objects.update(QtGui=QtGui, QtCore=QtCore)
+        else:
+            raise KeyError(name)
+        return self.objects[name]
+
+    def started(self):
+        return "win" in self.objects
+
+
+class lazy(object):
+    # stands for backend.load(name) and loads it on the first attribute access
+    def __init__(self, backend, name):
+        self.__dict__["_backend"] = backend
+        self.__dict__["_name"] = name
+
+    def __getattr__(self, attribute):
+        return getattr(self._backend.load(self._name), attribute)
+
+    def __setattr__(self, attribute, value):
+        setattr(self._backend.load(self._name), attribute, value)
+
+    def __repr__(self):
+        if self._name in self._backend.objects:
+            return repr(self._backend.objects[self._name])
+        return "<"+self._name+", not loaded yet>"
@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Unified measurement software UMS
+# New measurement software for the electrochemical materials group, Prof. Jennifer Rupp
+#
+# Copyright (c) 2013 Reto Pfenninger, department of materials, D-MATL, ETH Zürich
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Append-only plot curves in the remote plotting process.
+#
+# curve.setData(x=[...], y=[...]) through the pyqtgraph.multiprocess proxy
+# pickles the whole history for every new point, which makes a long log
+# quadratic. A curve_stream keeps the points of one curve in a ring buffer of
+# float64 (row 0 x, row 1 y) in a memory mapped file which both processes
+# map. sync() writes only the points which were appended to the data list
+# since the last call and sends their total count; remote_curve in the plot
+# process redraws from its own mapping of the buffer. Once more than capacity
+# points have been written, the oldest ones fall out of the plot (the data
+# lists of the measurement keep all of them).
+#
+# With decimate=True the plot process copies every new point once into a
+# min/max pyramid (tools.decimation) and draws at most MAX_POINTS points of
+# the visible range, also after zooming, so week-long logs keep their spikes
+# and all of their history at a constant drawing cost.
+#
+# connect is handed to setData like for a PlotDataItem. With connect="finite"
+# a row of NaN in the data list separates two segments of one curve (like the
+# charge curves of successive cycles).
+
+import mmap
+import os
+import tempfile
+
+import numpy as np
+
+from decimation import minmax_pyramid
+
+CAPACITY = 100000 # points per curve, 1.6 MB of shared memory
+
+
+def _map(path, capacity):
+    f = open(path, "r+b")
+    try:
+        buffer_map = mmap.mmap(f.fileno(), 2*capacity*8)
+    finally:
+        f.close()
+    return buffer_map, np.frombuffer(buffer_map, dtype=np.float64).reshape(2, capacity)
+
+
+class remote_curve(object):
+    # lives in the plot process, curve is the PlotDataItem there
+    def __init__(self, curve, path, capacity, decimate=False, connect="all"):
+        self.curve = curve
+        self.capacity = capacity
+        self.connect = connect
+        self.buffer_map, self.buffer = _map(path, capacity)
+        self.pyramid = None
+        if decimate:
+            self.pyramid = minmax_pyramid()
+            self.ingested = 0
+            self.rendering = False
+            view_box = curve.getViewBox()
+            if view_box is not None:
+                view_box.sigXRangeChanged.connect(self.render)
+
+    def ingest(self, count):
+        if count < self.ingested: # cleared
+            self.pyramid = minmax_pyramid()
+            self.ingested = 0
+        first = max(self.ingested, count-self.capacity) # points which were overwritten before we saw them are lost
+        if count > first:
+            index = np.arange(first, count) % self.capacity
+            self.pyramid.append(self.buffer[0, index], self.buffer[1, index])
+        self.ingested = count
+
+    def render(self, *args):
+        if self.rendering: # our own setData changed the range
+            return
+        x_min = x_max = None
+        view_box = self.curve.getViewBox()
+        if view_box is not None and not view_box.autoRangeEnabled()[0]:
+            x_min, x_max = view_box.viewRange()[0]
+        x, y = self.pyramid.view(x_min, x_max)
+        self.rendering = True
+        try:
+            self.curve.setData(x=x, y=y, connect=self.connect)
+        finally:
+            self.rendering = False
+
+    def redraw(self, count, **kwargs):
+        if self.pyramid is not None:
+            self.ingest(count)
+            self.render()
+            return
+        if count <= self.capacity:
+            x = self.buffer[0, :count].copy()
+            y = self.buffer[1, :count].copy()
+        else: # the oldest point is at the write position
+            i = count % self.capacity
+            x = np.concatenate((self.buffer[0, i:], self.buffer[0, :i]))
+            y = np.concatenate((self.buffer[1, i:], self.buffer[1, :i]))
+        self.curve.setData(x=x, y=y, connect=self.connect, **kwargs)
+
+
+class curve_stream(object):
+    def __init__(self, curve, process, capacity=CAPACITY, decimate=False, connect="all"):
+        # curve is the proxy of a PlotDataItem in process (a multiprocess.QtProcess)
+        self.capacity = capacity
+        fd, path = tempfile.mkstemp(prefix="ums_plot_")
+        try:
+            os.ftruncate(fd, 2*capacity*8)
+        finally:
+            os.close(fd)
+        self.buffer_map, self.buffer = _map(path, capacity)
+        self.remote = process._import(__name__).remote_curve(curve, path, capacity, decimate, connect)
+        try:
+            os.remove(path) # both mappings stay valid
+        except OSError:
+            pass
+        self.count = 0 # points written to the buffer
+        self.seen = 0 # rows of the data list synced so far
+
+    def write(self, x, y):
+        # x and y are sequences of the same length
+        n = len(x)
+        if n > self.capacity: # only the last capacity points can be seen
+            x, y = x[-self.capacity:], y[-self.capacity:]
+            self.count += n-self.capacity
+            n = self.capacity
+        index = np.arange(self.count, self.count+n) % self.capacity
+        self.buffer[0, index] = x
+        self.buffer[1, index] = y
+        self.count += n
+
+    def append(self, x, y):
+        self.write([x], [y])
+        self.remote.redraw(self.count, _callSync='off')
+
+    def sync(self, data, x=1, y=0):
+        """Plot the points appended to data (rows like [y, x]) since the last call."""
+        dropped = getattr(data, "dropped", 0) # a sink_list only holds the newest rows
+        total = dropped+len(data)
+        if total < self.seen: # the list has been started over
+            self.count = self.seen = 0
+        if total == self.seen:
+            return
+        rows = np.array(data[max(self.seen-dropped, 0):], dtype=np.float64)
+        self.seen = total
+        self.write(rows[:, x], rows[:, y])
+        self.remote.redraw(self.count, _callSync='off')
+
+    def clear(self):
+        self.count = 0
+        self.seen = 0
+        self.remote.redraw(0, _callSync='off')
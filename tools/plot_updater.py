@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Unified measurement software UMS
+# New measurement software for the electrochemical materials group, Prof. Jennifer Rupp
+#
+# Copyright (c) 2013 Reto Pfenninger, department of materials, D-MATL, ETH Zürich
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Plot updates in their own thread, at a fixed frame rate.
+#
+# A measurement loop only appends its samples to its data lists. watch()
+# tells the updater which curve_stream shows which list; rate times per
+# second the updater thread hands the new rows of every watched list to its
+# curve (curve_stream.sync), so all samples which arrived during one frame go
+# to the plot process together. set_data() does the same for curves which are
+# redrawn with a few points (like the current position marker): only the last
+# call before a frame is sent. Slow drawing or a full pipe to the plot process
+# delays the next frame, never the instrument loop.
+
+import threading
+import time
+
+RATE = 10.0 # frames per second
+
+
+class plot_updater(object):
+    def __init__(self, rate=RATE):
+        self.rate = float(rate)
+        self.lock = threading.RLock()
+        self.watched = [] # (curve_stream, data list, x column, y column)
+        self.pending = {} # id of a curve -> (curve, keyword arguments of setData)
+        self.thread = None
+
+    def watch(self, stream, data, x=1, y=0):
+        """Draw the rows appended to data (like [y, x]) on stream from now on."""
+        with self.lock:
+            self.watched = [w for w in self.watched if w[0] is not stream]+[(stream, data, x, y)]
+        self.start()
+
+    def set_data(self, curve, **kwargs):
+        """curve.setData(**kwargs) with the next frame, replacing an earlier call for the same curve."""
+        with self.lock:
+            self.pending[id(curve)] = (curve, kwargs)
+        self.start()
+
+    def forget(self, stream):
+        with self.lock:
+            self.watched = [w for w in self.watched if w[0] is not stream]
+
+    def flush(self):
+        """Draw everything which has been appended so far."""
+        with self.lock:
+            for stream, data, x, y in self.watched:
+                stream.sync(data, x, y)
+            pending, self.pending = self.pending, {}
+        for curve, kwargs in pending.values():
+            curve.setData(_callSync='off', **kwargs)
+
+    def run(self):
+        next_frame = time.time()
+        while True:
+            try:
+                self.flush()
+            except Exception as e: # the plot window has been closed, measuring goes on
+                print "Plot update failed: "+str(e)
+                with self.lock:
+                    self.watched = []
+                    self.pending = {}
+            next_frame += 1.0/self.rate
+            delay = next_frame-time.time()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_frame = time.time() # drawing is slower than the rate, do not try to catch up
+
+    def start(self):
+        if self.thread is not None:
+            return
+        self.thread = threading.Thread(target=self.run)
+        self.thread.daemon = True
+        self.thread.start()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Unified measurement software UMS
+# New measurement software for the electrochemical materials group, Prof. Jennifer Rupp
+#
+# Copyright (c) 2013 Reto Pfenninger, department of materials, D-MATL, ETH Zürich
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# Micro-benchmark of the ONC-RPC record framing in devices/rpc.py.
+# A small RPC stand-in server runs on the loopback interface and answers every
+# call with an opaque block of the requested size, like an SMU answering a
+# printbuffer. The current RawTCPClient is compared with the old framing code
+# (short header reads, list of recv() chunks, send() of sliced buffers).
+#
+# Run it from the UMS folder:
+#     python -m tools.rpc_benchmark
+
+import socket
+import struct
+import threading
+import time
+
+from devices import rpc
+
+BENCH_PROG = 0x20000001
+BENCH_VERS = 1
+BENCH_PROC_BLOCK = 1 # (uint size) -> opaque
+
+
+class rpc_standin:
+    def __init__(self):
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server.bind(("127.0.0.1", 0))
+        self.server.listen(1)
+        self.port = self.server.getsockname()[1]
+        self.blocks = {}
+        thread = threading.Thread(target=self.serve)
+        thread.daemon = True
+        thread.start()
+
+    def recv_exact(self, connection, n):
+        buf = bytearray(n)
+        view = memoryview(buf)
+        n_received = 0
+        while n_received < n:
+            k = connection.recv_into(view[n_received:], n-n_received)
+            if k == 0:
+                raise EOFError()
+            n_received += k
+        return str(buf)
+
+    def serve(self):
+        connection, address = self.server.accept()
+        connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        packer = rpc.RpcPacker()
+        unpacker = rpc.RpcUnpacker('')
+        try:
+            while True:
+                length = struct.unpack('>I', self.recv_exact(connection, 4))[0] & 0x7fffffff
+                unpacker.reset(self.recv_exact(connection, length))
+                xid = unpacker.unpack_uint()
+                unpacker.unpack_enum() # CALL
+                for i in range(4): # rpc version, program, version, procedure
+                    unpacker.unpack_uint()
+                unpacker.unpack_auth()
+                unpacker.unpack_auth()
+                size = unpacker.unpack_uint()
+                if size not in self.blocks:
+                    self.blocks[size] = "\x55"*size
+                packer.reset()
+                packer.pack_replyheader(xid, (rpc.AUTH_NULL, rpc.make_auth_null()))
+                packer.pack_opaque(self.blocks[size])
+                reply = packer.get_buf()
+                connection.sendall(struct.pack('>I', len(reply) | 0x80000000) + reply)
+        except (EOFError, socket.error):
+            connection.close()
+
+
+class legacy_framing_client(rpc.RawTCPClient):
+    # framing code of rpc.RawTCPClient before the recv_into rewrite
+    def send_record(self, record):
+        header = struct.pack('>I', len(record) | 0x80000000)
+        buf = header + record
+        n_sent = 0
+        while n_sent < len(buf):
+            n_sent += self.sock.send(buf[n_sent:])
+
+    def recv_record(self):
+        record = list()
+        last = False
+        while not last:
+            frag, last = self.recv_fragment()
+            record.append(frag)
+        return ''.join(record)
+
+    def recv_fragment(self):
+        header = self.sock.recv(4)
+        if len(header) < 4:
+            raise EOFError()
+        length = struct.unpack('>I', header)[0]
+        last = bool(length & 0x80000000)
+        length &= 0x7fffffff
+
+        buf = list()
+        n_received = 0
+        while n_received < length:
+            b = self.sock.recv(length-n_received)
+            n_received += len(b)
+            buf.append(b)
+
+        return ''.join(buf), last
+
+
+def make_client(client_class, port):
+    client = client_class("127.0.0.1", BENCH_PROG, BENCH_VERS, port)
+    client.packer = rpc.RpcPacker()
+    client.unpacker = rpc.RpcUnpacker('')
+    return client
+
+def run(client, size, repetitions):
+    t0 = time.time()
+    for i in range(repetitions):
+        data = client.make_call(BENCH_PROC_BLOCK, size, client.packer.pack_uint, client.unpacker.unpack_opaque)
+        assert len(data) == size
+    return (time.time()-t0)/repetitions
+
+def benchmark(sizes=(16, 16*1024, 1024*1024, 8*1024*1024), total_bytes=64*1024*1024, rounds=5):
+    # loopback timings scatter a lot, the table shows the median of several
+    # rounds which alternate between the two clients
+    print "%12s %14s %14s %8s" % ("reply size", "legacy [ms]", "current [ms]", "speedup")
+    for size in sizes:
+        repetitions = max(10, min(2000, total_bytes//size))
+        results = ([], [])
+        for i in range(rounds):
+            for results_of_class, client_class in zip(results, (legacy_framing_client, rpc.RawTCPClient)):
+                server = rpc_standin()
+                client = make_client(client_class, server.port)
+                run(client, size, 3) # warm up
+                results_of_class.append(run(client, size, repetitions))
+                client.close()
+        legacy, current = [sorted(r)[len(r)//2] for r in results]
+        print "%12d %14.3f %14.3f %8.2f" % (size, legacy*1e3, current*1e3, legacy/current)
+
+if __name__ == "__main__":
+    benchmark()
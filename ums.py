@@ -30,10 +30,9 @@ import sys
 
 import numpy as np
 import math
-import source.pyqtgraph as pg
-import source.pyqtgraph.multiprocess as mp
-from source.pyqtgraph.Qt import QtGui, QtCore
-from scipy.special import lambertw # for cooling curve extrapolation
+
+# pyqtgraph and the plot process are loaded on first use (not at all with GUI=False)
+from tools.plot_backend import plot_backend, lazy
 
 
 def change_gpib_address(new_address):
@@ -42,84 +41,57 @@ def change_gpib_address(new_address):
     device.close()
     return
     
-pg.mkQApp()
-# Create remote process with a plot window
-proc = mp.QtProcess()
-rpg = proc._import('source.pyqtgraph')
-window_title = "Plotting"
+def lambertw(z, k=0): # for cooling curve extrapolation
+    from scipy.special import lambertw as scipy_lambertw # scipy takes longer to import than the rest of ums
+    return scipy_lambertw(z, k)
 
-# import all Keithley/Tektronix device drivers
-from devices.tektronix_AFG2021 import tektronix_AFG2021
-from devices.keithley_2601B import keithley_2601B
-from devices.keithley_2602B import keithley_2602B
-from devices.tektronix_AFG3021C import tektronix_AFG3021C
-from devices.keithley_2612B import keithley_2612B
-from devices.keithley_6517B import keithley_6517B
-from devices.keithley_2700 import keithley_2700
-from devices.keithley_2701 import keithley_2701
-from devices.keithley_2182A import keithley_2182A
-from devices.keithley_2000 import keithley_2000
-from devices.keithley_2001 import keithley_2001
-from devices.keithley_7001 import keithley_7001
-from devices.keithley_740 import keithley_740
-from devices.keithley_6220 import keithley_6220
-from devices.keithley_4200gpib import keithley_4200gpib
-#from devices.keithley_197A import keithley_197A
-
-# import all oven device drivers
-from devices.eurotherm_2404 import eurotherm_2404
-from devices.eurotherm_2416 import eurotherm_2416
-from devices.eurotherm_3216 import eurotherm_3216
-from devices.eurotherm_nanodac import eurotherm_nanodac
-
-# import power supply device drivers
-from devices.tti_QL564TP import tti_QL564TP
-
-# Import impedance bridges
-from devices.gamry_R600 import gamry_R600
-from devices.zahner_IM6 import zahner_IM6
-from devices.solartron import solartron
-
-# Import all flow meters
-from devices.voegtlin_gsc import voegtlin_gsc
-#from devices.bronkhorst_hitec import bronkhorst_hitec
-#from devices.sensirion_mfc import sensirion_mfc
-
-# Import Linkam stage controller for T-95
-from devices.linkam import linkam
-
-# Import WiTec Raman instrument alpha 300
-#from devices.witec_alpha import witec_alpha
+window_title = "Plotting"
+plots = plot_backend(lambda: window_title)
+pg = lazy(plots, "pg")
+mp = lazy(plots, "mp")
+QtGui = lazy(plots, "QtGui")
+QtCore = lazy(plots, "QtCore")
+proc = lazy(plots, "proc") # remote process with the plot window
+rpg = lazy(plots, "rpg")
+win = lazy(plots, "win")
+
+# All device drivers (Keithley/Tektronix, ovens, power supplies, impedance
+# bridges, flow meters, Linkam) are imported when they are used first
+from devices.registry import DRIVERS, lazy_driver, inventory
+for _name in DRIVERS:
+    globals()[_name] = lazy_driver(_name)
 
 # Import data_writer-class for pretty output
 from tools.data_writer import data_writer
+# Sinks which write the data of a measurement while it runs
+from tools.data_sink import data_list, csv_sink, binary_sink, memory_sink, load_binary
+from tools.hdf5_recorder import hdf5_sink, load_hdf5 # h5py is imported when it is used
+
+def instrument_ids(*devices):
+    return dict([(device.__class__.__name__, str(device.get_id())) for device in devices if device is not None])
+
+# Append-only, decimated curves for the long logs, drawn by their own thread
+from tools.plot_stream import curve_stream
+from tools.plot_updater import plot_updater
+display = plot_updater(10.0) # frames per second, change display.rate to draw more or less often
 
 GPIB_USB_adapter = "/dev/ttyUSB0" # here Prologix
 USB = "/dev/ttyUSB0" # another synonym for Prologix
 
-tektronix_AFG2021_ip_address = "172.31.46.10"
-tektronix_AFG3021C_ip_address = "172.31.46.25"
-keithley_2601B_ip_address = "172.31.46.11"
-keithley_2612B_ip_address = "172.31.46.17"
-keithley_2602B_ip_address = "172.31.46.18"
-keithley_2701_ip_address = "172.31.46.19"
-electrochem_m26_ip_address = "172.31.46.26"
-electrochem_m27_ip_address = "172.31.46.27"
-electrochem_m28_ip_address = "172.31.46.28"
-keithley_6517B_address = 27 # GPIB Address
-keithley_740_address = 14 # GPIB Address
-keithley_2182A_address = 7 # GPIB Address
-keithley_6220_address = 12 # GPIB Address
-keithley_2000_GPIB_1_address = 1 # GPIB Address
-keithley_2000_GPIB_4_address = 4 # GPIB Address
-keithley_2001_GPIB_5_address = 5 # GPIB Address
-keithley_2700_GPIB_3_address = 3 # GPIB Address
-keithley_2700_GPIB_18_address = 18 # GPIB Address
-keithley_7001_GPIB_2_address = 2 # GPIB Address
-keithley_7001_GPIB_6_address = 6 # GPIB Address
+# Addresses of the instruments in the lab, also under their old names like keithley_2601B_ip_address
+instruments = inventory(os.path.join(os.path.dirname(os.path.abspath(__file__)), "instruments.cfg"))
+globals().update(instruments.legacy_names())
+
+def instrument(name):
+    """Connected instrument from instruments.cfg, the same instance for every call with the same name."""
+    return instruments.get(name)
+
+def open_all(*names):
+    """Connect the instruments names (all with a driver by default) from instruments.cfg in parallel, print how long each took and return {name: instrument}."""
+    return instruments.open_all(names or None)
 
 #this is a python function that calls the KULT module pulsing in the electrochem library and executes set read and reset pulses
-def pulsing4200(device, channel, Vset, Vreset, Vread, Vset_width, Vreset_width, Vread_width, points_per_rise, currentRng, measStart, measStop, preDatapct, postDatapct, maxpointSet, maxpointReset, maxpointRead, num_pulses, measureType, new_row = False, GUI = True):
+def pulsing4200(device, channel, Vset, Vreset, Vread, Vset_width, Vreset_width, Vread_width, points_per_rise, currentRng, measStart, measStop, preDatapct, postDatapct, maxpointSet, maxpointReset, maxpointRead, num_pulses, measureType, new_row = False, GUI = True, sink=None):
 
     #this function measures with the waveform the read, set and reset pulses and plots them
     baseV = 0
@@ -128,10 +100,10 @@ def pulsing4200(device, channel, Vset, Vreset, Vread, Vset_width, Vreset_width,
     dataRead = []
     dataPuls = []
     dataSM = []
-    dataSet = []
-    dataReset = []
-    dataReadS = []
-    dataReadR = []
+    dataSet = data_list(sink, "set", ("V","I","t","pulse"))
+    dataReset = data_list(sink, "reset", ("V","I","t","pulse"))
+    dataReadS = data_list(sink, "read_set", ("V","I","t","pulse"))
+    dataReadR = data_list(sink, "read_reset", ("V","I","t","pulse"))
 
     if(measureType == 2):
         set_size = 10000
@@ -156,41 +128,41 @@ def pulsing4200(device, channel, Vset, Vreset, Vread, Vset_width, Vreset_width,
       # create an empty list in the remote process
         p1 = win.addPlot(title="Voltage vs. time Set pulse")
         if measureType == 2 or measureType == 0:
-            curve_V_t_Puls = p1.plot(pen='y')
+            curve_V_t_Puls = curve_stream(p1.plot(pen='y'), proc)
         else:
-            curve_V_t_Puls = p1.plot(pen = None, symbol = 'o')
+            curve_V_t_Puls = curve_stream(p1.plot(pen = None, symbol = 'o'), proc)
         p1.setLabel('left', "Voltage", units='V')
         p1.setLabel('bottom', "time", units='s')
-        curve_V_t_Puls.setData([], _callSync='off')
+        display.watch(curve_V_t_Puls, dataPuls, 2, 0)
 
         p2 = win.addPlot(title="Current vs. time Set pulse")
         if measureType == 2 or measureType == 0:
-            curve_I_t_Puls = p2.plot(pen='y')
+            curve_I_t_Puls = curve_stream(p2.plot(pen='y'), proc)
         else:
-            curve_I_t_Puls = p2.plot(pen = None, symbol = 'o')
+            curve_I_t_Puls = curve_stream(p2.plot(pen = None, symbol = 'o'), proc)
         p2.setLabel('left', "Current", units='A')
         p2.setLabel('bottom', "time", units='s')
-        curve_I_t_Puls.setData([], _callSync='off')
+        display.watch(curve_I_t_Puls, dataPuls, 2, 1)
 
         win.nextRow()
 
         p5 = win.addPlot(title="Voltage vs. time Reading")
         if measureType == 1 or measureType == 0:
-            curve_V_t_Read = p5.plot(pen=None, symbol = 'o')
+            curve_V_t_Read = curve_stream(p5.plot(pen=None, symbol = 'o'), proc)
         else:
-            curve_V_t_Read = p5.plot(pen = 'y')
+            curve_V_t_Read = curve_stream(p5.plot(pen = 'y'), proc)
         p5.setLabel('left', "Voltage", units='V')
         p5.setLabel('bottom', "time", units='s')
-        curve_V_t_Read.setData([], _callSync='off')
+        display.watch(curve_V_t_Read, dataRead, 2, 0)
 
         p6 = win.addPlot(title="Current vs. time Reding pulse")
         if measureType == 1 or measureType == 0:
-            curve_I_t_Read = p6.plot(pen = None, symbol = 'o')
+            curve_I_t_Read = curve_stream(p6.plot(pen = None, symbol = 'o'), proc)
         else:
-            curve_I_t_Read = p6.plot(pen = 'y')
+            curve_I_t_Read = curve_stream(p6.plot(pen = 'y'), proc)
         p6.setLabel('left', "Current", units='A')
         p6.setLabel('bottom', "time", units='s')
-        curve_I_t_Read.setData([], _callSync='off')
+        display.watch(curve_I_t_Read, dataRead, 2, 1)
 
         if new_row:
             win.nextRow()
@@ -248,17 +220,10 @@ def pulsing4200(device, channel, Vset, Vreset, Vread, Vset_width, Vreset_width,
         t_lastread = t_lastread + temp[-1][2]
         temp[:] = []
 
-        if GUI:
-            curve_V_t_Puls.setData(x=[k[2] for k in dataPuls], y=[k[0] for k in dataPuls], _callSync='off')
-            curve_I_t_Puls.setData(x=[k[2] for k in dataPuls], y=[k[1] for k in dataPuls], _callSync='off')
-
-            curve_V_t_Read.setData(x=[k[2] for k in dataRead], y=[k[0] for k in dataRead], _callSync='off')
-            curve_I_t_Read.setData(x=[k[2] for k in dataRead], y=[k[1] for k in dataRead], _callSync='off')
-   
     return[dataSet,dataReadS,dataReset,dataReadR]
 
-def dualSweep4200(device, channel, irange, ilimit, startv, topv, rate, points, new_row = False, GUI = True):
-    data_all = []
+def dualSweep4200(device, channel, irange, ilimit, startv, topv, rate, points, new_row = False, GUI = True, sink=None):
+    data_all = data_list(sink, "V_I_t", ("V","I","t"))
 
     if GUI:
         # create an empty list in the remote process
@@ -304,27 +269,27 @@ def dualSweep4200(device, channel, irange, ilimit, startv, topv, rate, points, n
 
     return data_all
 
-def cycling4200(device, channel, startv, topv, bottomv, ramp_speed, cycles, irange_pos, irange_neg, ilimit_pos, ilimit_neg, points, new_row = False, GUI = True):
-    data_all = []
+def cycling4200(device, channel, startv, topv, bottomv, ramp_speed, cycles, irange_pos, irange_neg, ilimit_pos, ilimit_neg, points, new_row = False, GUI = True, sink=None):
+    data_all = data_list(sink, "V_I_t", ("V","I","t"))
     if GUI:
         # create an empty list in the remote process
         p1 = win.addPlot(title="Voltage vs. current")
-        curve_V_I = p1.plot(pen='y')
+        curve_V_I = curve_stream(p1.plot(pen='y'), proc)
         p1.setLabel('left', "Current", units='A')
         p1.setLabel('bottom', "Voltage", units='V')
-        curve_V_I.setData([], _callSync='off')
+        display.watch(curve_V_I, data_all, 0, 1)
 
         p2 = win.addPlot(title="Voltage vs. time")
-        curve_V_t = p2.plot(pen='y')
+        curve_V_t = curve_stream(p2.plot(pen='y'), proc)
         p2.setLabel('left', "Voltage", units='V')
         p2.setLabel('bottom', "time", units='s')
-        curve_V_t.setData([], _callSync='off')
+        display.watch(curve_V_t, data_all, 2, 0)
 
         p3 = win.addPlot(title="Current vs. time")
-        curve_I_t = p3.plot(pen='y')
+        curve_I_t = curve_stream(p3.plot(pen='y'), proc)
         p3.setLabel('left', "Current", units='A')
         p3.setLabel('bottom', "time", units='s')
-        curve_I_t.setData([], _callSync='off')
+        display.watch(curve_I_t, data_all, 2, 1)
       
         if new_row:
             win.nextRow()
@@ -350,10 +315,6 @@ def cycling4200(device, channel, startv, topv, bottomv, ramp_speed, cycles, iran
             row.append(i)
             data_all.append(row)
         last_time = temp[-1][2]
-        if GUI: #this visualizes the plots
-            curve_I_t.setData(x=[k[2] for k in data_all], y=[k[1] for k in data_all], _callSync='off')
-            curve_V_t.setData(x=[k[2] for k in data_all], y=[k[0] for k in data_all], _callSync='off')
-            curve_V_I.setData(x=[k[0] for k in data_all], y=[k[1] for k in data_all], _callSync='off')
 
         #this is the execution of the dualSweep function that calls KULT through KXCI
         temp = dualSweep4200(device, channel, irange2, ilimit2, startv, bottomv, ramp_speed, pointDual, False, False)
@@ -362,15 +323,10 @@ def cycling4200(device, channel, startv, topv, bottomv, ramp_speed, cycles, iran
             row.append(i)
             data_all.append(row)
         last_time = temp[-1][2]
-        if GUI: #this visualizes the plots
-            curve_I_t.setData(x=[k[2] for k in data_all], y=[k[1] for k in data_all], _callSync='off')
-            curve_V_t.setData(x=[k[2] for k in data_all], y=[k[0] for k in data_all], _callSync='off')
-            curve_V_I.setData(x=[k[0] for k in data_all], y=[k[1] for k in data_all], _callSync='off')
-
     return data_all
 
-def DCVoltage4200(device, channel, irange, ilimit, voltage_level, duration, new_row = False, GUI=True):
-    data_all = []
+def DCVoltage4200(device, channel, irange, ilimit, voltage_level, duration, new_row = False, GUI=True, sink=None):
+    data_all = data_list(sink, "V_I_t", ("V","I","t"))
     if GUI:
         # create an empty list in the remote process
 
@@ -409,29 +365,29 @@ def DCVoltage4200(device, channel, irange, ilimit, voltage_level, duration, new_
 
     return data_all
 
-def pulse_rnone(device_smu,device_function_generator,V_peak,const_pulse_width,time_between_pulses, num_pulses,new_row=False,GUI=True):
+def pulse_rnone(device_smu,device_function_generator,V_peak,const_pulse_width,time_between_pulses, num_pulses,new_row=False,GUI=True, sink=None):
 # This function just measures the current responce to a series of voltage pulses - there is no reading voltage and the currents starts and ends at zero voltage.
     device_smu.reset()
     device_function_generator.reset()
     device_smu.setup_current_measurement()
     device_smu.turn_output_off()
-    data_V_t_2 = []
-    data_I_t_2 = []
+    data_V_t_2 = data_list(sink, "V_t", ("t","V"))
+    data_I_t_2 = data_list(sink, "I_t", ("t","I"))
     if GUI:
         if new_row:
             win.nextRow()
 
         p5 = win.addPlot(title="Voltage vs. time")
-        curve_V_t_2 = p5.plot(pen='y')
+        curve_V_t_2 = curve_stream(p5.plot(pen='y'), proc, decimate=True)
         p5.setLabel('left', "Voltage", units='V')
         p5.setLabel('bottom', "time", units='s')
-        curve_V_t_2.setData([], _callSync='off')
+        display.watch(curve_V_t_2, data_V_t_2, 0, 1)
 
         p6 = win.addPlot(title="Current vs. time")
-        curve_I_t_2 = p6.plot(pen='y')
+        curve_I_t_2 = curve_stream(p6.plot(pen='y'), proc, decimate=True)
         p6.setLabel('left', "Current", units='A')
         p6.setLabel('bottom', "time", units='s')
-        curve_I_t_2.setData([], _callSync='off')
+        display.watch(curve_I_t_2, data_I_t_2, 0, 1)
     device_function_generator.set_burst_on()
     device_function_generator.set_burst_mode("TRIG")
     device_function_generator.set_burst_number_of_cycles(1)
@@ -480,13 +436,10 @@ def pulse_rnone(device_smu,device_function_generator,V_peak,const_pulse_width,ti
             data_V_t_2.append([timestamp,V]) #this line is saving the voltage vs. time curve
         if cycle == num_pulses + 1 and timestamp >= pulse_end_time + 0.8*time_between_pulses:
             measuring = False
-        if GUI: #this visualizes the plots
-            curve_I_t_2.setData(x=[k[0] for k in data_I_t_2], y=[k[1] for k in data_I_t_2], _callSync='off')
-            curve_V_t_2.setData(x=[k[0] for k in data_V_t_2], y=[k[1] for k in data_V_t_2], _callSync='off')
     device_function_generator.turn_output_off()
     return [data_V_t_2,data_I_t_2] #here are the variable we are saving
     
-def pulse_rsquare(device_smu,device_function_generator,Vset_peak,Vreset_peak,reset_pulse_width,set_pulse_width,time_between_pulses, num_pulses,time_at_zero, V_read,alternate=True,new_row=False,GUI=True):
+def pulse_rsquare(device_smu,device_function_generator,Vset_peak,Vreset_peak,reset_pulse_width,set_pulse_width,time_between_pulses, num_pulses,time_at_zero, V_read,alternate=True,new_row=False,GUI=True, sink=None):
 # This function allows you to measure also the resistance during (depending on the time scale) and between pulses. - that means that there is a square reading scheme between the pulses.
 # Vset_peak will be used as first pulse so make sure it is the correct polarity - need to put a sign before it
 # if alternate = False just the set parameters will be used - that means Vset_peak and set_pulse_width
@@ -501,36 +454,36 @@ def pulse_rsquare(device_smu,device_function_generator,Vset_peak,Vreset_peak,res
     device_function_generator.reset()
     device_smu.setup_current_measurement()
     device_smu.turn_output_off()
-    data_cycle_R_2 = []
-    data_cycle_post_R_2 = []
-    data_V_t_2 = []
-    data_I_t_2 = []
+    data_cycle_R_2 = data_list(sink, "cycle_R", ("cycle","R"))
+    data_cycle_post_R_2 = data_list(sink, "cycle_post_R", ("cycle","R"))
+    data_V_t_2 = data_list(sink, "V_t", ("t","V"))
+    data_I_t_2 = data_list(sink, "I_t", ("t","I"))
     if GUI:
         if new_row:
             win.nextRow()
         p3 = win.addPlot(title="Resistance between pulses")
-        curve_cycle_post_R_2 = p3.plot(pen=None, symbol='o')
+        curve_cycle_post_R_2 = curve_stream(p3.plot(pen=None, symbol='o'), proc)
         p3.setLabel('left', "Resistance", units='Ohm')
         p3.setLabel('bottom', "Cycles", units='')
-        curve_cycle_post_R_2.setData([], _callSync='off')
+        display.watch(curve_cycle_post_R_2, data_cycle_post_R_2, 0, 1)
     
         p4 = win.addPlot(title="Resistance during pulse")
-        curve_cycle_R_2 = p4.plot(pen=None, symbol='o')
+        curve_cycle_R_2 = curve_stream(p4.plot(pen=None, symbol='o'), proc)
         p4.setLabel('left', "Resistance", units='Ohm')
         p4.setLabel('bottom', "Cycles", units='')
-        curve_cycle_R_2.setData([], _callSync='off')
+        display.watch(curve_cycle_R_2, data_cycle_R_2, 0, 1)
 
         p5 = win.addPlot(title="Voltage vs. time")
-        curve_V_t_2 = p5.plot(pen='y')
+        curve_V_t_2 = curve_stream(p5.plot(pen='y'), proc, decimate=True)
         p5.setLabel('left', "Voltage", units='V')
         p5.setLabel('bottom', "time", units='s')
-        curve_V_t_2.setData([], _callSync='off')
+        display.watch(curve_V_t_2, data_V_t_2, 0, 1)
 
         p6 = win.addPlot(title="Current vs. time")
-        curve_I_t_2 = p6.plot(pen='y')
+        curve_I_t_2 = curve_stream(p6.plot(pen='y'), proc, decimate=True)
         p6.setLabel('left', "Current", units='A')
         p6.setLabel('bottom', "time", units='s')
-        curve_I_t_2.setData([], _callSync='off')
+        display.watch(curve_I_t_2, data_I_t_2, 0, 1)
     device_function_generator.set_burst_on()
     device_function_generator.set_burst_mode("TRIG")
     device_function_generator.set_burst_number_of_cycles(1)
@@ -664,15 +617,10 @@ def pulse_rsquare(device_smu,device_function_generator,Vset_peak,Vreset_peak,res
         if timestamp >= pulse_end_time + 0.9*time_between_pulses:
             if cycle > num_pulses:
                 measuring = False
-        if GUI: #this visualizes the plots
-            curve_I_t_2.setData(x=[k[0] for k in data_I_t_2], y=[k[1] for k in data_I_t_2], _callSync='off')
-            curve_cycle_post_R_2.setData(x=[k[0] for k in data_cycle_post_R_2], y=[k[1] for k in data_cycle_post_R_2], _callSync='off')
-            curve_cycle_R_2.setData(x=[k[0] for k in data_cycle_R_2], y=[k[1] for k in data_cycle_R_2], _callSync='off')
-            curve_V_t_2.setData(x=[k[0] for k in data_V_t_2], y=[k[1] for k in data_V_t_2], _callSync='off')
     device_function_generator.turn_output_off()
     return [data_V_t_2,data_I_t_2,data_cycle_R_2,data_cycle_post_R_2] #here are the variables we are saving
 
-def pulse_rbipolar(device_smu,device_function_generator,Vset_peak, Vreset_peak,set_pulse_width,reset_pulse_width,time_between_pulses, num_pulses,time_at_zero, V_read, alternate=True, new_row=False,GUI=True):
+def pulse_rbipolar(device_smu,device_function_generator,Vset_peak, Vreset_peak,set_pulse_width,reset_pulse_width,time_between_pulses, num_pulses,time_at_zero, V_read, alternate=True, new_row=False,GUI=True, sink=None):
 # This function allows you to measure also the resistance during (depending on the time scale) and between pulses. 
 # There is a bipolar pulse reading scheme between the pulses. This is an advantage over a constant reading scheme since the device will not be disturbed.
 # No resistence will be measured during the time at zero. This is just an option to leave the current to equilibrate.
@@ -686,37 +634,37 @@ def pulse_rbipolar(device_smu,device_function_generator,Vset_peak, Vreset_peak,s
     device_function_generator.reset()
     device_smu.setup_current_measurement()
     device_smu.turn_output_off()
-    data_cycle_R_2 = []
-    data_cycle_post_R_2 = []
-    data_V_t_2 = []
-    data_I_t_2 = []
+    data_cycle_R_2 = data_list(sink, "cycle_R", ("cycle","R"))
+    data_cycle_post_R_2 = data_list(sink, "cycle_post_R", ("cycle","R"))
+    data_V_t_2 = data_list(sink, "V_t", ("t","V"))
+    data_I_t_2 = data_list(sink, "I_t", ("t","I"))
     if GUI:
         if new_row:
             win.nextRow()
 
         p3 = win.addPlot(title="Resistance between pulses.")
-        curve_cycle_post_R_2 = p3.plot(pen=None, symbol='o')
+        curve_cycle_post_R_2 = curve_stream(p3.plot(pen=None, symbol='o'), proc)
         p3.setLabel('left', "Resistance", units='Ohm')
         p3.setLabel('bottom', "Cycles", units='')
-        curve_cycle_post_R_2.setData([], _callSync='off')
+        display.watch(curve_cycle_post_R_2, data_cycle_post_R_2, 0, 1)
     
         p4 = win.addPlot(title="Resistance during pulse")
-        curve_cycle_R_2 = p4.plot(pen=None, symbol='o')
+        curve_cycle_R_2 = curve_stream(p4.plot(pen=None, symbol='o'), proc)
         p4.setLabel('left', "Resistance", units='Ohm')
         p4.setLabel('bottom', "Cycles", units='')
-        curve_cycle_R_2.setData([], _callSync='off')
+        display.watch(curve_cycle_R_2, data_cycle_R_2, 0, 1)
 
         p5 = win.addPlot(title="Voltage vs. time")
-        curve_V_t_2 = p5.plot(pen='y')
+        curve_V_t_2 = curve_stream(p5.plot(pen='y'), proc, decimate=True)
         p5.setLabel('left', "Voltage", units='V')
         p5.setLabel('bottom', "time", units='s')
-        curve_V_t_2.setData([], _callSync='off')
+        display.watch(curve_V_t_2, data_V_t_2, 0, 1)
 
         p6 = win.addPlot(title="Current vs. time")
-        curve_I_t_2 = p6.plot(pen='y')
+        curve_I_t_2 = curve_stream(p6.plot(pen='y'), proc, decimate=True)
         p6.setLabel('left', "Current", units='A')
         p6.setLabel('bottom', "time", units='s')
-        curve_I_t_2.setData([], _callSync='off')
+        display.watch(curve_I_t_2, data_I_t_2, 0, 1)
 
     device_function_generator.set_burst_on()
     device_function_generator.set_burst_mode("TRIG")
@@ -859,15 +807,23 @@ def pulse_rbipolar(device_smu,device_function_generator,Vset_peak, Vreset_peak,s
                 data_V_t_2.append([timestamp,V]) #V is actually just 0 - this saves the time_at_zero voltage
         if cycle == num_pulses+1 and timestamp >= pulse_end_time + 1.8*time_at_zero + read_time:
             measuring = False
-        if GUI: #this visualizes the plots
-            curve_I_t_2.setData(x=[k[0] for k in data_I_t_2], y=[k[1] for k in data_I_t_2], _callSync='off')
-            curve_cycle_post_R_2.setData(x=[k[0] for k in data_cycle_post_R_2], y=[k[1] for k in data_cycle_post_R_2], _callSync='off')
-            curve_cycle_R_2.setData(x=[k[0] for k in data_cycle_R_2], y=[k[1] for k in data_cycle_R_2], _callSync='off')
-            curve_V_t_2.setData(x=[k[0] for k in data_V_t_2], y=[k[1] for k in data_V_t_2], _callSync='off')
     device_function_generator.turn_output_off()
     return [data_V_t_2,data_I_t_2,data_cycle_R_2,data_cycle_post_R_2_plus, data_cycle_post_R_2_minus] #here are the variable we are saving
 
-def preforming_ramp(device,start_voltage,ramp_speed_1,top_voltage,hold_time,ramp_speed_2,end_voltage,compliance_current=0,new_row=False, GUI=True):
+def tsp_data(result,with_cycle=False): # converts the buffers of run_tsp_program into the usual [data_V_I,data_V_t,data_I_t] lists
+    data_V_I = []
+    data_V_t = []
+    data_I_t = []
+    for k in range(len(result["i"])):
+        if with_cycle:
+            data_V_I.append([result["v"][k],result["i"][k],int(result["tag"][k])])
+        else:
+            data_V_I.append([result["v"][k],result["i"][k]])
+        data_V_t.append([result["v"][k],result["t"][k]])
+        data_I_t.append([result["i"][k],result["t"][k]])
+    return [data_V_I,data_V_t,data_I_t]
+
+def preforming_ramp(device,start_voltage,ramp_speed_1,top_voltage,hold_time,ramp_speed_2,end_voltage,compliance_current=0,new_row=False, GUI=True, on_instrument=False, step_time=0.05, sink=None):
     device.reset()
     device.setup_current_measurement(1)
     if top_voltage>100:
@@ -879,31 +835,44 @@ def preforming_ramp(device,start_voltage,ramp_speed_1,top_voltage,hold_time,ramp
     device.set_voltage(start_voltage)
     device.turn_output_on()
     device.init()
-    data_V_I = []
-    data_V_t = []
-    data_I_t = []
+    data_V_I = data_list(sink, "V_I", ("V","I"))
+    data_V_t = data_list(sink, "V_t", ("V","t"))
+    data_I_t = data_list(sink, "I_t", ("I","t"))
     if GUI:
         # create an empty list in the remote process
         p1 = win.addPlot(title="Voltage vs. current")
-        curve_V_I = p1.plot(pen='y')
+        curve_V_I = curve_stream(p1.plot(pen='y'), proc)
         p1.setLabel('left', "Current", units='A')
         p1.setLabel('bottom', "Voltage", units='V')
-        curve_V_I.setData(data_V_I, _callSync='off')
+        display.watch(curve_V_I, data_V_I, 0, 1)
 
         p2 = win.addPlot(title="Voltage vs. time")
-        curve_V_t = p2.plot(pen='y')
+        curve_V_t = curve_stream(p2.plot(pen='y'), proc, decimate=True)
         p2.setLabel('left', "Voltage", units='V')
         p2.setLabel('bottom', "time", units='s')
-        curve_V_t.setData(data_V_t, _callSync='off')
+        display.watch(curve_V_t, data_V_t)
 
         p3 = win.addPlot(title="Current vs. time")
-        curve_I_t = p3.plot(pen='y')
+        curve_I_t = curve_stream(p3.plot(pen='y'), proc, decimate=True)
         p3.setLabel('left', "Current", units='A')
         p3.setLabel('bottom', "time", units='s')
-        curve_I_t.setData(data_I_t, _callSync='off')
+        display.watch(curve_I_t, data_I_t)
       
         if new_row:
             win.nextRow()
+    if on_instrument: # the whole ramp runs as TSP script on the Keithley 26xxB, results are fetched at the end
+        channel = getattr(device,"channel_in_use","A")
+        limit = compliance_current
+        if compliance_current is 0:
+            limit = device.maximum_current_allowed
+        program = tsp_program(step_time)
+        program.add_ramp(channel,start_voltage,top_voltage,ramp_speed_1,limit)
+        program.add_hold(channel,top_voltage,hold_time,limit)
+        program.add_ramp(channel,top_voltage,end_voltage,ramp_speed_2,limit)
+        for data, rows in zip([data_V_I,data_V_t,data_I_t], tsp_data(run_tsp_program(device,program)[channel])):
+            data.extend(rows) # also to the sink, and the plot updater draws them
+        device.turn_output_off()
+        return [data_V_I,data_V_t,data_I_t]
     first_step_time = np.absolute(top_voltage-start_voltage)/np.absolute(ramp_speed_1)
     v0 = start_voltage
     t0 = time.time() # measurement start time
@@ -940,14 +909,10 @@ def preforming_ramp(device,start_voltage,ramp_speed_1,top_voltage,hold_time,ramp
         data_I_t.append([I[0],keithley_time])
         data_V_I.append([V_actual,I[0]])
         data_V_t.append([V_actual,timestamp])
-        if GUI:
-            curve_I_t.setData(x=[k[1] for k in data_I_t], y=[k[0] for k in data_I_t], _callSync='off')
-            curve_V_I.setData(x=[k[0] for k in data_V_I], y=[k[1] for k in data_V_I], _callSync='off')
-            curve_V_t.setData(x=[k[1] for k in data_V_t], y=[k[0] for k in data_V_t], _callSync='off')
     device.turn_output_off()
     return [data_V_I,data_V_t,data_I_t]
     
-def preforming_ramp_with_current_hold_time(device,start_voltage,ramp_speed_1,top_voltage,hold_time,ramp_speed_2,end_voltage,compliance_current=0,trigger_current=0,trigger_hold_time=0,new_row=False,GUI=True):
+def preforming_ramp_with_current_hold_time(device,start_voltage,ramp_speed_1,top_voltage,hold_time,ramp_speed_2,end_voltage,compliance_current=0,trigger_current=0,trigger_hold_time=0,new_row=False,GUI=True, sink=None):
     device.reset()
     device.setup_current_measurement(1)
     if top_voltage>100:
@@ -963,28 +928,28 @@ def preforming_ramp_with_current_hold_time(device,start_voltage,ramp_speed_1,top
     device.set_voltage(start_voltage)
     device.turn_output_on()
     device.init()
-    data_V_I = []
-    data_V_t = []
-    data_I_t = []
+    data_V_I = data_list(sink, "V_I", ("V","I"))
+    data_V_t = data_list(sink, "V_t", ("V","t"))
+    data_I_t = data_list(sink, "I_t", ("I","t"))
     if GUI:
         # create an empty list in the remote process
         p1 = win.addPlot(title="Voltage vs. current")
-        curve_V_I = p1.plot(pen='y')
+        curve_V_I = curve_stream(p1.plot(pen='y'), proc)
         p1.setLabel('left', "Current", units='A')
         p1.setLabel('bottom', "Voltage", units='V')
-        curve_V_I.setData(data_V_I, _callSync='off')
+        display.watch(curve_V_I, data_V_I, 0, 1)
 
         p2 = win.addPlot(title="Voltage vs. time")
-        curve_V_t = p2.plot(pen='y')
+        curve_V_t = curve_stream(p2.plot(pen='y'), proc, decimate=True)
         p2.setLabel('left', "Voltage", units='V')
         p2.setLabel('bottom', "time", units='s')
-        curve_V_t.setData(data_V_t, _callSync='off')
+        display.watch(curve_V_t, data_V_t)
 
         p3 = win.addPlot(title="Current vs. time")
-        curve_I_t = p3.plot(pen='y')
+        curve_I_t = curve_stream(p3.plot(pen='y'), proc, decimate=True)
         p3.setLabel('left', "Current", units='A')
         p3.setLabel('bottom', "time", units='s')
-        curve_I_t.setData(data_I_t, _callSync='off')
+        display.watch(curve_I_t, data_I_t)
       
         if new_row:
             win.nextRow()
@@ -1032,14 +997,10 @@ def preforming_ramp_with_current_hold_time(device,start_voltage,ramp_speed_1,top
         data_I_t.append([I[0],keithley_time])
         data_V_I.append([V_actual,I[0]])
         data_V_t.append([V_actual,timestamp])
-        if GUI:
-            curve_I_t.setData(x=[k[1] for k in data_I_t], y=[k[0] for k in data_I_t], _callSync='off')
-            curve_V_I.setData(x=[k[0] for k in data_V_I], y=[k[1] for k in data_V_I], _callSync='off')
-            curve_V_t.setData(x=[k[1] for k in data_V_t], y=[k[0] for k in data_V_t], _callSync='off')
     device.turn_output_off()
     return [data_V_I,data_V_t,data_I_t]
 
-def preforming_ramp_with_current_limit(device,start_voltage,ramp_speed_1,top_voltage,hold_time,ramp_speed_2,end_voltage,stop_current,new_row=False, GUI=True):
+def preforming_ramp_with_current_limit(device,start_voltage,ramp_speed_1,top_voltage,hold_time,ramp_speed_2,end_voltage,stop_current,new_row=False, GUI=True, sink=None):
     device.reset()
     device.setup_current_measurement(1)
     if top_voltage>100:
@@ -1049,28 +1010,28 @@ def preforming_ramp_with_current_limit(device,start_voltage,ramp_speed_1,top_vol
     device.set_voltage(start_voltage)
     device.turn_output_on()
     device.init()
-    data_V_I = []
-    data_V_t = []
-    data_I_t = []
+    data_V_I = data_list(sink, "V_I", ("V","I"))
+    data_V_t = data_list(sink, "V_t", ("V","t"))
+    data_I_t = data_list(sink, "I_t", ("I","t"))
     if GUI:
         # create an empty list in the remote process
         p1 = win.addPlot(title="Voltage vs. current")
-        curve_V_I = p1.plot(pen='y')
+        curve_V_I = curve_stream(p1.plot(pen='y'), proc)
         p1.setLabel('left', "Current", units='A')
         p1.setLabel('bottom', "Voltage", units='V')
-        curve_V_I.setData(data_V_I, _callSync='off')
+        display.watch(curve_V_I, data_V_I, 0, 1)
 
         p2 = win.addPlot(title="Voltage vs. time")
-        curve_V_t = p2.plot(pen='y')
+        curve_V_t = curve_stream(p2.plot(pen='y'), proc, decimate=True)
         p2.setLabel('left', "Voltage", units='V')
         p2.setLabel('bottom', "time", units='s')
-        curve_V_t.setData(data_V_t, _callSync='off')
+        display.watch(curve_V_t, data_V_t)
 
         p3 = win.addPlot(title="Current vs. time")
-        curve_I_t = p3.plot(pen='y')
+        curve_I_t = curve_stream(p3.plot(pen='y'), proc, decimate=True)
         p3.setLabel('left', "Current", units='A')
         p3.setLabel('bottom', "time", units='s')
-        curve_I_t.setData(data_I_t, _callSync='off')
+        display.watch(curve_I_t, data_I_t)
       
         if new_row:
             win.nextRow()
@@ -1106,16 +1067,32 @@ def preforming_ramp_with_current_limit(device,start_voltage,ramp_speed_1,top_vol
         data_I_t.append([I[0],keithley_time])
         data_V_I.append([V,I[0]])
         data_V_t.append([V,timestamp])
-        if GUI:
-            curve_I_t.setData(x=[k[1] for k in data_I_t], y=[k[0] for k in data_I_t], _callSync='off')
-            curve_V_I.setData(x=[k[0] for k in data_V_I], y=[k[1] for k in data_V_I], _callSync='off')
-            curve_V_t.setData(x=[k[1] for k in data_V_t], y=[k[0] for k in data_V_t], _callSync='off')
         if I[0] >= stop_current:
             break
     device.turn_output_off()
     return [data_V_I,data_V_t,data_I_t]
     
-def cycling(device,start_voltage,ramp_speed_1,top_voltage,top_hold_time,ramp_speed_2,bottom_voltage,bottom_hold_time,end_voltage,n,compliance_current_pos=0,compliance_current_neg=0,new_row=False, GUI=True):
+def add_tsp_cycles(program,channel,maximum_current,start_voltage,ramp_speed_1,top_voltage,top_hold_time,ramp_speed_2,bottom_voltage,bottom_hold_time,end_voltage,n,compliance_current_pos=0,compliance_current_neg=0):
+    limit_pos = np.absolute(compliance_current_pos)
+    if compliance_current_pos is 0:
+        limit_pos = maximum_current
+    limit_neg = np.absolute(compliance_current_neg)
+    if compliance_current_neg is 0:
+        limit_neg = limit_pos
+    middle_voltage = (top_voltage+bottom_voltage)/2.0 # like in cycling() the negative compliance is set halfway through the second ramp
+    v0 = start_voltage
+    for u in range(n):
+        program.add_ramp(channel,v0,top_voltage,ramp_speed_1,limit_pos,u+1)
+        program.add_hold(channel,top_voltage,top_hold_time,limit_pos,u+1)
+        program.add_ramp(channel,top_voltage,middle_voltage,ramp_speed_2,limit_pos,u+1)
+        program.add_ramp(channel,middle_voltage,bottom_voltage,ramp_speed_2,limit_neg,u+1)
+        program.add_hold(channel,bottom_voltage,bottom_hold_time,limit_neg,u+1)
+        if bottom_voltage != end_voltage:
+            program.add_ramp(channel,bottom_voltage,end_voltage,ramp_speed_1,limit_neg,u+1)
+        v0 = end_voltage
+    return program
+
+def cycling(device,start_voltage,ramp_speed_1,top_voltage,top_hold_time,ramp_speed_2,bottom_voltage,bottom_hold_time,end_voltage,n,compliance_current_pos=0,compliance_current_neg=0,new_row=False, GUI=True, on_instrument=False, step_time=0.05, sink=None):
     device.reset()
     device.setup_current_measurement(1)
     if top_voltage>100:
@@ -1125,31 +1102,39 @@ def cycling(device,start_voltage,ramp_speed_1,top_voltage,top_hold_time,ramp_spe
     device.set_voltage(start_voltage)
     device.turn_output_on()
     device.init()
-    data_V_I = []
-    data_V_t = []
-    data_I_t = []
+    data_V_I = data_list(sink, "V_I", ("V","I","cycle"))
+    data_V_t = data_list(sink, "V_t", ("V","t"))
+    data_I_t = data_list(sink, "I_t", ("I","t"))
     if GUI:
         # create an empty list in the remote process
         p1 = win.addPlot(title="Voltage vs. current")
-        curve_V_I = p1.plot(pen='y')
+        curve_V_I = curve_stream(p1.plot(pen='y'), proc)
         p1.setLabel('left', "Current", units='A')
         p1.setLabel('bottom', "Voltage", units='V')
-        curve_V_I.setData(data_V_I, _callSync='off')
+        display.watch(curve_V_I, data_V_I, 0, 1)
 
         p2 = win.addPlot(title="Voltage vs. time")
-        curve_V_t = p2.plot(pen='y')
+        curve_V_t = curve_stream(p2.plot(pen='y'), proc, decimate=True)
         p2.setLabel('left', "Voltage", units='V')
         p2.setLabel('bottom', "time", units='s')
-        curve_V_t.setData(data_V_t, _callSync='off')
+        display.watch(curve_V_t, data_V_t)
 
         p3 = win.addPlot(title="Current vs. time")
-        curve_I_t = p3.plot(pen='y')
+        curve_I_t = curve_stream(p3.plot(pen='y'), proc, decimate=True)
         p3.setLabel('left', "Current", units='A')
         p3.setLabel('bottom', "time", units='s')
-        curve_I_t.setData(data_I_t, _callSync='off')
+        display.watch(curve_I_t, data_I_t)
       
         if new_row:
             win.nextRow()
+    if on_instrument: # all n cycles run as TSP script on the Keithley 26xxB, results are fetched at the end
+        channel = getattr(device,"channel_in_use","A")
+        program = tsp_program(step_time)
+        add_tsp_cycles(program,channel,device.maximum_current_allowed,start_voltage,ramp_speed_1,top_voltage,top_hold_time,ramp_speed_2,bottom_voltage,bottom_hold_time,end_voltage,n,compliance_current_pos,compliance_current_neg)
+        for data, rows in zip([data_V_I,data_V_t,data_I_t], tsp_data(run_tsp_program(device,program)[channel],True)):
+            data.extend(rows) # also to the sink, and the plot updater draws them
+        device.turn_output_off()
+        return [data_V_I,data_V_t,data_I_t]
     first_step_time = np.absolute(top_voltage-start_voltage)/np.absolute(ramp_speed_1)
     second_step_time = np.absolute(top_voltage-bottom_voltage)/np.absolute(ramp_speed_2)
     last_step_time = np.absolute(bottom_voltage-end_voltage)/np.absolute(ramp_speed_1)
@@ -1203,44 +1188,40 @@ def cycling(device,start_voltage,ramp_speed_1,top_voltage,top_hold_time,ramp_spe
             data_I_t.append([I[0],keithley_time])
             data_V_I.append([V_actual,I[0],int(u+1)])
             data_V_t.append([V_actual,timestamp])
-            if GUI:
-                curve_I_t.setData(x=[k[1] for k in data_I_t], y=[k[0] for k in data_I_t], _callSync='off')
-                curve_V_I.setData(x=[k[0] for k in data_V_I], y=[k[1] for k in data_V_I], _callSync='off')
-                curve_V_t.setData(x=[k[1] for k in data_V_t], y=[k[0] for k in data_V_t], _callSync='off')
         time_at_end = timestamp
         device.set_voltage(end_voltage)
     device.turn_output_off()
     return [data_V_I,data_V_t,data_I_t]
     
-def cycling_current(device,start,ramp_speed_1,top,top_hold_time,ramp_speed_2,bottom,bottom_hold_time,end,n,maximum_voltage,new_row=False,GUI=True):
+def cycling_current(device,start,ramp_speed_1,top,top_hold_time,ramp_speed_2,bottom,bottom_hold_time,end,n,maximum_voltage,new_row=False,GUI=True, sink=None):
     device.reset()
     device.setup_current_measurement(1)
     device.set_voltage(maximum_voltage)
     device.set_compliance_current(start)
     device.turn_output_on()
     device.init()
-    data_V_I = []
-    data_V_t = []
-    data_I_t = []
+    data_V_I = data_list(sink, "V_I", ("V","I","cycle"))
+    data_V_t = data_list(sink, "V_t", ("V","t"))
+    data_I_t = data_list(sink, "I_t", ("I","t"))
     if GUI:
         # create an empty list in the remote process
         p1 = win.addPlot(title="Voltage vs. current")
-        curve_V_I = p1.plot(pen='y')
+        curve_V_I = curve_stream(p1.plot(pen='y'), proc)
         p1.setLabel('left', "Current", units='A')
         p1.setLabel('bottom', "Voltage", units='V')
-        curve_V_I.setData(data_V_I, _callSync='off')
+        display.watch(curve_V_I, data_V_I, 0, 1)
 
         p2 = win.addPlot(title="Voltage vs. time")
-        curve_V_t = p2.plot(pen='y')
+        curve_V_t = curve_stream(p2.plot(pen='y'), proc, decimate=True)
         p2.setLabel('left', "Voltage", units='V')
         p2.setLabel('bottom', "time", units='s')
-        curve_V_t.setData(data_V_t, _callSync='off')
+        display.watch(curve_V_t, data_V_t)
 
         p3 = win.addPlot(title="Current vs. time")
-        curve_I_t = p3.plot(pen='y')
+        curve_I_t = curve_stream(p3.plot(pen='y'), proc, decimate=True)
         p3.setLabel('left', "Current", units='A')
         p3.setLabel('bottom', "time", units='s')
-        curve_I_t.setData(data_I_t, _callSync='off')
+        display.watch(curve_I_t, data_I_t)
       
         if new_row:
             win.nextRow()
@@ -1292,16 +1273,12 @@ def cycling_current(device,start,ramp_speed_1,top,top_hold_time,ramp_speed_2,bot
             data_I_t.append([I[0],keithley_time])
             data_V_I.append([V_actual,I[0],int(u+1)])
             data_V_t.append([V_actual,timestamp])
-            if GUI:
-                curve_I_t.setData(x=[k[1] for k in data_I_t], y=[k[0] for k in data_I_t], _callSync='off')
-                curve_V_I.setData(x=[k[0] for k in data_V_I], y=[k[1] for k in data_V_I], _callSync='off')
-                curve_V_t.setData(x=[k[1] for k in data_V_t], y=[k[0] for k in data_V_t], _callSync='off')
         time_at_end = timestamp
         device.set_compliance_current(end)
     device.turn_output_off()
     return [data_V_I,data_V_t,data_I_t]
     
-def cycling_unipolar(device,start_voltage,ramp_speed_1,set_voltage,set_hold_time,compliance_current,ramp_speed_2,wait_before_reset_time,reset_voltage,reset_ramp_rate,reset_hold_time,n,new_row=False, GUI=True):
+def cycling_unipolar(device,start_voltage,ramp_speed_1,set_voltage,set_hold_time,compliance_current,ramp_speed_2,wait_before_reset_time,reset_voltage,reset_ramp_rate,reset_hold_time,n,new_row=False, GUI=True, sink=None):
     device.reset()
     device.setup_current_measurement(1)
     if set_voltage>100:
@@ -1311,28 +1288,28 @@ def cycling_unipolar(device,start_voltage,ramp_speed_1,set_voltage,set_hold_time
     device.set_voltage(start_voltage)
     device.turn_output_on()
     device.init()
-    data_V_I = []
-    data_V_t = []
-    data_I_t = []
+    data_V_I = data_list(sink, "V_I", ("V","I","cycle"))
+    data_V_t = data_list(sink, "V_t", ("V","t"))
+    data_I_t = data_list(sink, "I_t", ("I","t"))
     if GUI:
         # create an empty list in the remote process
         p1 = win.addPlot(title="Voltage vs. current")
-        curve_V_I = p1.plot(pen='y')
+        curve_V_I = curve_stream(p1.plot(pen='y'), proc)
         p1.setLabel('left', "Current", units='A')
         p1.setLabel('bottom', "Voltage", units='V')
-        curve_V_I.setData(data_V_I, _callSync='off')
+        display.watch(curve_V_I, data_V_I, 0, 1)
 
         p2 = win.addPlot(title="Voltage vs. time")
-        curve_V_t = p2.plot(pen='y')
+        curve_V_t = curve_stream(p2.plot(pen='y'), proc, decimate=True)
         p2.setLabel('left', "Voltage", units='V')
         p2.setLabel('bottom', "time", units='s')
-        curve_V_t.setData(data_V_t, _callSync='off')
+        display.watch(curve_V_t, data_V_t)
 
         p3 = win.addPlot(title="Current vs. time")
-        curve_I_t = p3.plot(pen='y')
+        curve_I_t = curve_stream(p3.plot(pen='y'), proc, decimate=True)
         p3.setLabel('left', "Current", units='A')
         p3.setLabel('bottom', "time", units='s')
-        curve_I_t.setData(data_I_t, _callSync='off')
+        display.watch(curve_I_t, data_I_t)
       
         if new_row:
             win.nextRow()
@@ -1387,17 +1364,13 @@ def cycling_unipolar(device,start_voltage,ramp_speed_1,set_voltage,set_hold_time
             data_I_t.append([I[0],timestamp])
             data_V_I.append([V_actual,I[0],int(u+1)])
             data_V_t.append([V_actual,timestamp])
-            if GUI:
-                curve_I_t.setData(x=[k[1] for k in data_I_t], y=[k[0] for k in data_I_t], _callSync='off')
-                curve_V_I.setData(x=[k[0] for k in data_V_I], y=[k[1] for k in data_V_I], _callSync='off')
-                curve_V_t.setData(x=[k[1] for k in data_V_t], y=[k[0] for k in data_V_t], _callSync='off')
         time_at_end = timestamp
         v0 = start_voltage
         device.set_voltage(v0)
     device.turn_output_off()
     return [data_V_I,data_V_t,data_I_t]
   
-def cycling_two_channels(device,start_voltage_1,start_voltage_2,ramp_speed_1_1,ramp_speed_1_2,top_voltage_1,top_voltage_2,top_hold_time_1,top_hold_time_2,ramp_speed_2_1,ramp_speed_2_2,bottom_voltage_1,bottom_voltage_2,bottom_hold_time_1,bottom_hold_time_2,end_voltage_1,end_voltage_2,n_1,n_2,compliance_current_pos_1=0,compliance_current_pos_2=0,compliance_current_neg_1=0,compliance_current_neg_2=0,new_row=False,GUI=True):
+def cycling_two_channels(device,start_voltage_1,start_voltage_2,ramp_speed_1_1,ramp_speed_1_2,top_voltage_1,top_voltage_2,top_hold_time_1,top_hold_time_2,ramp_speed_2_1,ramp_speed_2_2,bottom_voltage_1,bottom_voltage_2,bottom_hold_time_1,bottom_hold_time_2,end_voltage_1,end_voltage_2,n_1,n_2,compliance_current_pos_1=0,compliance_current_pos_2=0,compliance_current_neg_1=0,compliance_current_neg_2=0,new_row=False,GUI=True,on_instrument=False,step_time=0.05, sink=None):
     device.reset()
     device.setup_current_measurement(1,channel="A")
     device.setup_current_measurement(1,channel="B")
@@ -1406,52 +1379,61 @@ def cycling_two_channels(device,start_voltage_1,start_voltage_2,ramp_speed_1_1,r
     device.turn_output_on("A")
     device.turn_output_on("B")
     device.init()
-    data_V_I_1 = []
-    data_V_t_1 = []
-    data_I_t_1 = []
-    data_V_I_2 = []
-    data_V_t_2 = []
-    data_I_t_2 = []
+    data_V_I_1 = data_list(sink, "V_I_1", ("V","I","cycle"))
+    data_V_t_1 = data_list(sink, "V_t_1", ("V","t"))
+    data_I_t_1 = data_list(sink, "I_t_1", ("I","t"))
+    data_V_I_2 = data_list(sink, "V_I_2", ("V","I","cycle"))
+    data_V_t_2 = data_list(sink, "V_t_2", ("V","t"))
+    data_I_t_2 = data_list(sink, "I_t_2", ("I","t"))
     if GUI:
         # create an empty list in the remote process
         p1 = win.addPlot(title="Voltage vs. current Channel A")
-        curve_V_I_1 = p1.plot(pen='y')
+        curve_V_I_1 = curve_stream(p1.plot(pen='y'), proc)
         p1.setLabel('left', "Current", units='A')
         p1.setLabel('bottom', "Voltage", units='V')
-        curve_V_I_1.setData(data_V_I_1, _callSync='off')
+        display.watch(curve_V_I_1, data_V_I_1, 0, 1)
 
         p2 = win.addPlot(title="Voltage vs. time Channel A")
-        curve_V_t_1 = p2.plot(pen='y')
+        curve_V_t_1 = curve_stream(p2.plot(pen='y'), proc, decimate=True)
         p2.setLabel('left', "Voltage", units='V')
         p2.setLabel('bottom', "time", units='s')
-        curve_V_t_1.setData(data_V_t_1, _callSync='off')
+        display.watch(curve_V_t_1, data_V_t_1)
 
         p3 = win.addPlot(title="Current vs. time Channel A")
-        curve_I_t_1 = p3.plot(pen='y')
+        curve_I_t_1 = curve_stream(p3.plot(pen='y'), proc, decimate=True)
         p3.setLabel('left', "Current", units='A')
         p3.setLabel('bottom', "time", units='s')
-        curve_I_t_1.setData(data_I_t_1, _callSync='off')
+        display.watch(curve_I_t_1, data_I_t_1)
         
         win.nextRow()
         p1 = win.addPlot(title="Voltage vs. current Channel B")
-        curve_V_I_2 = p1.plot(pen='y')
+        curve_V_I_2 = curve_stream(p1.plot(pen='y'), proc)
         p1.setLabel('left', "Current", units='A')
         p1.setLabel('bottom', "Voltage", units='V')
-        curve_V_I_2.setData(data_V_I_2, _callSync='off')
+        display.watch(curve_V_I_2, data_V_I_2, 0, 1)
 
         p2 = win.addPlot(title="Voltage vs. time Channel B")
-        curve_V_t_2 = p2.plot(pen='y')
+        curve_V_t_2 = curve_stream(p2.plot(pen='y'), proc, decimate=True)
         p2.setLabel('left', "Voltage", units='V')
         p2.setLabel('bottom', "time", units='s')
-        curve_V_t_2.setData(data_V_t_2, _callSync='off')
+        display.watch(curve_V_t_2, data_V_t_2)
 
         p3 = win.addPlot(title="Current vs. time Channel B")
-        curve_I_t_2 = p3.plot(pen='y')
+        curve_I_t_2 = curve_stream(p3.plot(pen='y'), proc, decimate=True)
         p3.setLabel('left', "Current", units='A')
         p3.setLabel('bottom', "time", units='s')
-        curve_I_t_2.setData(data_I_t_2, _callSync='off')
+        display.watch(curve_I_t_2, data_I_t_2)
         if new_row:
             win.nextRow()
+    if on_instrument: # both channels run simultaneously as one TSP script on the Keithley 26xxB
+        program = tsp_program(step_time)
+        add_tsp_cycles(program,"A",device.maximum_current_allowed,start_voltage_1,ramp_speed_1_1,top_voltage_1,top_hold_time_1,ramp_speed_2_1,bottom_voltage_1,bottom_hold_time_1,end_voltage_1,n_1,compliance_current_pos_1,compliance_current_neg_1)
+        add_tsp_cycles(program,"B",device.maximum_current_allowed,start_voltage_2,ramp_speed_1_2,top_voltage_2,top_hold_time_2,ramp_speed_2_2,bottom_voltage_2,bottom_hold_time_2,end_voltage_2,n_2,compliance_current_pos_2,compliance_current_neg_2)
+        result = run_tsp_program(device,program)
+        for data, rows in zip([data_V_I_1,data_V_t_1,data_I_t_1,data_V_I_2,data_V_t_2,data_I_t_2], tsp_data(result["A"],True)+tsp_data(result["B"],True)):
+            data.extend(rows)
+        device.turn_output_off()
+        return [data_V_I_1,data_V_t_1,data_I_t_1,data_V_I_2,data_V_t_2,data_I_t_2]
     first_step_time_1 = np.absolute(top_voltage_1-start_voltage_1)/np.absolute(ramp_speed_1_1)
     second_step_time_1 = np.absolute(top_voltage_1-bottom_voltage_1)/np.absolute(ramp_speed_2_1)
     last_step_time_1 = np.absolute(bottom_voltage_1-end_voltage_1)/np.absolute(ramp_speed_1_1)
@@ -1553,13 +1535,6 @@ def cycling_two_channels(device,start_voltage_1,start_voltage_2,ramp_speed_1_1,r
         data_I_t_2.append([I_2[0],keithley_time])
         data_V_I_2.append([V_actual_2,I_2[0],int(u_2+1)])
         data_V_t_2.append([V_actual_2,timestamp])
-        if GUI:
-            curve_I_t_1.setData(x=[k[1] for k in data_I_t_1], y=[k[0] for k in data_I_t_1], _callSync='off')
-            curve_V_I_1.setData(x=[k[0] for k in data_V_I_1], y=[k[1] for k in data_V_I_1], _callSync='off')
-            curve_V_t_1.setData(x=[k[1] for k in data_V_t_1], y=[k[0] for k in data_V_t_1], _callSync='off')
-            curve_I_t_2.setData(x=[k[1] for k in data_I_t_2], y=[k[0] for k in data_I_t_2], _callSync='off')
-            curve_V_I_2.setData(x=[k[0] for k in data_V_I_2], y=[k[1] for k in data_V_I_2], _callSync='off')
-            curve_V_t_2.setData(x=[k[1] for k in data_V_t_2], y=[k[0] for k in data_V_t_2], _callSync='off')
         if timestamp > total_time_needed_1*(u_1+1):
             time_at_end_1 = timestamp
             device.set_voltage(end_voltage_1,"A")
@@ -1573,7 +1548,7 @@ def cycling_two_channels(device,start_voltage_1,start_voltage_2,ramp_speed_1_1,r
     device.turn_output_off()
     return [data_V_I_1,data_V_t_1,data_I_t_1,data_V_I_2,data_V_t_2,data_I_t_2]
     
-def voltage_logger(device,total_measurement_time,bias_current=0,new_row=False, GUI=True):
+def voltage_logger(device,total_measurement_time,bias_current=0,new_row=False, GUI=True, sink=None):
     device.reset()
     device.setup_voltage_measurement()
     if bias_current is not 0:
@@ -1582,14 +1557,14 @@ def voltage_logger(device,total_measurement_time,bias_current=0,new_row=False, G
         device.turn_output_on()
     if device.get_id() is not "keithley_6517B": # the high resistance meter is the only device where the output does not need to be turned on to measure only
         device.turn_output_on()
-    data_V_t = []
+    data_V_t = data_list(sink, "V_t", ("V","t"))
     if GUI:
         # create an empty list in the remote process
         p3 = win.addPlot(title="Voltage vs. time")
-        curve_V_t = p3.plot(pen='y')
+        curve_V_t = curve_stream(p3.plot(pen='y'), proc, decimate=True)
+        display.watch(curve_V_t, data_V_t)
         p3.setLabel('left', "Voltage", units='V')
         p3.setLabel('bottom', "time", units='s')
-        curve_V_t.setData(data_V_t, _callSync='off')
         if new_row:
             win.nextRow()
     t0 = time.time() # measurement start time
@@ -1597,11 +1572,9 @@ def voltage_logger(device,total_measurement_time,bias_current=0,new_row=False, G
         V = device.get_value()
         time_val = time.time() - t0
         data_V_t.append([V[0],time_val])
-        if GUI:
-            curve_V_t.setData(x=[k[1] for k in data_V_t], y=[k[0] for k in data_V_t], _callSync='off')
     return [data_V_t]
     
-def current_logger(device,total_measurement_time,bias_voltage=0,new_row=False, GUI=True):
+def current_logger(device,total_measurement_time,bias_voltage=0,new_row=False, GUI=True, sink=None):
     device.reset()
     device.setup_current_measurement()
     if bias_voltage is not 0:
@@ -1610,14 +1583,14 @@ def current_logger(device,total_measurement_time,bias_voltage=0,new_row=False, G
         device.turn_output_on()
     if device.get_id() is not "keithley_6517B": # the high resistance meter is the only device where the output does not need to be turned on to measure only
         device.turn_output_on()
-    data_I_t = []
+    data_I_t = data_list(sink, "I_t", ("I","t"))
     if GUI:
         # create an empty list in the remote process
         p3 = win.addPlot(title="Current vs. time")
-        curve_I_t = p3.plot(pen='y')
+        curve_I_t = curve_stream(p3.plot(pen='y'), proc, decimate=True)
+        display.watch(curve_I_t, data_I_t)
         p3.setLabel('left', "Current", units='A')
         p3.setLabel('bottom', "time", units='s')
-        curve_I_t.setData(data_I_t, _callSync='off')
         if new_row:
             win.nextRow()
     t0 = time.time() # measurement start time
@@ -1625,23 +1598,21 @@ def current_logger(device,total_measurement_time,bias_voltage=0,new_row=False, G
         I = device.get_value()
         time_val = time.time() - t0
         data_I_t.append([I[0],time_val])
-        if GUI:
-            curve_I_t.setData(x=[k[1] for k in data_I_t], y=[k[0] for k in data_I_t], _callSync='off')
     if bias_voltage is not 0:
         device.turn_output_off()
     return [data_I_t]
  
-def resistance_2w_logger(device,total_measurement_time,new_row=False, GUI=True):
+def resistance_2w_logger(device,total_measurement_time,new_row=False, GUI=True, sink=None):
     device.reset()
     device.setup_2w_resistance_measurement()
-    data_R_t = []
+    data_R_t = data_list(sink, "R_t", ("R","t"))
     if GUI:
         # create an empty list in the remote process
         p3 = win.addPlot(title="Resistance vs. time")
-        curve_R_t = p3.plot(pen='y')
+        curve_R_t = curve_stream(p3.plot(pen='y'), proc, decimate=True)
         p3.setLabel('left', "Resistance", units='Ohm')
         p3.setLabel('bottom', "time", units='s')
-        curve_R_t.setData(data_R_t, _callSync='off')
+        display.watch(curve_R_t, data_R_t)
         if new_row:
             win.nextRow()
     t0 = time.time() # measurement start time
@@ -1649,21 +1620,19 @@ def resistance_2w_logger(device,total_measurement_time,new_row=False, GUI=True):
         R = device.get_value()
         time_val = time.time() - t0
         data_R_t.append([R[0],time_val])
-        if GUI:
-            curve_R_t.setData(x=[k[1] for k in data_R_t], y=[k[0] for k in data_R_t], _callSync='off')
     return [data_R_t]
  
-def resistance_4w_logger(device,total_measurement_time,new_row=False, GUI=True):
+def resistance_4w_logger(device,total_measurement_time,new_row=False, GUI=True, sink=None):
     device.reset()
     device.setup_4w_resistance_measurement()
-    data_R_t = []
+    data_R_t = data_list(sink, "R_t", ("R","t"))
     if GUI:
         # create an empty list in the remote process
         p3 = win.addPlot(title="Resistance vs. time")
-        curve_R_t = p3.plot(pen='y')
+        curve_R_t = curve_stream(p3.plot(pen='y'), proc, decimate=True)
         p3.setLabel('left', "Resistance", units='Ohm')
         p3.setLabel('bottom', "time", units='s')
-        curve_R_t.setData(data_R_t, _callSync='off')
+        display.watch(curve_R_t, data_R_t)
         if new_row:
             win.nextRow()
     t0 = time.time() # measurement start time
@@ -1671,29 +1640,27 @@ def resistance_4w_logger(device,total_measurement_time,new_row=False, GUI=True):
         R = device.get_value()
         time_val = time.time() - t0
         data_R_t.append([R[0],time_val])
-        if GUI:
-            curve_R_t.setData(x=[k[1] for k in data_R_t], y=[k[0] for k in data_R_t], _callSync='off')
     return [data_R_t]
     
-def temperature_logger(device,total_measurement_time,sensor="K",num_of_channels=1,new_row=False, GUI=True):
+def temperature_logger(device,total_measurement_time,sensor="K",num_of_channels=1,new_row=False, GUI=True, sink=None):
     device.reset()
     device.setup_temperature_measurement(sensor)
-    data_T_t = []
-    data_T2_t = []
+    data_T_t = data_list(sink, "T_t", ("T","t"))
+    data_T2_t = data_list(sink, "T2_t", ("T","t"))
     if GUI:
         # create an empty list in the remote process
         p3 = win.addPlot(title="Temperature vs. time")
-        curve_T_t = p3.plot(pen='y')
+        curve_T_t = curve_stream(p3.plot(pen='y'), proc, decimate=True)
+        display.watch(curve_T_t, data_T_t)
         p3.setLabel('left', "Temperature", units='C')
         p3.setLabel('bottom', "time", units='s')
-        curve_T_t.setData(data_T_t, _callSync='off')
 
         if num_of_channels > 1:
             p3 = win.addPlot(title="Temperature 2 vs. time")
-            curve_T2_t = p3.plot(pen='y')
+            curve_T2_t = curve_stream(p3.plot(pen='y'), proc, decimate=True)
+            display.watch(curve_T2_t, data_T2_t)
             p3.setLabel('left', "Temperature", units='C')
             p3.setLabel('bottom', "time", units='s')
-            curve_T2_t.setData(data_T2_t, _callSync='off')
       
         if new_row:
             win.nextRow()
@@ -1711,10 +1678,6 @@ def temperature_logger(device,total_measurement_time,sensor="K",num_of_channels=
             if T_val > 2000:
                 T_val = 0
             data_T2_t.append([T_val,time_val])
-        if GUI:
-            curve_T_t.setData(x=[k[1] for k in data_T_t], y=[k[0] for k in data_T_t], _callSync='off')
-            if num_of_channels > 1:
-                curve_T2_t.setData(x=[k[1] for k in data_T2_t], y=[k[0] for k in data_T2_t], _callSync='off')
     if num_of_channels > 1:
         return [data_T_t,data_T2_t]
     return [data_T_t]
@@ -1774,7 +1737,7 @@ def temperature_logger(device,total_measurement_time,sensor="K",num_of_channels=
                     #curve_T_t[i].setData(x=[k[1] for k in data_T_t[i]], y=[k[0] for k in data_T_t[i]], _callSync='off')
     #return [data_T_t]
     
-def temperature_current_logger(device_temperature,device_smu,total_measurement_time,bias_voltage=0,sensor="K",new_row=False, GUI=True):
+def temperature_current_logger(device_temperature,device_smu,total_measurement_time,bias_voltage=0,sensor="K",new_row=False, GUI=True, sink=None):
     device_temperature.reset()
     device_smu.reset()
     device_temperature.setup_temperature_measurement(sensor)
@@ -1782,21 +1745,21 @@ def temperature_current_logger(device_temperature,device_smu,total_measurement_t
     device_smu.turn_output_off()
     device_smu.set_voltage(bias_voltage)
     device_smu.turn_output_on()
-    data_T_t = []
-    data_I_t = []
+    data_T_t = data_list(sink, "T_t", ("T","t"))
+    data_I_t = data_list(sink, "I_t", ("I","t"))
     if GUI:
         # create an empty list in the remote process
         p3 = win.addPlot(title="Temperature vs. time")
-        curve_T_t = p3.plot(pen='y')
+        curve_T_t = curve_stream(p3.plot(pen='y'), proc, decimate=True)
         p3.setLabel('left', "Temperature", units='C')
         p3.setLabel('bottom', "time", units='s')
-        curve_T_t.setData(data_T_t, _callSync='off')
+        display.watch(curve_T_t, data_T_t)
         
         p3 = win.addPlot(title="Current vs. time")
-        curve_I_t = p3.plot(pen='y')
+        curve_I_t = curve_stream(p3.plot(pen='y'), proc, decimate=True)
         p3.setLabel('left', "Current", units='A')
         p3.setLabel('bottom', "time", units='s')
-        curve_I_t.setData(data_I_t, _callSync='off')
+        display.watch(curve_I_t, data_I_t)
         if new_row:
             win.nextRow()
     t0 = time.time() # measurement start time
@@ -1809,16 +1772,15 @@ def temperature_current_logger(device_temperature,device_smu,total_measurement_t
         time_val = time.time() - t0
         data_T_t.append([T_val,time_val])
         data_I_t.append([I,time_val])
-        if GUI:
-            curve_T_t.setData(x=[k[1] for k in data_T_t], y=[k[0] for k in data_T_t], _callSync='off')
-            curve_I_t.setData(x=[k[1] for k in data_I_t], y=[k[0] for k in data_I_t], _callSync='off')
     device_smu.turn_output_off()
     return [data_T_t,data_I_t]
     
-def arrhenius_dc(device_temperature,device_smu,device_oven,temperature_values,ramp_rates,stabilization_times,voltage_values,measurement_time=60,continuous_voltage=True,GUI=True):
+def arrhenius_dc(device_temperature,device_smu,device_oven,temperature_values,ramp_rates,stabilization_times,voltage_values,measurement_time=60,continuous_voltage=True,GUI=True, sink=None):
     oven_constant = device_oven.get_oven_constant()
     global window_title
     window_title = str(device_oven.get_oven_name())
+    if sink is not None:
+        sink.metadata(measurement="arrhenius_dc", oven=window_title, temperature_values=temperature_values, ramp_rates=ramp_rates, stabilization_times=stabilization_times, voltage_values=voltage_values, measurement_time=measurement_time, instruments=instrument_ids(device_temperature,device_smu,device_oven))
     oven_name = " "+str(device_oven.get_oven_name())
     room_temperature = 23
     if type(temperature_values)==float or type(temperature_values)==int:
@@ -1856,10 +1818,10 @@ def arrhenius_dc(device_temperature,device_smu,device_oven,temperature_values,ra
     device_oven.set_sp1(temperature_values[0])
     device_oven.set_setpoint_rate(ramp_rates[0])
     device_oven.disable_setpoint_rate()
-    data_T_t = [[],[]]
+    data_T_t = [data_list(sink, "T_t", ("T","t")),data_list(sink, "PV_t", ("T","t"))]
     data_P_t = [[],[[],[]],[]]
-    data_I_t = []
-    data_R_T = [[] for i in range(len(voltage_values))]
+    data_I_t = data_list(sink, "I_t", ("I","t"))
+    data_R_T = [data_list(sink, "R_T_"+str(i), ("R","T")) for i in range(len(voltage_values))]
     if GUI:
         curve_T_t = []
         curve_P_t = []
@@ -1871,9 +1833,9 @@ def arrhenius_dc(device_temperature,device_smu,device_oven,temperature_values,ra
         p3.setLabel('bottom', "time", units='s')
         p3.addLegend()
         curve = p3.plot(pen=(0,2),name="Temperature in chamber")
-        curve_T_t.append(curve)
+        curve_T_t.append(curve_stream(curve, proc, decimate=True))
         curve = p3.plot(pen=(1,2),name="PV (Eurotherm)"+oven_name)
-        curve_T_t.append(curve)
+        curve_T_t.append(curve_stream(curve, proc, decimate=True))
         # now a new plot where we show the optimal curve
         p3 = win.addPlot(title="Program vs. time")
         p3.setLabel('left', "Temperature", units='C')
@@ -1933,7 +1895,7 @@ def arrhenius_dc(device_temperature,device_smu,device_oven,temperature_values,ra
             curve = p3.plot(pen=(0,2))
         else:
             curve = p3.plot(pen=None,symbol='+')
-        curve_I_t.append(curve)
+        curve_I_t.append(curve_stream(curve, proc, decimate=True))
         p3 = win.addPlot(title="Resistance vs. temperature")
         p3.setLabel('left', "resistance", units='Ohm')
         p3.setLabel('bottom', "temperature", units=u"°C")
@@ -1942,9 +1904,13 @@ def arrhenius_dc(device_temperature,device_smu,device_oven,temperature_values,ra
         for i,voltage_val in enumerate(voltage_values):
             curve = p3.plot(pen=None,symbol='+',symbolPen=(i,len(voltage_values)))
             dynamic_legend_resistance.addItem(curve, name=str(voltage_val)+"V")
-            curve_R_T.append(curve)
+            curve_R_T.append(curve_stream(curve, proc))
+    if GUI:
+        display.watch(curve_T_t[0], data_T_t[0]) # Chamber
+        display.watch(curve_T_t[1], data_T_t[1]) # PV
+        display.watch(curve_I_t[0], data_I_t)
         for i in range(len(voltage_values)):
-            curve_R_T[i].setData(data_R_T[i], _callSync='off')
+            display.watch(curve_R_T[i], data_R_T[i])
     t0 = time.time() # measurement start time
     T_now = device_oven.get_pv()
     time_summing_last_actions = 0
@@ -1970,11 +1936,7 @@ def arrhenius_dc(device_temperature,device_smu,device_oven,temperature_values,ra
                 I = device_smu.get_value()
                 data_I_t.append([I[0],time_val])
             if GUI:
-                curve_T_t[0].setData(x=[k[1] for k in data_T_t[0]], y=[k[0] for k in data_T_t[0]], _callSync='off') # Chamber
-                curve_T_t[1].setData(x=[k[1] for k in data_T_t[1]], y=[k[0] for k in data_T_t[1]], _callSync='off') # PV
-                curve_P_t[2].setData(x=[time_val], y=[PV], _callSync='off')
-                if continuous_voltage:
-                    curve_I_t[0].setData(x=[k[1] for k in data_I_t], y=[k[0] for k in data_I_t], _callSync='off')
+                display.set_data(curve_P_t[2], x=[time_val], y=[PV])
             if time_val > stabilization_times[index]+np.absolute(T_set-T_now)/(ramp_rates[index]/60.0)+time_summing_last_actions:
                 time_summing_last_actions = time_summing_last_actions+stabilization_times[index]+np.absolute(T_set-T_now)/(ramp_rates[index]/60.0)
                 step_done = True
@@ -2008,17 +1970,11 @@ def arrhenius_dc(device_temperature,device_smu,device_oven,temperature_values,ra
                         if continuous_voltage:
                             data_I_t.append([I[0],time_val])
                         if GUI:
-                            curve_T_t[0].setData(x=[k[1] for k in data_T_t[0]], y=[k[0] for k in data_T_t[0]], _callSync='off')
-                            curve_T_t[1].setData(x=[k[1] for k in data_T_t[1]], y=[k[0] for k in data_T_t[1]], _callSync='off')
-                            curve_P_t[2].setData(x=[time_val], y=[PV], _callSync='off')
-                            if continuous_voltage:
-                                curve_I_t[0].setData(x=[k[1] for k in data_I_t], y=[k[0] for k in data_I_t], _callSync='off')
+                            display.set_data(curve_P_t[2], x=[time_val], y=[PV])
                     data_R_T[i].append([float(voltage_val/np.average([k[0] for k in average_current])),np.average([k[1] for k in average_current])])
                     if GUI:
-                        curve_R_T[i].setData(x=[k[1] for k in data_R_T[i]], y=[k[0] for k in data_R_T[i]], _callSync='off')
                         if not continuous_voltage:
                             data_I_t.extend([[k[0],k[2]] for k in average_current])
-                            curve_I_t[0].setData(x=[k[1] for k in data_I_t], y=[k[0] for k in data_I_t], _callSync='off')
                 if not continuous_voltage:
                     device_smu.turn_output_off()
                 T_now = PV
@@ -2031,7 +1987,7 @@ def arrhenius_dc(device_temperature,device_smu,device_oven,temperature_values,ra
                     device_oven.set_setpoint_rate(ramp_rates[index+1])
     return [data_T_t,data_P_t,data_I_t,data_R_T]
     
-def sintering(device_temperature,device_oven,temperature_values,ramp_rates,stabilization_times,sensor="K",GUI=True):
+def sintering(device_temperature,device_oven,temperature_values,ramp_rates,stabilization_times,sensor="K",use_programmer=False,GUI=True, sink=None, poll_interval=5.0): # poll_interval: seconds between the reads of a programmed run
     room_temperature = 23
     oven_constant = device_oven.get_oven_constant()
     global window_title
@@ -2050,20 +2006,29 @@ def sintering(device_temperature,device_oven,temperature_values,ramp_rates,stabi
     # Compare length of stabilization_times array and make it fit to the temperature_values
     while len(stabilization_times) < len(temperature_values):
         stabilization_times.append(stabilization_times[-1])
+    if sink is not None:
+        sink.metadata(measurement="sintering", oven=window_title, temperature_values=temperature_values, ramp_rates=ramp_rates, stabilization_times=stabilization_times, sensor=sensor, instruments=instrument_ids(device_temperature,device_oven))
     # set oven to first setpoint
     #device_oven.set_ptyp_none()
     #device_oven.set_auto_mode()
     #device_oven.disable_programmer_mode()
     device_oven.set_instrument_mode(0)
     device_oven.select_setpoint(0) # means setpoint 1
-    device_oven.set_sp1(temperature_values[0])
-    device_oven.set_setpoint_rate(ramp_rates[0])
-    device_oven.disable_setpoint_rate()
+    programmed = use_programmer and getattr(device_oven, "program_base", None) is not None
+    if use_programmer and not programmed:
+        print "WARNING: The programmer of "+window_title+" can not be written over Modbus. Setting the setpoints from here"
+    if programmed: # the controller runs the whole profile, we only watch
+        device_oven.upload_program(ramp_dwell_profile(temperature_values,ramp_rates,stabilization_times))
+        device_oven.run_program()
+    else:
+        device_oven.set_sp1(temperature_values[0])
+        device_oven.set_setpoint_rate(ramp_rates[0])
+        device_oven.disable_setpoint_rate()
     # Setup temperature measuring device
     if device_temperature is not None:
         device_temperature.reset()
         device_temperature.setup_temperature_measurement(sensor)
-    data_T_t = [[],[]]
+    data_T_t = [data_list(sink, "T_t", ("T","t")),data_list(sink, "PV_t", ("T","t"))]
     data_P_t = [[],[[],[]],[]]
     if GUI:
         curve_T_t = []
@@ -2073,9 +2038,9 @@ def sintering(device_temperature,device_oven,temperature_values,ramp_rates,stabi
         p3.setLabel('bottom', "time", units='s')
         p3.addLegend()
         curve = p3.plot(pen=(0,2),name="Temperature in chamber")
-        curve_T_t.append(curve)
+        curve_T_t.append(curve_stream(curve, proc))
         curve = p3.plot(pen=(1,2),name="PV (Eurotherm)"+oven_name)
-        curve_T_t.append(curve)
+        curve_T_t.append(curve_stream(curve, proc))
         # now a new plot where we show the optimal curve
         p3 = win.addPlot(title="Program vs. time")
         p3.setLabel('left', "Temperature", units='C')
@@ -2125,18 +2090,40 @@ def sintering(device_temperature,device_oven,temperature_values,ramp_rates,stabi
     if GUI:
         curve_P_t[0].setData(x=[k[1] for k in data_P_t[0]], y=[k[0] for k in data_P_t[0]], _callSync='off') # program
         curve_P_t[1].setData(x=data_P_t[1][0], y=data_P_t[1][1],connect=connected_lines_array, _callSync='off') # cooling
+    if GUI:
+        display.watch(curve_T_t[0], data_T_t[0])
+        display.watch(curve_T_t[1], data_T_t[1])
+    def get_temperature():
+        if device_temperature is None:
+            return [0,0]
+        T = device_temperature.get_value()
+        if T[0] > 2000:
+            T[0] = 0 # make graphical output nicer in case of overflow
+        return T
     t0 = time.time() # measurement start time
+    if programmed: # the controller runs the profile on its own, look at it every poll_interval seconds until it is complete or reset
+        def record(progress):
+            T = get_temperature()
+            PV = device_oven.get_pv()
+            if PV is None: # communication error, the program_progress() of the next poll tells if it persists
+                return
+            time_val = time.time() - t0
+            data_T_t[0].append([T[0],time_val])
+            data_T_t[1].append([PV,time_val])
+            data_P_t[2] = [PV,time_val]
+            if GUI:
+                display.set_data(curve_P_t[2], x=[time_val], y=[PV])
+        try:
+            device_oven.wait_for_program(poll_interval, record)
+        except IOError: # We have a communication error. Stop watching, the controller goes on with the profile
+            print "WARNING: Lost the connection to the programmer of "+window_title+", it continues the profile on its own"
+        return [data_T_t,data_P_t]
     T_now = device_oven.get_pv()
     time_summing_last_actions = 0
     for index,T_set in enumerate(temperature_values):
         step_done = False
         while not step_done:
-            if device_temperature is not None:
-                T = device_temperature.get_value()
-                if T[0] > 2000:
-                    T[0] = 0 # make graphical output nicer in case of overflow
-            else:
-                T = [0,0]
+            T = get_temperature()
             PV = device_oven.get_pv()
             if PV is None: # We have a communication error. Stop the program
                 step_done = True
@@ -2154,12 +2141,10 @@ def sintering(device_temperature,device_oven,temperature_values,ramp_rates,stabi
             data_T_t[1].append([PV,time_val])
             data_P_t[2] = [PV,time_val]
             if GUI:
-                curve_T_t[0].setData(x=[k[1] for k in data_T_t[0]], y=[k[0] for k in data_T_t[0]], _callSync='off')
-                curve_T_t[1].setData(x=[k[1] for k in data_T_t[1]], y=[k[0] for k in data_T_t[1]], _callSync='off')
-                curve_P_t[2].setData(x=[time_val], y=[PV], _callSync='off')
+                display.set_data(curve_P_t[2], x=[time_val], y=[PV])
     return [data_T_t,data_P_t]
  
-def mfc(device_mfc,stabilization_times,flow_rates,GUI=True):
+def mfc(device_mfc,stabilization_times,flow_rates,GUI=True, sink=None):
     if type(stabilization_times)==float or type(stabilization_times)==int:
        stabilization_times = [stabilization_times] # make an array
     if not isinstance(flow_rates, list):
@@ -2254,8 +2239,8 @@ def mfc(device_mfc,stabilization_times,flow_rates,GUI=True):
         stabilization_times.append(stabilization_times[-1])
     while len(mfc_steps) < len(stabilization_times): # Now do the opposite. If one has more stabilization_times than steps duplicate the last step
         mfc_steps.append(mfc_steps[-1])
-    data_F_t = [[] for i in range(len(mfc_modbus))]
-    data_FP_t = [[] for i in range(len(mfc_modbus))]
+    data_F_t = [data_list(sink, "F_t_"+str(i), ("F","t")) for i in range(len(mfc_modbus))]
+    data_FP_t = [data_list(sink, "FP_t_"+str(i), ("F","t")) for i in range(len(mfc_modbus))]
     if GUI:
         curve_F_t = []
         curve_FP_t = []
@@ -2265,7 +2250,8 @@ def mfc(device_mfc,stabilization_times,flow_rates,GUI=True):
         p3.addLegend()
         for i,mfc in enumerate(mfc_str):
             curve = p3.plot(pen=(i,len(mfc_str)),name=str(mfc))
-            curve_F_t.append(curve)
+            curve_F_t.append(curve_stream(curve, proc, decimate=True))
+            display.watch(curve_F_t[i], data_F_t[i])
         # now a new plot where we show the optimal curve
         p3 = win.addPlot(title="Flow-program vs. time")
         p3.setLabel('left', "Flow", units='sccm')
@@ -2288,35 +2274,37 @@ def mfc(device_mfc,stabilization_times,flow_rates,GUI=True):
     if GUI:
         for i in range(len(mfc_modbus)):
             curve_FP_t[i].setData(x=[k[1] for k in data_FP_t[i]], y=[k[0] for k in data_FP_t[i]], _callSync='off')
+    scheduler = voegtlin_scheduler(device_mfc,mfc_modbus) # one transaction per MFC and loop, unit factors are cached
     t0 = time.time() # measurement start time
     time_summing_last_actions = 0
     for index,timestep in enumerate(stabilization_times):
         step_done = False
         # set first valve positions
         for mfc in mfc_steps[index]:
-            device_mfc.set_sp(mfc[1],mfc[0]) # value, address
+            scheduler.set_sp(mfc[1],mfc[0]) # value, address
         while not step_done:
+            scheduler.tick()
             time_val = time.time() - t0
             for i,mfc in enumerate(mfc_steps[index]):
-                data_F_t[i].append([device_mfc.get_flow(mfc[0]),time_val])
+                data_F_t[i].append([scheduler.get_flow(mfc[0]),time_val])
             if time_val > stabilization_times[index]+time_summing_last_actions:
                 time_summing_last_actions = time_summing_last_actions+stabilization_times[index]
                 step_done = True
                 if (index+1) < len(stabilization_times):
                     for mfc in mfc_steps[index+1]:
-                        device_mfc.set_sp(mfc[1],mfc[0]) # value, address
+                        scheduler.set_sp(mfc[1],mfc[0]) # value, address
             # graphical output
             if GUI:
-                for i in range(len(mfc_modbus)):
-                    curve_F_t[i].setData(x=[k[1] for k in data_F_t[i]], y=[k[0] for k in data_F_t[i]], _callSync='off')
-                curve_FP_t[-1].setValue(time_val)
+                curve_FP_t[-1].setValue(time_val, _callSync='off')
     device_mfc.close() # set all setpoint to 0 to limit gas consumption
     return [data_F_t,data_FP_t]
 
-def arrhenius_ac(device_temperature,device_oven,device_impedance,temperature_values,ramp_rates,stabilization_times,number_of_repetitions=1,start_frequency=0.1,end_frequency=1.0e6,ac_amplitude=0.1,bias=0,num_points_per_decade=10,path="/home/electrochem/lost_data",GUI=True):
+def arrhenius_ac(device_temperature,device_oven,device_impedance,temperature_values,ramp_rates,stabilization_times,number_of_repetitions=1,start_frequency=0.1,end_frequency=1.0e6,ac_amplitude=0.1,bias=0,num_points_per_decade=10,path="/home/electrochem/lost_data",GUI=True, sink=None):
     oven_constant = device_oven.get_oven_constant()
     global window_title
     window_title = str(device_oven.get_oven_name())
+    if sink is not None:
+        sink.metadata(measurement="arrhenius_ac", oven=window_title, temperature_values=temperature_values, ramp_rates=ramp_rates, stabilization_times=stabilization_times, number_of_repetitions=number_of_repetitions, start_frequency=start_frequency, end_frequency=end_frequency, ac_amplitude=ac_amplitude, bias=bias, instruments=instrument_ids(device_temperature,device_oven,device_impedance))
     oven_name = " "+str(device_oven.get_oven_name())
     room_temperature = 23
     path = path.rstrip("/")
@@ -2352,10 +2340,10 @@ def arrhenius_ac(device_temperature,device_oven,device_impedance,temperature_val
     if device_temperature is not None:
         device_temperature.reset()
         device_temperature.setup_temperature_measurement()
-    data_T_t = [[],[]]
+    data_T_t = [data_list(sink, "T_t", ("T","t")),data_list(sink, "PV_t", ("T","t"))]
     data_P_t = [[],[],[[],[]],[]]
-    data_Zi_Zr = [[] for i in range(len(temperature_values))]
-    data_freq_mod = [[] for i in range(len(temperature_values))]
+    data_Zi_Zr = [data_list(sink, "Zi_Zr_"+str(i), ("minus_Zimag","Zreal")) for i in range(len(temperature_values))]
+    data_freq_mod = [data_list(sink, "freq_mod_"+str(i), ("frequency","modulus")) for i in range(len(temperature_values))]
     if GUI:
         curve_T_t = []
         curve_P_t = []
@@ -2367,9 +2355,9 @@ def arrhenius_ac(device_temperature,device_oven,device_impedance,temperature_val
         p3.setLabel('bottom', "time", units='s')
         p3.addLegend()
         curve = p3.plot(pen=(0,2),name="Temperature in chamber")
-        curve_T_t.append(curve)
+        curve_T_t.append(curve_stream(curve, proc))
         curve = p3.plot(pen=(1,2),name="PV (Eurotherm)"+oven_name)
-        curve_T_t.append(curve)
+        curve_T_t.append(curve_stream(curve, proc))
         # now a new plot where we show the optimal curve
         p3 = win.addPlot(title="Program vs. time")
         p3.setLabel('left', "Temperature", units='C')
@@ -2454,9 +2442,7 @@ def arrhenius_ac(device_temperature,device_oven,device_impedance,temperature_val
         for i,temperature_val in enumerate(temperature_values):
             curve = p3.plot(pen=None,symbol='+',symbolPen=(i,len(temperature_values)))
             dynamic_legend_nyquist.addItem(curve, name=str(temperature_val)+u"°C")
-            curve_Zi_Zr.append(curve)
-        for i in range(len(temperature_values)):
-            curve_Zi_Zr[i].setData(data_Zi_Zr[i], _callSync='off')
+            curve_Zi_Zr.append(curve_stream(curve, proc))
         p3 = win.addPlot(title="Bode plot")
         p3.setLabel('left', "abs(Z)", units='')
         p3.setLabel('bottom', "frequency", units='Hz')
@@ -2467,9 +2453,13 @@ def arrhenius_ac(device_temperature,device_oven,device_impedance,temperature_val
         for i,temperature_val in enumerate(temperature_values):
             curve = p3.plot(pen=None,symbol='+',symbolPen=(i,len(temperature_values)))
             dynamic_legend_bode.addItem(curve, name=str(temperature_val)+u"°C")
-            curve_freq_mod.append(curve)
+            curve_freq_mod.append(curve_stream(curve, proc))
+    if GUI:
+        display.watch(curve_T_t[0], data_T_t[0]) # Chamber
+        display.watch(curve_T_t[1], data_T_t[1]) # PV
         for i in range(len(temperature_values)):
-            curve_freq_mod[i].setData(data_freq_mod[i], _callSync='off')
+            display.watch(curve_Zi_Zr[i], data_Zi_Zr[i])
+            display.watch(curve_freq_mod[i], data_freq_mod[i], 0, 1)
     t0 = time.time() # measurement start time
     T_now = device_oven.get_pv()
     time_summing_last_actions = 0
@@ -2494,10 +2484,8 @@ def arrhenius_ac(device_temperature,device_oven,device_impedance,temperature_val
             data_T_t[1].append([PV,time_val])
             data_P_t[3] = [PV,time_val]
             if GUI:
-                curve_T_t[0].setData(x=[k[1] for k in data_T_t[0]], y=[k[0] for k in data_T_t[0]], _callSync='off') # Chamber
-                curve_T_t[1].setData(x=[k[1] for k in data_T_t[1]], y=[k[0] for k in data_T_t[1]], _callSync='off') # PV
-                curve_P_t[1].setData(x=[k[1] for k in data_P_t[1]], y=[k[0] for k in data_P_t[1]], _callSync='off') # ac_measurement
-                curve_P_t[3].setData(x=[time_val], y=[PV], _callSync='off')
+                display.set_data(curve_P_t[1], x=[k[1] for k in data_P_t[1]], y=[k[0] for k in data_P_t[1]]) # ac_measurement
+                display.set_data(curve_P_t[3], x=[time_val], y=[PV])
             if time_val > stabilization_times[index]+np.absolute(T_set-T_now)/(ramp_rates[index]/60.0)+time_summing_last_actions:
                 time_summing_last_actions = time_summing_last_actions+stabilization_times[index]+np.absolute(T_set-T_now)/(ramp_rates[index]/60.0)
                 step_done = True
@@ -2511,9 +2499,10 @@ def arrhenius_ac(device_temperature,device_oven,device_impedance,temperature_val
                     high_frequency = start_frequency
                 if device_impedance.get_id() is "Gamry_R600":
                     device_impedance.create_impedance_object()
-                    time.sleep(21) # This is very important. Gamry needs at least 10 sec to startup. Do NOT continue before this is done
+                    if not device_impedance.wait_until_ready(60): # Gamry needs at least 10 sec to startup. Do NOT continue before this is done
+                        print "ERROR Gamry did not start up within 60 s"
                     device_impedance.setup_impedance_measurement()
-                    time.sleep(5)
+                    device_impedance.wait_until_ready(30)
                     device_impedance.perform_impedance_measurement(low_frequency, high_frequency, ac_amplitude, num_points_per_decade)
                 elif device_impedance.get_id() is "Zahner_IM6":
                     device_impedance.setup_impedance_measurement(7,ac_amplitude,bias)
@@ -2526,7 +2515,7 @@ def arrhenius_ac(device_temperature,device_oven,device_impedance,temperature_val
                 total_number_measurement_points = len(np.logspace(np.log10(low_frequency),np.log10(high_frequency),int(num_points_per_decade)*np.log10(high_frequency/low_frequency)))
                 number_of_points_measured = 0
                 current_number_of_points_measured = 0
-                data_bias_ampl_time_range_err_temp = []
+                data_bias_ampl_time_range_err_temp = data_list(sink, "bias_ampl_time_range_err_temp_"+str(index), ("bias","amplitude","aux","time","range","error","temperature"))
                 if device_impedance.get_id() is "Gamry_R600":
                     while not done:
                         time.sleep(10) # Do not generate too much overhead over the network interface
@@ -2548,9 +2537,6 @@ def arrhenius_ac(device_temperature,device_oven,device_impedance,temperature_val
                                 data_freq_mod[index].append([B[0][-j],B[1][-j]])
                         if current_number_of_points_measured >= total_number_measurement_points:
                             done = True
-                        if GUI:
-                            curve_Zi_Zr[index].setData(x=[k[1] for k in data_Zi_Zr[index]], y=[k[0] for k in data_Zi_Zr[index]], _callSync='off')
-                            curve_freq_mod[index].setData(x=[k[0] for k in data_freq_mod[index]], y=[k[1] for k in data_freq_mod[index]], _callSync='off')
                         number_of_points_measured = current_number_of_points_measured
                         current_number_of_points_measured = device_impedance.get_number_of_points_measured()
                 elif device_impedance.get_id() is "Zahner_IM6":
@@ -2582,11 +2568,7 @@ def arrhenius_ac(device_temperature,device_oven,device_impedance,temperature_val
                         # graphical output
                         data_P_t[3] = [PV,time_val]
                         if GUI:
-                            curve_Zi_Zr[index].setData(x=[k[1] for k in data_Zi_Zr[index]], y=[k[0] for k in data_Zi_Zr[index]], _callSync='off')
-                            curve_freq_mod[index].setData(x=[k[0] for k in data_freq_mod[index]], y=[k[1] for k in data_freq_mod[index]], _callSync='off')
-                            curve_T_t[0].setData(x=[k[1] for k in data_T_t[0]], y=[k[0] for k in data_T_t[0]], _callSync='off')
-                            curve_T_t[1].setData(x=[k[1] for k in data_T_t[1]], y=[k[0] for k in data_T_t[1]], _callSync='off')
-                            curve_P_t[3].setData(x=[time_val], y=[PV], _callSync='off')
+                            display.set_data(curve_P_t[3], x=[time_val], y=[PV])
                 device_impedance.flush()
                 data_to_write = [data_Zi_Zr[index][::-1],data_freq_mod[index][::-1],data_bias_ampl_time_range_err_temp[::-1]]
                 # In which cycle are we at the moment?
@@ -2617,7 +2599,7 @@ def arrhenius_ac(device_temperature,device_oven,device_impedance,temperature_val
                     device_oven.set_setpoint_rate(ramp_rates[index+1])
     return
     
-def impedance(device_impedance, start_frequency, end_frequency, ac_amplitude=0.05, bias=0, num_points_per_decade=10, new_row=False, GUI=True): # at the moment only Potentiostatic-mode available
+def impedance(device_impedance, start_frequency, end_frequency, ac_amplitude=0.05, bias=0, num_points_per_decade=10, new_row=False, GUI=True, sink=None): # at the moment only Potentiostatic-mode available
     room_temperature = 23
     if start_frequency < end_frequency:
         low_frequency = start_frequency
@@ -2627,9 +2609,10 @@ def impedance(device_impedance, start_frequency, end_frequency, ac_amplitude=0.0
         high_frequency = start_frequency
     if device_impedance.get_id() is "Gamry_R600":
         device_impedance.create_impedance_object()
-        time.sleep(21) # This is very important. Gamry needs at least 10 sec to startup. Do NOT continue before this is done
+        if not device_impedance.wait_until_ready(60): # Gamry needs at least 10 sec to startup. Do NOT continue before this is done
+            print "ERROR Gamry did not start up within 60 s"
         device_impedance.setup_impedance_measurement()
-        time.sleep(5)
+        device_impedance.wait_until_ready(30)
         device_impedance.perform_impedance_measurement(low_frequency, high_frequency, ac_amplitude,num_points_per_decade)
     elif device_impedance.get_id() is "Zahner_IM6" or device_impedance.get_id() is "Solartron":
         device_impedance.setup_impedance_measurement(7,ac_amplitude,bias)
@@ -2644,27 +2627,25 @@ def impedance(device_impedance, start_frequency, end_frequency, ac_amplitude=0.0
     total_number_measurement_points = len(np.logspace(np.log10(low_frequency),np.log10(high_frequency),int(num_points_per_decade)*np.log10(high_frequency/low_frequency)))
     number_of_points_measured = 0
     current_number_of_points_measured = 0
-    data_bias_ampl_time_range_err_temp = []
-    data_Zi_Zr = []
-    data_freq_mod = []
+    data_bias_ampl_time_range_err_temp = data_list(sink, "bias_ampl_time_range_err_temp", ("bias","amplitude","aux","time","range","error","temperature"))
+    data_Zi_Zr = data_list(sink, "Zi_Zr", ("minus_Zimag","Zreal"))
+    data_freq_mod = data_list(sink, "freq_mod", ("frequency","modulus"))
     if GUI:
-        # create an empty list in the remote process
-        data_Zi_Zr = proc.transfer([])
         p3 = win.addPlot(title="Nyquist plot")
-        curve_Zi_Zr = p3.plot(pen=None, symbol='+')
+        curve_Zi_Zr = curve_stream(p3.plot(pen=None, symbol='+'), proc)
         p3.setLabel('left', "-Zimag", units='Ohm')
         p3.setLabel('bottom', "Zreal", units='Ohm')
         #p3.setAspectLocked(True)
         #p3.setAspectLocked(lock=True, ratio=1.0) # That semi-circles remain semi-circles on zooming
-        curve_Zi_Zr.setData(data_Zi_Zr, _callSync='off')
+        display.watch(curve_Zi_Zr, data_Zi_Zr)
         
         p3 = win.addPlot(title="Bode plot")
-        curve_freq_mod = p3.plot(pen=None, symbol='+')
+        curve_freq_mod = curve_stream(p3.plot(pen=None, symbol='+'), proc)
         p3.setLabel('left', "abs(Z)")
         p3.setLabel('bottom', "frequency", units='Hz')
         p3.setAspectLocked(True)
         p3.setLogMode(x=True,y=True)
-        curve_freq_mod.setData(data_freq_mod, _callSync='off')
+        display.watch(curve_freq_mod, data_freq_mod, 0, 1)
         if new_row:
             win.nextRow()
     if device_impedance.get_id() is "Gamry_R600":
@@ -2684,9 +2665,6 @@ def impedance(device_impedance, start_frequency, end_frequency, ac_amplitude=0.0
                     data_freq_mod.append([B[0][-j],B[1][-j]])
             if current_number_of_points_measured >= total_number_measurement_points:
                 done = True
-            if GUI:
-                curve_Zi_Zr.setData(x=[k[1] for k in data_Zi_Zr], y=[k[0] for k in data_Zi_Zr], _callSync='off')
-                curve_freq_mod.setData(x=[k[0] for k in data_freq_mod], y=[k[1] for k in data_freq_mod], _callSync='off')
             number_of_points_measured = current_number_of_points_measured
             current_number_of_points_measured = device_impedance.get_number_of_points_measured()
     elif device_impedance.get_id() is "Zahner_IM6" or device_impedance.get_id() is "Solartron":
@@ -2708,9 +2686,6 @@ def impedance(device_impedance, start_frequency, end_frequency, ac_amplitude=0.0
             data_freq_mod.append([frequency,modulus])
             time_val = time.time()-t0
             data_bias_ampl_time_range_err_temp.append([bias,ac_amplitude,0,time_val,a[2],0,room_temperature])
-            if GUI:
-                curve_Zi_Zr.setData(x=[k[1] for k in data_Zi_Zr], y=[k[0] for k in data_Zi_Zr], _callSync='off')
-                curve_freq_mod.setData(x=[k[0] for k in data_freq_mod], y=[k[1] for k in data_freq_mod], _callSync='off')
     device_impedance.close()
     return [data_Zi_Zr[::-1],data_freq_mod[::-1],data_bias_ampl_time_range_err_temp[::-1]]
     
@@ -2746,17 +2721,17 @@ def write_file_zview(data,path="/home/electrochem/lost_data",filename="impedance
     print "Data has been saved successfully in folder:",path
     return
     
-def galvanostatic_cycling(device_smu,current_1,target_voltage_1,hold_time_1,hold_current_1,current_2,target_voltage_2,hold_time_2,hold_current_2,n=1,ocv_measurement_time=0,set_I_zero_after_cycle=False,new_row=False,GUI=True):
+def galvanostatic_cycling(device_smu,current_1,target_voltage_1,hold_time_1,hold_current_1,current_2,target_voltage_2,hold_time_2,hold_current_2,n=1,ocv_measurement_time=0,set_I_zero_after_cycle=False,new_row=False,GUI=True, sink=None):
     delta = 0.05 # This is the voltage accuracy for change detection
     device_smu.reset()
     device_smu.set_offmode_high_impedance()
     device_smu.turn_output_off()
     device_smu.setup_voltage_measurement(1)
-    data_0 = []
-    data_1 = []
-    data_2 = []
-    data_3 = [[],[]]
-    data_4 = [[],[]]
+    data_0 = data_list(sink, "OCV_t", ("V","t"))
+    data_1 = data_list(sink, "V_t", ("V","t"))
+    data_2 = data_list(sink, "I_t", ("I","t"))
+    data_3 = [data_list(sink, "V_capacity_0", ("V","capacity")),data_list(sink, "V_capacity_1", ("V","capacity"))]
+    data_4 = [data_list(sink, "capacity_cycle_0", ("capacity","cycle")),data_list(sink, "capacity_cycle_1", ("capacity","cycle"))]
     if type(current_1)==float or type(current_1)==int:
        current_1 = [current_1] # make an array
     if type(target_voltage_1)==float or type(target_voltage_1)==int:
@@ -2802,27 +2777,26 @@ def galvanostatic_cycling(device_smu,current_1,target_voltage_1,hold_time_1,hold
     charge_first = True
     if target_voltage_1[0] < target_voltage_2[0]:
         charge_first = False
+    plot_3 = [[],[]] # data_3 with a row of NaN after each charge or discharge, only for the plot
     if GUI:
-        connected_lines_array_charge = np.array([], np.int32)
-        connected_lines_array_discharge = np.array([], np.int32)
         if ocv_measurement_time != 0:
             p0 = win.addPlot(title="open circuit Voltage vs. time")
-            curve_0 = p0.plot(pen='y')
+            curve_0 = curve_stream(p0.plot(pen='y'), proc, decimate=True)
             p0.setLabel('left', "OCV", units='V')
             p0.setLabel('bottom', "time", units='s')
-            curve_0.setData(data_0, _callSync='off')
+            display.watch(curve_0, data_0)
             
         p1 = win.addPlot(title="Voltage vs. time")
-        curve_1 = p1.plot(pen='y')
+        curve_1 = curve_stream(p1.plot(pen='y'), proc, decimate=True)
         p1.setLabel('left', "Voltage", units='V')
         p1.setLabel('bottom', "time", units='s')
-        curve_1.setData(data_1, _callSync='off')
+        display.watch(curve_1, data_1)
 
         p2 = win.addPlot(title="Current vs. time")
-        curve_2 = p2.plot(pen='y')
+        curve_2 = curve_stream(p2.plot(pen='y'), proc, decimate=True)
         p2.setLabel('left', "Current", units='A')
         p2.setLabel('bottom', "time", units='s')
-        curve_2.setData(data_2, _callSync='off')
+        display.watch(curve_2, data_2)
         
         win.nextRow()
 
@@ -2832,11 +2806,11 @@ def galvanostatic_cycling(device_smu,current_1,target_voltage_1,hold_time_1,hold
         p3.setLabel('bottom', "Capacity*Mass", units='As')
         p3.addLegend()
         curve = p3.plot(pen=(0,2),name="charge")
-        curve_3.append(curve)
+        curve_3.append(curve_stream(curve, proc, connect="finite"))
         curve = p3.plot(pen=(1,2),name="discharge")
-        curve_3.append(curve)
-        curve_3[0].setData(data_3[0], _callSync='off')
-        curve_3[1].setData(data_3[1], _callSync='off')
+        curve_3.append(curve_stream(curve, proc, connect="finite"))
+        display.watch(curve_3[0], plot_3[0])
+        display.watch(curve_3[1], plot_3[1])
         
         p4 = win.addPlot(title="Capacity*Mass vs. Cycle")
         curve_4 = []
@@ -2844,11 +2818,11 @@ def galvanostatic_cycling(device_smu,current_1,target_voltage_1,hold_time_1,hold
         p4.setLabel('bottom', "Cycle", units='')
         p4.addLegend()
         curve = p4.plot(pen=(0,2),symbol='+',name="charge")
-        curve_4.append(curve)
+        curve_4.append(curve_stream(curve, proc))
         curve = p4.plot(pen=(1,2),symbol='+',name="discharge")
-        curve_4.append(curve)
-        curve_4[0].setData(data_4[0], _callSync='off')
-        curve_4[1].setData(data_4[1], _callSync='off')
+        curve_4.append(curve_stream(curve, proc))
+        display.watch(curve_4[0], data_4[0])
+        display.watch(curve_4[1], data_4[1])
         
         if new_row:
             win.nextRow()
@@ -2859,8 +2833,6 @@ def galvanostatic_cycling(device_smu,current_1,target_voltage_1,hold_time_1,hold
             V = device_smu.get_voltage()
             timestamp = time.time()-t0
             data_0.append([V,timestamp])
-            if GUI:
-                curve_0.setData(x=[k[1] for k in data_0], y=[k[0] for k in data_0], _callSync='off')
     cycle_total = 1
     t0 = time.time() # measurement start time
     OCV = device_smu.get_voltage()
@@ -2897,16 +2869,11 @@ def galvanostatic_cycling(device_smu,current_1,target_voltage_1,hold_time_1,hold
                 data_2.append([I,timestamp])
                 if charge_first:
                     data_3[0].append([V,np.absolute(I)*capacity_timestamp])
-                    connected_lines_array_charge = np.append(connected_lines_array_charge,1)
+                    plot_3[0].append([V,np.absolute(I)*capacity_timestamp])
                 else:
                     data_3[1].append([V,np.absolute(I)*capacity_timestamp])
-                    connected_lines_array_discharge = np.append(connected_lines_array_discharge,1)
+                    plot_3[1].append([V,np.absolute(I)*capacity_timestamp])
                 data_3_array.append([V,np.absolute(I)*capacity_timestamp])
-                if GUI:
-                    curve_1.setData(x=[k[1] for k in data_1], y=[k[0] for k in data_1], _callSync='off')
-                    curve_2.setData(x=[k[1] for k in data_2], y=[k[0] for k in data_2], _callSync='off')
-                    curve_3[0].setData(x=[k[1] for k in data_3[0]], y=[k[0] for k in data_3[0]],connect=connected_lines_array_charge, _callSync='off')
-                    curve_3[1].setData(x=[k[1] for k in data_3[1]], y=[k[0] for k in data_3[1]],connect=connected_lines_array_discharge, _callSync='off')
                 if np.absolute(V-target_voltage_1[i]) <= delta:
                     target_voltage_1_counter = target_voltage_1_counter+1
                     if target_voltage_1_counter >= 10: # ten measurment points need to be in the target range in order to trigger; not only on random noise
@@ -2927,13 +2894,10 @@ def galvanostatic_cycling(device_smu,current_1,target_voltage_1,hold_time_1,hold
                     hold_current_1_reached = True
             if charge_first:
                 data_4[0].append([max([k[1] for k in data_3_array]),cycle_total])
-                connected_lines_array_charge[-1] = 0 # not connected between different segments
+                plot_3[0].append([np.nan,np.nan]) # not connected between different segments
             else:
                 data_4[1].append([max([k[1] for k in data_3_array]),cycle_total])
-                connected_lines_array_discharge[-1] = 0 # not connected between different segments
-            if GUI:
-                curve_4[0].setData(x=[k[1] for k in data_4[0]], y=[k[0] for k in data_4[0]], _callSync='off')
-                curve_4[1].setData(x=[k[1] for k in data_4[1]], y=[k[0] for k in data_4[1]], _callSync='off')
+                plot_3[1].append([np.nan,np.nan]) # not connected between different segments
             device_smu.set_current(current_2[i])
             #device_smu.set_compliance_voltage(target_voltage_2[i]+np.sign(target_voltage_2[i])*delta) # 10mV higher than max so that max can actually be reached
             capacity_t0 = time.time()
@@ -2958,16 +2922,11 @@ def galvanostatic_cycling(device_smu,current_1,target_voltage_1,hold_time_1,hold
                 data_2.append([I,timestamp])
                 if charge_first:
                     data_3[1].append([V,np.absolute(I)*capacity_timestamp])
-                    connected_lines_array_discharge = np.append(connected_lines_array_discharge,1)
+                    plot_3[1].append([V,np.absolute(I)*capacity_timestamp])
                 else:
                     data_3[0].append([V,np.absolute(I)*capacity_timestamp])
-                    connected_lines_array_charge = np.append(connected_lines_array_charge,1)
+                    plot_3[0].append([V,np.absolute(I)*capacity_timestamp])
                 data_3_array.append([V,np.absolute(I)*capacity_timestamp])
-                if GUI:
-                    curve_1.setData(x=[k[1] for k in data_1], y=[k[0] for k in data_1], _callSync='off')
-                    curve_2.setData(x=[k[1] for k in data_2], y=[k[0] for k in data_2], _callSync='off')
-                    curve_3[0].setData(x=[k[1] for k in data_3[0]], y=[k[0] for k in data_3[0]],connect=connected_lines_array_charge, _callSync='off')
-                    curve_3[1].setData(x=[k[1] for k in data_3[1]], y=[k[0] for k in data_3[1]],connect=connected_lines_array_discharge, _callSync='off')
                 if np.absolute(V-target_voltage_2[i]) <= delta:
                     target_voltage_2_counter = target_voltage_2_counter+1
                     if target_voltage_2_counter >= 10: # ten measurment points need to be in the target range in order to trigger; not only on random noise
@@ -2990,30 +2949,27 @@ def galvanostatic_cycling(device_smu,current_1,target_voltage_1,hold_time_1,hold
                 print "WARNING: Device-under-test has been overloaded! An oposite polarity voltage had to be applied to maintain the set current"
             if charge_first:
                 data_4[1].append([max([k[1] for k in data_3_array]),cycle_total])
-                connected_lines_array_discharge[-1] = 0 # not connected between different segments
+                plot_3[1].append([np.nan,np.nan]) # not connected between different segments
             else:
                 data_4[0].append([max([k[1] for k in data_3_array]),cycle_total])
-                connected_lines_array_charge[-1] = 0 # not connected between different segments
-            if GUI:
-                curve_4[0].setData(x=[k[1] for k in data_4[0]], y=[k[0] for k in data_4[0]], _callSync='off')
-                curve_4[1].setData(x=[k[1] for k in data_4[1]], y=[k[0] for k in data_4[1]], _callSync='off')
+                plot_3[0].append([np.nan,np.nan]) # not connected between different segments
             cycle = cycle+1
             cycle_total = cycle_total+1
     device_smu.turn_output_off_high_impedance()
     return [data_0,data_1,data_2,data_3]
     
-def galvanostatic_cycling_nano(device_voltmeter,device_current_source,current_1,target_voltage_1,hold_time_1,hold_current_1,current_2,target_voltage_2,hold_time_2,hold_current_2,n=1,ocv_measurement_time=0,set_I_zero_after_cycle=False,new_row=False,GUI=True):
+def galvanostatic_cycling_nano(device_voltmeter,device_current_source,current_1,target_voltage_1,hold_time_1,hold_current_1,current_2,target_voltage_2,hold_time_2,hold_current_2,n=1,ocv_measurement_time=0,set_I_zero_after_cycle=False,new_row=False,GUI=True, sink=None):
     device_current_source.reset()
     device_current_source.set_triax_inner_shield_to_low()
     device_current_source.set_triax_output_low_to_earth()
     delta = 0.06 # This is the voltage accuracy for compliance mode to decide when a condition is met
     device_voltmeter.reset()
     device_voltmeter.setup_voltage_measurement()
-    data_0 = []
-    data_1 = []
-    data_2 = []
-    data_3 = [[],[]]
-    data_4 = [[],[]]
+    data_0 = data_list(sink, "OCV_t", ("V","t"))
+    data_1 = data_list(sink, "V_t", ("V","t"))
+    data_2 = data_list(sink, "I_t", ("I","t"))
+    data_3 = [data_list(sink, "V_capacity_0", ("V","capacity")),data_list(sink, "V_capacity_1", ("V","capacity"))]
+    data_4 = [data_list(sink, "capacity_cycle_0", ("capacity","cycle")),data_list(sink, "capacity_cycle_1", ("capacity","cycle"))]
     if type(current_1)==float or type(current_1)==int:
        current_1 = [current_1] # make an array
     if type(target_voltage_1)==float or type(target_voltage_1)==int:
@@ -3059,27 +3015,26 @@ def galvanostatic_cycling_nano(device_voltmeter,device_current_source,current_1,
     charge_first = True
     if target_voltage_1[0] < target_voltage_2[0]:
         charge_first = False
+    plot_3 = [[],[]] # data_3 with a row of NaN after each charge or discharge, only for the plot
     if GUI:
-        connected_lines_array_charge = np.array([], np.int32)
-        connected_lines_array_discharge = np.array([], np.int32)
         if ocv_measurement_time != 0:
             p0 = win.addPlot(title="open circuit Voltage vs. time")
-            curve_0 = p0.plot(pen='y')
+            curve_0 = curve_stream(p0.plot(pen='y'), proc, decimate=True)
             p0.setLabel('left', "OCV", units='V')
             p0.setLabel('bottom', "time", units='s')
-            curve_0.setData(data_0, _callSync='off')
+            display.watch(curve_0, data_0)
             
         p1 = win.addPlot(title="Voltage vs. time")
-        curve_1 = p1.plot(pen='y')
+        curve_1 = curve_stream(p1.plot(pen='y'), proc, decimate=True)
         p1.setLabel('left', "Voltage", units='V')
         p1.setLabel('bottom', "time", units='s')
-        curve_1.setData(data_1, _callSync='off')
+        display.watch(curve_1, data_1)
 
         p2 = win.addPlot(title="Current vs. time")
-        curve_2 = p2.plot(pen='y')
+        curve_2 = curve_stream(p2.plot(pen='y'), proc, decimate=True)
         p2.setLabel('left', "Current", units='A')
         p2.setLabel('bottom', "time", units='s')
-        curve_2.setData(data_2, _callSync='off')
+        display.watch(curve_2, data_2)
         
         win.nextRow()
 
@@ -3089,11 +3044,11 @@ def galvanostatic_cycling_nano(device_voltmeter,device_current_source,current_1,
         p3.setLabel('bottom', "Capacity*Mass", units='As')
         p3.addLegend()
         curve = p3.plot(pen=(0,2),name="charge")
-        curve_3.append(curve)
+        curve_3.append(curve_stream(curve, proc, connect="finite"))
         curve = p3.plot(pen=(1,2),name="discharge")
-        curve_3.append(curve)
-        curve_3[0].setData(data_3[0], _callSync='off')
-        curve_3[1].setData(data_3[1], _callSync='off')
+        curve_3.append(curve_stream(curve, proc, connect="finite"))
+        display.watch(curve_3[0], plot_3[0])
+        display.watch(curve_3[1], plot_3[1])
         
         p4 = win.addPlot(title="Capacity*Mass vs. Cycle")
         curve_4 = []
@@ -3101,11 +3056,11 @@ def galvanostatic_cycling_nano(device_voltmeter,device_current_source,current_1,
         p4.setLabel('bottom', "Cycle", units='')
         p4.addLegend()
         curve = p4.plot(pen=(0,2),symbol='+',name="charge")
-        curve_4.append(curve)
+        curve_4.append(curve_stream(curve, proc))
         curve = p4.plot(pen=(1,2),symbol='+',name="discharge")
-        curve_4.append(curve)
-        curve_4[0].setData(data_4[0], _callSync='off')
-        curve_4[1].setData(data_4[1], _callSync='off')
+        curve_4.append(curve_stream(curve, proc))
+        display.watch(curve_4[0], data_4[0])
+        display.watch(curve_4[1], data_4[1])
         
         if new_row:
             win.nextRow()
@@ -3116,8 +3071,6 @@ def galvanostatic_cycling_nano(device_voltmeter,device_current_source,current_1,
             V = device_voltmeter.get_voltage()
             timestamp = time.time()-t0
             data_0.append([V,timestamp])
-            if GUI:
-                curve_0.setData(x=[k[1] for k in data_0], y=[k[0] for k in data_0], _callSync='off')
     cycle_total = 1
     t0 = time.time() # measurement start time
     for i,individual_n in enumerate(n):
@@ -3151,16 +3104,11 @@ def galvanostatic_cycling_nano(device_voltmeter,device_current_source,current_1,
                 data_2.append([I,timestamp])
                 if charge_first:
                     data_3[0].append([V,np.absolute(I)*capacity_timestamp])
-                    connected_lines_array_charge = np.append(connected_lines_array_charge,1)
+                    plot_3[0].append([V,np.absolute(I)*capacity_timestamp])
                 else:
                     data_3[1].append([V,np.absolute(I)*capacity_timestamp])
-                    connected_lines_array_discharge = np.append(connected_lines_array_discharge,1)
+                    plot_3[1].append([V,np.absolute(I)*capacity_timestamp])
                 data_3_array.append([V,np.absolute(I)*capacity_timestamp])
-                if GUI:
-                    curve_1.setData(x=[k[1] for k in data_1], y=[k[0] for k in data_1], _callSync='off')
-                    curve_2.setData(x=[k[1] for k in data_2], y=[k[0] for k in data_2], _callSync='off')
-                    curve_3[0].setData(x=[k[1] for k in data_3[0]], y=[k[0] for k in data_3[0]],connect=connected_lines_array_charge, _callSync='off')
-                    curve_3[1].setData(x=[k[1] for k in data_3[1]], y=[k[0] for k in data_3[1]],connect=connected_lines_array_discharge, _callSync='off')
                 if np.absolute(V-target_voltage_1[i]) <= delta:
                     target_voltage_1_counter = target_voltage_1_counter+1
                     if target_voltage_1_counter >= 10: # ten measurment points need to be in the target range in order to trigger; not only on random noise
@@ -3177,13 +3125,10 @@ def galvanostatic_cycling_nano(device_voltmeter,device_current_source,current_1,
                     hold_current_1_reached = True
             if charge_first:
                 data_4[0].append([max([k[1] for k in data_3_array]),cycle_total])
-                connected_lines_array_charge[-1] = 0 # not connected between different segments
+                plot_3[0].append([np.nan,np.nan]) # not connected between different segments
             else:
                 data_4[1].append([max([k[1] for k in data_3_array]),cycle_total])
-                connected_lines_array_discharge[-1] = 0 # not connected between different segments
-            if GUI:
-                curve_4[0].setData(x=[k[1] for k in data_4[0]], y=[k[0] for k in data_4[0]], _callSync='off')
-                curve_4[1].setData(x=[k[1] for k in data_4[1]], y=[k[0] for k in data_4[1]], _callSync='off')
+                plot_3[1].append([np.nan,np.nan]) # not connected between different segments
             device_current_source.set_current(current_2[i])
             #device_current_source.set_compliance_voltage(target_voltage_2[i]+np.sign(target_voltage_2[i])*delta) # 10mV higher than max so that max can actually be reached
             capacity_t0 = time.time()
@@ -3206,16 +3151,11 @@ def galvanostatic_cycling_nano(device_voltmeter,device_current_source,current_1,
                 data_2.append([I,timestamp])
                 if charge_first:
                     data_3[1].append([V,np.absolute(I)*capacity_timestamp])
-                    connected_lines_array_discharge = np.append(connected_lines_array_discharge,1)
+                    plot_3[1].append([V,np.absolute(I)*capacity_timestamp])
                 else:
                     data_3[0].append([V,np.absolute(I)*capacity_timestamp])
-                    connected_lines_array_charge = np.append(connected_lines_array_charge,1)
+                    plot_3[0].append([V,np.absolute(I)*capacity_timestamp])
                 data_3_array.append([V,np.absolute(I)*capacity_timestamp])
-                if GUI:
-                    curve_1.setData(x=[k[1] for k in data_1], y=[k[0] for k in data_1], _callSync='off')
-                    curve_2.setData(x=[k[1] for k in data_2], y=[k[0] for k in data_2], _callSync='off')
-                    curve_3[0].setData(x=[k[1] for k in data_3[0]], y=[k[0] for k in data_3[0]],connect=connected_lines_array_charge, _callSync='off')
-                    curve_3[1].setData(x=[k[1] for k in data_3[1]], y=[k[0] for k in data_3[1]],connect=connected_lines_array_discharge, _callSync='off')
                 if np.absolute(V-target_voltage_2[i]) <= delta:
                     target_voltage_2_counter = target_voltage_2_counter+1
                     if target_voltage_2_counter >= 10: # ten measurment points need to be in the target range in order to trigger; not only on random noise
@@ -3234,42 +3174,39 @@ def galvanostatic_cycling_nano(device_voltmeter,device_current_source,current_1,
                 print "WARNING: Device-under-test has been overloaded! An oposite polarity voltage had to be applied to maintain the set current"
             if charge_first:
                 data_4[1].append([max([k[1] for k in data_3_array]),cycle_total])
-                connected_lines_array_discharge[-1] = 0 # not connected between different segments
+                plot_3[1].append([np.nan,np.nan]) # not connected between different segments
             else:
                 data_4[0].append([max([k[1] for k in data_3_array]),cycle_total])
-                connected_lines_array_charge[-1] = 0 # not connected between different segments
-            if GUI:
-                curve_4[0].setData(x=[k[1] for k in data_4[0]], y=[k[0] for k in data_4[0]], _callSync='off')
-                curve_4[1].setData(x=[k[1] for k in data_4[1]], y=[k[0] for k in data_4[1]], _callSync='off')
+                plot_3[0].append([np.nan,np.nan]) # not connected between different segments
             cycle = cycle+1
             cycle_total = cycle_total+1
     device_current_source.turn_output_off()
     return [data_0,data_1,data_2,data_3]
     
-def conductivity_switcher(a,new_row=False, GUI=True):
+def conductivity_switcher(a,new_row=False, GUI=True, sink=None):
     keithley_7001.close_channel(1,[11,21]) # SMU
-    data_1 = []
-    data_2 = []
-    data_3 = []
+    data_1 = data_list(sink, "I_t_1", ("I","t"))
+    data_2 = data_list(sink, "I_t_2", ("I","t"))
+    data_3 = data_list(sink, "I_t_3", ("I","t"))
     if GUI:
         # create an empty list in the remote process
         p1 = win.addPlot(title="current vs. time battery 1")
-        curve_1 = p1.plot(pen='y')
+        curve_1 = curve_stream(p1.plot(pen='y'), proc, decimate=True)
         p1.setLabel('left', "Current", units='A')
         p1.setLabel('bottom', "time", units='s')
-        curve_1.setData(data_1, _callSync='off')
+        display.watch(curve_1, data_1)
 
         p2 = win.addPlot(title="current vs. time battery 2")
-        curve_2 = p2.plot(pen='y')
+        curve_2 = curve_stream(p2.plot(pen='y'), proc, decimate=True)
         p2.setLabel('left', "Current", units='A')
         p2.setLabel('bottom', "time", units='s')
-        curve_2.setData(data_2, _callSync='off')
+        display.watch(curve_2, data_2)
 
         p3 = win.addPlot(title="current vs. time battery 3")
-        curve_3 = p3.plot(pen='y')
+        curve_3 = curve_stream(p3.plot(pen='y'), proc, decimate=True)
         p3.setLabel('left', "Current", units='A')
         p3.setLabel('bottom', "time", units='s')
-        curve_3.setData(data_3, _callSync='off')
+        display.watch(curve_3, data_3)
       
         if new_row:
             win.nextRow()
@@ -3300,19 +3237,10 @@ def conductivity_switcher(a,new_row=False, GUI=True):
             I = keithley_2601B.get_current()
             timestamp = time.time()-t0
             data_3.append([I,timestamp])
-            if GUI:
-                curve_1.setData(x=[k[1] for k in data_1], y=[k[0] for k in data_1], _callSync='off')
-                curve_2.setData(x=[k[1] for k in data_2], y=[k[0] for k in data_2], _callSync='off')
-                curve_3.setData(x=[k[1] for k in data_3], y=[k[0] for k in data_3], _callSync='off')
     keithley_2601B.turn_output_off()
     keithley_7001.open_channel(1,[28,18,11,21])
     return [data_1,data_2,data_3]
     
-# Open plotting window
-win = rpg.GraphicsWindow(title="Basic plotting")
-win.resize(1300,500)
-win.setWindowTitle(window_title)
-
 ### Start Qt event loop unless running in interactive mode or using pyside.
 #if __name__ == '__main__':
     #if (sys.flags.interactive != 1) or not hasattr(QtCore, 'PYQT_VERSION'):